@@ -1,15 +1,124 @@
+import asyncio
+import gzip
+import hashlib
+import itertools
+import importlib.util
+import json
+import math
+import multiprocessing
 import os
-import shutil
+import signal
+import sqlite3
+import sys
 import tempfile
+import threading
+import time
+import traceback
 import uuid
-from pathlib import Path
-from typing import List, Optional
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from pathlib import Path, PurePosixPath
+from typing import Awaitable, Callable, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 import httpx
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, Header, HTTPException, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
 from pydantic import BaseModel
 
-app = FastAPI(title="Deep Space Analyzer API")
+# HTTP/2 for blob downloads needs the optional h2 package (httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Faster JSON encoding for large analysis payloads when orjson is installed
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Brotli response compression needs the optional brotli package
+try:
+    import brotli
+    BROTLI_AVAILABLE = True
+except ImportError:
+    BROTLI_AVAILABLE = False
+
+# Analyses run in a pool of long-lived worker processes that import the
+# analyzer once and keep its reference tables loaded. The pool size caps how
+# many run at once; the event loop stays free to serve other requests (and
+# /health) while they run. Workers are replaced after ANALYZER_MAX_JOBS jobs.
+ANALYZER_CONCURRENCY = int(os.getenv("ANALYZER_CONCURRENCY", "2"))
+ANALYZER_TIMEOUT = float(os.getenv("ANALYZER_TIMEOUT", "120"))
+ANALYZER_MAX_JOBS = int(os.getenv("ANALYZER_MAX_JOBS", "100"))
+
+# A request's blobs are fetched concurrently, a few at a time, within
+# per-file and per-request size limits.
+DOWNLOAD_CONCURRENCY = int(os.getenv("DOWNLOAD_CONCURRENCY", "6"))
+DOWNLOAD_MAX_FILE_BYTES = int(float(os.getenv("DOWNLOAD_MAX_FILE_MB", "50")) * 1024 * 1024)
+DOWNLOAD_MAX_TOTAL_BYTES = int(float(os.getenv("DOWNLOAD_MAX_TOTAL_MB", "250")) * 1024 * 1024)
+
+# One HTTP client for the app's lifetime, so blob downloads reuse warm
+# keep-alive connections instead of paying new TCP/TLS handshakes.
+BLOB_MAX_CONNECTIONS = int(os.getenv("BLOB_MAX_CONNECTIONS", "20"))
+BLOB_MAX_KEEPALIVE = int(os.getenv("BLOB_MAX_KEEPALIVE", "10"))
+BLOB_KEEPALIVE_EXPIRY = float(os.getenv("BLOB_KEEPALIVE_EXPIRY", "60"))
+BLOB_HTTP2 = HTTP2_AVAILABLE and os.getenv("BLOB_HTTP2", "1") != "0"
+
+# Downloaded blobs are cached on disk and revalidated with ETags, so re-runs
+# for the same student skip the transfer. Set BLOB_CACHE_MB=0 to disable.
+BLOB_CACHE_DIR = Path(os.getenv("BLOB_CACHE_DIR", Path(tempfile.gettempdir()) / "deep-space-blob-cache"))
+BLOB_CACHE_MAX_BYTES = int(float(os.getenv("BLOB_CACHE_MB", "1024")) * 1024 * 1024)
+
+# Finished analyses are reused when the same student, files (by content),
+# assessment profile and analyzer version are submitted again. Kept in
+# memory, and in SQLite too when RESULT_CACHE_DB is set. RESULT_CACHE_TTL=0
+# disables the cache.
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", "3600"))
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "128"))
+RESULT_CACHE_DB = os.getenv("RESULT_CACHE_DB")
+
+# POST /jobs queues analyses for JOB_WORKERS background workers, highest
+# priority first and FIFO within a priority. Finished jobs (and results) are
+# kept for JOB_RETENTION seconds for GET /jobs/{id}.
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", str(ANALYZER_CONCURRENCY)))
+JOB_RETENTION = float(os.getenv("JOB_RETENTION", "3600"))
+
+# GET /jobs/{id}/events sends an SSE comment this often while a job is quiet,
+# so proxies keep the stream open.
+SSE_KEEPALIVE = float(os.getenv("SSE_KEEPALIVE", "15"))
+
+# POST /analyze/batch works on at most BATCH_CONCURRENCY students at a time
+# across all batches, so one student's downloads overlap another's analysis
+# without a caseload flooding the container.
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", str(ANALYZER_CONCURRENCY * 2)))
+BATCH_MAX_STUDENTS = int(os.getenv("BATCH_MAX_STUDENTS", "500"))
+
+# Admission control: at most ADMISSION_MAX_ACTIVE analyses (downloads
+# included) run at once and ADMISSION_MAX_QUEUE /analyze requests wait for a
+# slot; beyond that /analyze answers 429, or 503 while more than
+# ADMISSION_MAX_BYTES_MB of downloads are in flight, with a Retry-After
+# estimated from recent service times. Jobs and batch students wait instead
+# of being rejected; POST /jobs refuses new work past JOB_MAX_QUEUED.
+ADMISSION_MAX_ACTIVE = int(os.getenv("ADMISSION_MAX_ACTIVE", str(ANALYZER_CONCURRENCY * 2)))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "20"))
+ADMISSION_MAX_BYTES = int(float(os.getenv("ADMISSION_MAX_BYTES_MB", "512")) * 1024 * 1024)
+JOB_MAX_QUEUED = int(os.getenv("JOB_MAX_QUEUED", "100"))
+
+# JSON responses of at least RESPONSE_COMPRESS_MIN_BYTES are compressed with
+# brotli or gzip, whichever the client accepts (brotli preferred).
+RESPONSE_COMPRESS_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "5"))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+
+# Work for a request stops as soon as its client disconnects (checked every
+# DISCONNECT_POLL_INTERVAL seconds) or its X-Request-Timeout deadline passes:
+# downloads are cancelled and the analyzer worker's process group is killed.
+DISCONNECT_POLL_INTERVAL = float(os.getenv("DISCONNECT_POLL_INTERVAL", "0.5"))
+DEADLINE_HEADER = "X-Request-Timeout"
 
 
 class FileRef(BaseModel):
@@ -29,9 +138,136 @@ class AnalyzeResponse(BaseModel):
     report: Optional[str] = None
 
 
-@app.get("/health")
-async def health() -> dict:
-    return {"status": "ok"}
+class BatchRequest(BaseModel):
+    students: List[AnalyzeRequest]
+    # Defaults for students that do not set their own
+    assessmentProfile: Optional[str] = None
+    blobToken: Optional[str] = None
+
+
+class JobRequest(AnalyzeRequest):
+    priority: int = 0
+
+
+class JobStatus(BaseModel):
+    id: str
+    studentId: str
+    state: str
+    stage: str
+    priority: int
+    progress: dict
+    submittedAt: float
+    startedAt: Optional[float] = None
+    finishedAt: Optional[float] = None
+    error: Optional[dict] = None
+    result: Optional[AnalyzeResponse] = None
+
+
+# Latency buckets (seconds) shared by every histogram; analyses run up to
+# ANALYZER_TIMEOUT.
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+
+
+class _Metric:
+    """A Prometheus counter, gauge or histogram rendered in the text format."""
+
+    def __init__(self, kind: str, name: str, help_text: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.kind = kind
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._values: dict = {}
+
+    @staticmethod
+    def _escape(value, quotes: bool = True) -> str:
+        """Escape backslashes, newlines and (in label values) double quotes."""
+        text = str(value).replace("\\", "\\\\").replace("\n", "\\n")
+        return text.replace('"', '\\"') if quotes else text
+
+    @classmethod
+    def _labels(cls, labels: dict, **extra) -> str:
+        items = {**labels, **extra}
+        if not items:
+            return ""
+        return "{" + ",".join(f'{k}="{cls._escape(v)}"' for k, v in sorted(items.items())) + "}"
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels) -> float:
+        """Current value of a counter or gauge."""
+        return self._values.get(tuple(sorted(labels.items())), 0)
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        counts = self._values.get(key)
+        if counts is None:
+            counts = self._values[key] = [0] * len(self.buckets) + [0, 0.0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+        counts[-2] += 1
+        counts[-1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self._escape(self.help_text, quotes=False)}", f"# TYPE {self.name} {self.kind}"]
+        for key, value in sorted(self._values.items()):
+            labels = dict(key)
+            if self.kind != "histogram":
+                lines.append(f"{self.name}{self._labels(labels)} {value:g}")
+                continue
+            for bound, count in zip(self.buckets, value):
+                lines.append(f"{self.name}_bucket{self._labels(labels, le=f'{bound:g}')} {count}")
+            lines.append(f"{self.name}_bucket{self._labels(labels, le='+Inf')} {value[-2]}")
+            lines.append(f"{self.name}_sum{self._labels(labels)} {value[-1]:g}")
+            lines.append(f"{self.name}_count{self._labels(labels)} {value[-2]}")
+        return lines
+
+
+STAGE_SECONDS = _Metric(
+    "histogram", "deep_space_stage_seconds",
+    "Time per analysis stage: API download/queue/analyzer and the analyzer's own stages.",
+)
+MODULE_SECONDS = _Metric("histogram", "deep_space_module_seconds", "Time per analyzer module.")
+DOCUMENT_SECONDS = _Metric("histogram", "deep_space_document_extract_seconds", "pdftotext time per document.")
+ANALYSES = _Metric("counter", "deep_space_analyses_total", "Analyses by outcome.")
+DOCUMENTS = _Metric("counter", "deep_space_documents_total", "Documents text-extracted.")
+EXTRACTED_CHARS = _Metric("counter", "deep_space_extracted_chars_total", "Characters of text extracted.")
+DOWNLOADS = _Metric("counter", "deep_space_downloads_total", "Files downloaded, by source (network or cache).")
+DOWNLOAD_BYTES = _Metric("counter", "deep_space_download_bytes_total", "Bytes of files placed in work directories.")
+IN_FLIGHT = _Metric(
+    "gauge", "deep_space_in_flight",
+    "Work in progress, by kind (analyses, queued, downloads, download_bytes).",
+)
+REJECTIONS = _Metric("counter", "deep_space_rejections_total", "Requests shed by admission control, by reason.")
+CANCELLATIONS = _Metric(
+    "counter", "deep_space_cancellations_total",
+    "Analyses stopped early, by reason (disconnect, deadline, job_cancelled).",
+)
+BLOB_REQUESTS = _Metric("counter", "deep_space_blob_requests_total", "HTTP requests sent by the blob client.")
+METRICS = [
+    STAGE_SECONDS, MODULE_SECONDS, DOCUMENT_SECONDS, ANALYSES, DOCUMENTS,
+    EXTRACTED_CHARS, DOWNLOADS, DOWNLOAD_BYTES, IN_FLIGHT, REJECTIONS, CANCELLATIONS, BLOB_REQUESTS,
+]
+# Gauges and counters present from the first scrape
+for _kind in ("analyses", "queued", "downloads", "download_bytes"):
+    IN_FLIGHT.inc(0, kind=_kind)
+BLOB_REQUESTS.inc(0)
+
+
+def _record_analyzer_timings(timings: dict) -> None:
+    for stage, seconds in timings.get("stages", {}).items():
+        STAGE_SECONDS.observe(seconds, stage=stage)
+    for module, seconds in timings.get("modules", {}).items():
+        MODULE_SECONDS.observe(seconds, module=module)
+    for doc in timings.get("documents", {}).values():
+        DOCUMENT_SECONDS.observe(doc["seconds"])
+        DOCUMENTS.inc()
+        EXTRACTED_CHARS.inc(doc["chars"])
 
 
 def _get_analyzer_path() -> Path:
@@ -45,100 +281,1256 @@ def _get_analyzer_path() -> Path:
     return Path(__file__).parent / "scripts" / "deep_dive_analyzer.py"
 
 
-async def _download_file(client: httpx.AsyncClient, url: str, dest: Path, token: Optional[str] = None) -> None:
+class AnalyzerError(Exception):
+    """The analyzer raised; carries the worker's traceback."""
+
+
+def _analyzer_worker(conn, analyzer_path: str) -> None:
+    """Worker process: import the analyzer once, then serve jobs from ``conn``."""
+    # Lead a process group so a kill also takes any running pdftotext
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    try:
+        sys.path.insert(0, str(Path(analyzer_path).parent))
+        spec = importlib.util.spec_from_file_location("deep_dive_analyzer", analyzer_path)
+        module = importlib.util.module_from_spec(spec)
+        sys.modules["deep_dive_analyzer"] = module
+        spec.loader.exec_module(module)
+    except Exception:
+        conn.send(("error", traceback.format_exc()))
+        return
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            return
+        if job is None:
+            return
+        if job.pop("progress", False):
+            job["progress"] = lambda event, data: conn.send(("progress", (event, data)))
+        try:
+            result = module.analyze_documents(**job)
+        except Exception:
+            conn.send(("error", traceback.format_exc()))
+        else:
+            conn.send(("ok", result))
+
+
+class _Worker:
+    def __init__(self, process, conn):
+        self.process = process
+        self.conn = conn
+        self.ready = False
+        self.jobs = 0
+        # Executor call still blocked on the pipe, if any; the pipe is only
+        # closed once it has returned
+        self.pending: Optional[asyncio.Future] = None
+
+    def stop(self, timeout: float = 5) -> None:
+        """Ask the worker to exit, killing it if it has not within ``timeout``. Blocking."""
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        self.kill()
+
+    def kill(self) -> None:
+        """Kill the worker and anything it started. Blocking."""
+        if self.process.is_alive():
+            try:
+                os.killpg(self.process.pid, signal.SIGKILL)
+            except (AttributeError, OSError):
+                self.process.kill()
+            self.process.join()
+
+
+class AnalyzerPool:
+    """Pre-started analyzer worker processes, one job at a time each.
+
+    A worker that fails, times out or is cancelled mid-job is killed and
+    replaced, so a stuck analysis never holds a slot past ANALYZER_TIMEOUT.
+    Killing, stopping and spawning block, so they run in a background task
+    on the default executor; the slot becomes idle again once its
+    replacement has started and imported the analyzer.
+    """
+
+    def __init__(self, analyzer_path: Path, size: int, max_jobs: int):
+        self.analyzer_path = analyzer_path
+        self.size = max(1, size)
+        self.max_jobs = max_jobs
+        self._ctx = multiprocessing.get_context("spawn")
+        self._idle: asyncio.Queue = asyncio.Queue()
+        self._replacing: set = set()
+
+    def start(self) -> None:
+        for _ in range(self.size):
+            self._idle.put_nowait(self._spawn())
+
+    def _spawn(self) -> _Worker:
+        parent, child = self._ctx.Pipe()
+        process = self._ctx.Process(
+            target=_analyzer_worker, args=(child, str(self.analyzer_path)), daemon=True
+        )
+        process.start()
+        child.close()
+        return _Worker(process, parent)
+
+    @staticmethod
+    def _io(worker: _Worker, fn: Callable, *args) -> asyncio.Future:
+        worker.pending = asyncio.get_running_loop().run_in_executor(None, fn, *args)
+        return worker.pending
+
+    async def _call(self, worker: _Worker, job: dict, on_progress: Optional[Callable]) -> dict:
+        if not worker.ready:
+            status, payload = await self._io(worker, worker.conn.recv)
+            if status != "ready":
+                raise AnalyzerError(payload)
+            worker.ready = True
+        # Pickling and writing up to DOWNLOAD_MAX_TOTAL_MB of documents blocks
+        await self._io(worker, worker.conn.send, {**job, "progress": on_progress is not None})
+        status, payload = await self._io(worker, worker.conn.recv)
+        while status == "progress":
+            on_progress(*payload)
+            status, payload = await self._io(worker, worker.conn.recv)
+        worker.jobs += 1
+        if status != "ok":
+            raise AnalyzerError(payload)
+        return payload
+
+    async def run(self, timeout: float, on_progress: Optional[Callable] = None, **job) -> dict:
+        """Run ``analyze_documents(**job)`` on the next free worker.
+
+        ``on_progress(event, data)`` receives the analyzer's progress events.
+        """
+        queued = time.perf_counter()
+        worker = await self._idle.get()
+        started = time.perf_counter()
+        STAGE_SECONDS.observe(started - queued, stage="queue")
+        try:
+            result = await asyncio.wait_for(self._call(worker, job, on_progress), timeout)
+            STAGE_SECONDS.observe(time.perf_counter() - started, stage="analyzer")
+        except BaseException:
+            # The worker's state is unknown after a failed or interrupted job
+            self._replace(worker, worker.kill)
+            raise
+        if worker.jobs >= self.max_jobs:
+            self._replace(worker, worker.stop)
+        else:
+            self._idle.put_nowait(worker)
+        return result
+
+    def _replace(self, worker: _Worker, retire: Callable[[], None]) -> None:
+        task = asyncio.get_running_loop().create_task(self._retire_and_respawn(worker, retire))
+        self._replacing.add(task)
+        task.add_done_callback(self._replacing.discard)
+
+    async def _retire_and_respawn(self, worker: _Worker, retire: Callable[[], None]) -> None:
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, retire)
+        if worker.pending is not None:
+            # A thread blocked on the pipe returns (or fails) once the process is gone
+            await asyncio.wait([worker.pending])
+        worker.conn.close()
+        try:
+            replacement = await loop.run_in_executor(None, self._spawn)
+            status, payload = await self._io(replacement, replacement.conn.recv)
+        except Exception:
+            print(f"Warning: Could not start analyzer worker:\n{traceback.format_exc()}")
+            return
+        if status == "ready":
+            replacement.ready = True
+        else:
+            # Left unready: the next job on it fails and replaces it again
+            print(f"Warning: Analyzer worker failed to start:\n{payload}")
+        self._idle.put_nowait(replacement)
+
+    @property
+    def idle(self) -> int:
+        return self._idle.qsize()
+
+    async def close(self) -> None:
+        if self._replacing:
+            await asyncio.gather(*self._replacing, return_exceptions=True)
+        workers = []
+        while not self._idle.empty():
+            workers.append(self._idle.get_nowait())
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*(loop.run_in_executor(None, w.stop) for w in workers))
+        for worker in workers:
+            worker.conn.close()
+
+
+async def _count_blob_request(request: httpx.Request) -> None:
+    BLOB_REQUESTS.inc()
+
+
+def _create_blob_client(transport: Optional[httpx.AsyncBaseTransport] = None) -> httpx.AsyncClient:
+    """The blob-download client shared by every request; ``transport`` replaces the network (tests)."""
+    # verify=False is intentional here: Render's container CA bundle can
+    # be incomplete and fails to verify Vercel Blob / CDN certs. The blob
+    # URLs are HTTPS signed URLs we generated ourselves so this is safe.
+    return httpx.AsyncClient(
+        verify=False,
+        http2=BLOB_HTTP2,
+        limits=httpx.Limits(
+            max_connections=BLOB_MAX_CONNECTIONS,
+            max_keepalive_connections=BLOB_MAX_KEEPALIVE,
+            keepalive_expiry=BLOB_KEEPALIVE_EXPIRY,
+        ),
+        event_hooks={"request": [_count_blob_request]},
+        transport=transport,
+    )
+
+
+def _blob_pool_stats() -> dict:
+    """Settings and request count of the shared blob client.
+
+    httpx does not expose its connection pool, so live connection counts
+    are not reported.
+    """
+    return {
+        "http2": BLOB_HTTP2,
+        "max_connections": BLOB_MAX_CONNECTIONS,
+        "max_keepalive": BLOB_MAX_KEEPALIVE,
+        "keepalive_expiry": BLOB_KEEPALIVE_EXPIRY,
+        "requests": int(BLOB_REQUESTS.value()),
+    }
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    app.state.blob_client = _create_blob_client()
+    app.state.blob_cache = BlobCache(BLOB_CACHE_DIR, BLOB_CACHE_MAX_BYTES)
+    app.state.result_cache = ResultCache(RESULT_CACHE_TTL, RESULT_CACHE_SIZE, RESULT_CACHE_DB)
+    app.state.analyzer_version = _analyzer_version(_get_analyzer_path())
+    app.state.analyzer_pool = AnalyzerPool(_get_analyzer_path(), ANALYZER_CONCURRENCY, ANALYZER_MAX_JOBS)
+    app.state.analyzer_pool.start()
+    app.state.job_queue = JobQueue(JOB_WORKERS, JOB_RETENTION)
+    app.state.job_queue.start()
+    app.state.batch_slots = asyncio.Semaphore(max(1, BATCH_CONCURRENCY))
+    app.state.admission = AdmissionController(ADMISSION_MAX_ACTIVE, ADMISSION_MAX_QUEUE, ADMISSION_MAX_BYTES)
+    try:
+        yield
+    finally:
+        await app.state.job_queue.close()
+        await app.state.analyzer_pool.close()
+        app.state.result_cache.close()
+        await app.state.blob_client.aclose()
+
+
+app = FastAPI(title="Deep Space Analyzer API", lifespan=lifespan)
+
+
+@app.get("/health")
+async def health() -> dict:
+    return {
+        "status": "ok",
+        "blob_pool": _blob_pool_stats(),
+        "blob_cache": app.state.blob_cache.stats(),
+        "result_cache": app.state.result_cache.stats(),
+        "jobs": app.state.job_queue.stats(),
+        "admission": app.state.admission.stats(),
+    }
+
+
+class BlobCache:
+    """Size-bounded on-disk cache of downloaded blobs.
+
+    File bodies are stored once per content hash under ``objects/``; an
+    index entry per blob URL (host and path, ignoring signed query strings)
+    records the object and its ETag for conditional re-requests. The least
+    recently used objects are evicted beyond ``max_bytes``.
+
+    Every method does blocking file I/O; call them from a worker thread. The
+    cache keeps a running total of its size, so the objects directory is only
+    scanned on first use and when the total goes over the limit.
+    """
+
+    def __init__(self, root: Path, max_bytes: int):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._bytes: Optional[int] = None
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def _index_path(self, url: str) -> Path:
+        parts = urlsplit(url)
+        key = hashlib.sha256(f"{parts.netloc}{parts.path}".encode()).hexdigest()
+        return self.root / "index" / f"{key}.json"
+
+    def lookup(self, url: str) -> Optional[dict]:
+        """Cached ``{"etag", "object"}`` for ``url``, if its object is still present."""
+        try:
+            entry = json.loads(self._index_path(url).read_text())
+        except (OSError, ValueError):
+            return None
+        obj = self.root / "objects" / entry.get("sha256", "")
+        if not entry.get("etag") or not obj.is_file():
+            return None
+        return {"etag": entry["etag"], "object": obj}
+
+    def read(self, obj: Path) -> bytes:
+        """Contents of a cached object; raises FileNotFoundError if it was evicted."""
+        data = obj.read_bytes()
+        os.utime(obj)
+        return data
+
+    def store(self, url: str, data: bytes, sha256: str, etag: Optional[str]) -> None:
+        """Save a completed download, index it under ``url`` and evict if over the limit."""
+        obj = self.root / "objects" / sha256
+        if not obj.is_file():
+            obj.parent.mkdir(parents=True, exist_ok=True)
+            tmp_obj = obj.with_suffix(f".{uuid.uuid4().hex}.tmp")
+            tmp_obj.write_bytes(data)
+            os.replace(tmp_obj, obj)
+            with self._lock:
+                if self._bytes is not None:
+                    self._bytes += len(data)
+        else:
+            os.utime(obj)
+        if etag:
+            index_path = self._index_path(url)
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_index = index_path.with_suffix(".tmp")
+            tmp_index.write_text(json.dumps({"sha256": sha256, "etag": etag}))
+            os.replace(tmp_index, index_path)
+        self.evict()
+
+    def _scan(self) -> list:
+        entries = []
+        try:
+            for entry in os.scandir(self.root / "objects"):
+                if not entry.name.endswith(".tmp"):
+                    st = entry.stat()
+                    entries.append((st.st_mtime, st.st_size, entry.path))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def evict(self) -> None:
+        """Remove least recently used objects until the cache fits ``max_bytes``."""
+        with self._lock:
+            if self._bytes is not None and self._bytes <= self.max_bytes:
+                return
+            # Rescan when over the limit: the order is by last use, and other
+            # processes may share the directory
+            entries = self._scan()
+            total = sum(size for _, size, _ in entries)
+            for _, size, path in sorted(entries):
+                if total <= self.max_bytes:
+                    break
+                try:
+                    os.unlink(path)
+                    total -= size
+                except OSError:
+                    pass
+            self._bytes = total
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses, "bytes": self._bytes}
+
+
+class ResultCache:
+    """Analysis results keyed by their inputs, with a TTL.
+
+    The in-memory layer holds the most recent ``max_entries`` results; with a
+    ``db_path`` every result is also written to SQLite so it survives
+    restarts and is shared by processes on the same disk. Methods may be
+    called from worker threads (``asyncio.to_thread``) and are serialized.
+    """
+
+    def __init__(self, ttl: float, max_entries: int, db_path: Optional[str] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._memory: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+        self._db = None
+        if db_path and self.enabled:
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "key TEXT PRIMARY KEY, student_id TEXT NOT NULL, created REAL NOT NULL, value TEXT NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_student ON results (student_id)")
+            self._db.commit()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    @staticmethod
+    def key(student_id: str, files: dict, assessment_profile: Optional[str], analyzer_version: str) -> str:
+        """Cache key from the student, ``{file name: sha256}``, profile and analyzer version."""
+        payload = json.dumps(
+            [student_id, sorted(files.items()), assessment_profile, analyzer_version], separators=(",", ":")
+        )
+        return hashlib.sha256(payload.encode()).hexdigest()
+
+    def get(self, key: str) -> Optional[dict]:
+        with self._lock:
+            return self._get(key)
+
+    def _get(self, key: str) -> Optional[dict]:
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry is None and self._db is not None:
+            row = self._db.execute("SELECT student_id, created, value FROM results WHERE key = ?", (key,)).fetchone()
+            if row is not None:
+                entry = (row[0], row[1], json.loads(row[2]))
+                self._remember(key, entry)
+        if entry is None or now - entry[1] > self.ttl:
+            if entry is not None:
+                self._drop(key)
+            self.misses += 1
+            return None
+        self._memory.move_to_end(key)
+        self.hits += 1
+        return entry[2]
+
+    def put(self, key: str, student_id: str, value: dict) -> None:
+        entry = (student_id, time.time(), value)
+        encoded = json.dumps(value) if self._db is not None else None
+        with self._lock:
+            self._remember(key, entry)
+            if self._db is not None:
+                self._db.execute(
+                    "INSERT OR REPLACE INTO results (key, student_id, created, value) VALUES (?, ?, ?, ?)",
+                    (key, student_id, entry[1], encoded),
+                )
+                self._db.commit()
+
+    def invalidate(self, student_id: Optional[str] = None) -> int:
+        """Drop every cached result, or only one student's. Returns the number dropped."""
+        with self._lock:
+            keys = [k for k, entry in self._memory.items() if student_id is None or entry[0] == student_id]
+            for k in keys:
+                del self._memory[k]
+            dropped = len(keys)
+            if self._db is not None:
+                if student_id is None:
+                    cur = self._db.execute("DELETE FROM results")
+                else:
+                    cur = self._db.execute("DELETE FROM results WHERE student_id = ?", (student_id,))
+                self._db.commit()
+                dropped = max(dropped, cur.rowcount)
+            return dropped
+
+    def _remember(self, key: str, entry: tuple) -> None:
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _drop(self, key: str) -> None:
+        self._memory.pop(key, None)
+        if self._db is not None:
+            self._db.execute("DELETE FROM results WHERE key = ?", (key,))
+            self._db.commit()
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "entries": len(self._memory), "hits": self.hits, "misses": self.misses}
+
+    def close(self) -> None:
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def _analyzer_version(analyzer_path: Path) -> str:
+    """Content hash of the analyzer script, so edits invalidate cached results."""
+    try:
+        return hashlib.sha256(analyzer_path.read_bytes()).hexdigest()[:16]
+    except OSError:
+        return "missing"
+
+
+class DownloadBytesBusy(HTTPException):
+    """503 for a request that would push download bytes in flight over ADMISSION_MAX_BYTES."""
+
+
+class AdmissionController:
+    """Global limits on concurrent analyses, waiting requests and download bytes.
+
+    Rejections carry a Retry-After estimated from a moving average of how
+    long admitted analyses take and how much work is already ahead.
+    """
+
+    def __init__(self, max_active: int, max_queue: int, max_bytes: int):
+        self.max_active = max(1, max_active)
+        self.max_queue = max_queue
+        self.max_bytes = max_bytes
+        self._slots = asyncio.Semaphore(self.max_active)
+        self.active = 0
+        self.waiting = 0
+        self.bytes_in_flight = 0
+        self._bytes_released = asyncio.Event()
+        # Exponential moving average of admitted analysis time (seconds)
+        self.service_time = 5.0
+
+    def retry_after(self) -> int:
+        ahead = self.active + self.waiting
+        return max(1, math.ceil(self.service_time * (ahead / self.max_active)))
+
+    def _reject(self, status_code: int, reason: str, detail: str) -> HTTPException:
+        REJECTIONS.inc(reason=reason)
+        error = DownloadBytesBusy if reason == "bytes" else HTTPException
+        return error(status_code=status_code, detail=detail, headers={"Retry-After": str(self.retry_after())})
+
+    def check(self, shed: bool = True) -> None:
+        """Raise 503 if download bytes are over the limit, or (``shed``) 429 if the queue is full."""
+        if self.bytes_in_flight >= self.max_bytes:
+            raise self._reject(503, "bytes", "Server is busy downloading; retry later")
+        if shed and self._slots.locked() and self.waiting >= self.max_queue:
+            raise self._reject(429, "queue", "Too many analyses in progress; retry later")
+
+    @asynccontextmanager
+    async def admit(self, shed: bool = True):
+        """Hold one analysis slot, waiting in line for it; see ``check``."""
+        self.check(shed)
+        self.waiting += 1
+        IN_FLIGHT.inc(kind="queued")
+        try:
+            await self._slots.acquire()
+        finally:
+            self.waiting -= 1
+            IN_FLIGHT.dec(kind="queued")
+        self.active += 1
+        started = time.perf_counter()
+        try:
+            yield
+            self.service_time += 0.2 * (time.perf_counter() - started - self.service_time)
+        finally:
+            self.active -= 1
+            self._slots.release()
+
+    def take_bytes(self, n: int) -> None:
+        self.bytes_in_flight += n
+        IN_FLIGHT.inc(n, kind="download_bytes")
+        if self.bytes_in_flight > self.max_bytes:
+            raise self._reject(503, "bytes", "Server is busy downloading; retry later")
+
+    def release_bytes(self, n: int) -> None:
+        self.bytes_in_flight -= n
+        IN_FLIGHT.dec(n, kind="download_bytes")
+        if n:
+            # Wake everyone in wait_for_bytes, then start a new round
+            self._bytes_released.set()
+            self._bytes_released = asyncio.Event()
+
+    async def wait_for_bytes(self) -> None:
+        """Wait until another request releases download bytes."""
+        await self._bytes_released.wait()
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active,
+            "waiting": self.waiting,
+            "bytes_in_flight": self.bytes_in_flight,
+            "service_time": round(self.service_time, 3),
+            "retry_after": self.retry_after(),
+        }
+
+
+class _ByteBudget:
+    """Bytes downloaded so far for one request, against DOWNLOAD_MAX_TOTAL_BYTES.
+
+    With an ``admission`` controller the bytes also count toward its global
+    in-flight limit until ``release``.
+    """
+
+    def __init__(self, limit: int, admission: Optional[AdmissionController] = None):
+        self.limit = limit
+        self.admission = admission
+        self.used = 0
+
+    def take(self, n: int) -> None:
+        self.used += n
+        if self.admission is not None:
+            self.admission.take_bytes(n)
+        if self.used > self.limit:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Files exceed the {self.limit / (1024 * 1024):g} MB per-request download limit",
+            )
+
+    def release(self) -> None:
+        if self.admission is not None:
+            self.admission.release_bytes(self.used)
+        self.used = 0
+
+
+async def _download_file(
+    client: httpx.AsyncClient,
+    url: str,
+    token: Optional[str] = None,
+    budget: Optional[_ByteBudget] = None,
+    cache: Optional[BlobCache] = None,
+    revalidate: bool = True,
+) -> Tuple[bytes, str]:
+    """Download ``url`` into memory; returns its content and SHA-256.
+
+    With a ``cache``, a cached copy is revalidated with its ETag unless
+    ``revalidate`` is false. Cache I/O runs in a worker thread.
+    """
     headers = {}
     if token:
         headers["Authorization"] = f"Bearer {token}"
+    use_cache = cache is not None and cache.enabled
+    cached = await asyncio.to_thread(cache.lookup, url) if use_cache and revalidate else None
+    if cached:
+        headers["If-None-Match"] = cached["etag"]
+    too_large = HTTPException(
+        status_code=413,
+        detail=f"File exceeds the {DOWNLOAD_MAX_FILE_BYTES / (1024 * 1024):g} MB download limit: {url}",
+    )
     try:
         # Follow redirects — Vercel Blob signed URLs typically redirect once.
         async with client.stream("GET", url, headers=headers, timeout=120, follow_redirects=True) as resp:
+            if resp.status_code == 304 and cached:
+                try:
+                    data = await asyncio.to_thread(cache.read, cached["object"])
+                except FileNotFoundError:
+                    # Evicted since the lookup: fetch the body after all
+                    await resp.aclose()
+                    return await _download_file(client, url, token, budget, cache, revalidate=False)
+                cache.hits += 1
+                if budget is not None:
+                    budget.take(len(data))
+                DOWNLOADS.inc(source="cache")
+                DOWNLOAD_BYTES.inc(len(data))
+                return data, cached["object"].name
             if resp.status_code != 200:
                 raise HTTPException(status_code=502, detail=f"Download failed ({resp.status_code}) for {url}")
-            dest.parent.mkdir(parents=True, exist_ok=True)
-            with dest.open("wb") as f:
-                async for chunk in resp.aiter_bytes():
-                    f.write(chunk)
+            declared = resp.headers.get("content-length")
+            if declared and declared.isdigit() and int(declared) > DOWNLOAD_MAX_FILE_BYTES:
+                raise too_large
+
+            digest = hashlib.sha256()
+            chunks = []
+            received = 0
+            async for chunk in resp.aiter_bytes():
+                received += len(chunk)
+                if received > DOWNLOAD_MAX_FILE_BYTES:
+                    raise too_large
+                if budget is not None:
+                    budget.take(len(chunk))
+                digest.update(chunk)
+                chunks.append(chunk)
+            data = b"".join(chunks)
+            if use_cache:
+                cache.misses += 1
+                await asyncio.to_thread(cache.store, url, data, digest.hexdigest(), resp.headers.get("etag"))
+            DOWNLOADS.inc(source="network")
+            DOWNLOAD_BYTES.inc(received)
+            return data, digest.hexdigest()
     except httpx.RequestError as exc:
         raise HTTPException(status_code=502, detail=f"Error downloading {url}: {exc}") from exc
 
 
-@app.post("/analyze", response_model=AnalyzeResponse)
-async def analyze(req: AnalyzeRequest) -> AnalyzeResponse:
+def _target_name(student_id: str, name: str) -> str:
+    """The name the analyzer sees for an uploaded file: no folders, a .pdf suffix and the student ID first."""
+    safe_name = PurePosixPath(name.replace("\\", "/")).name or f"{student_id}.pdf"
+    if not safe_name.lower().endswith(".pdf"):
+        safe_name += ".pdf"
+    if not safe_name.startswith(student_id):
+        safe_name = f"{student_id}_" + safe_name
+    return safe_name
+
+
+async def _download_files(
+    client: httpx.AsyncClient,
+    req: "AnalyzeRequest",
+    cache: Optional[BlobCache] = None,
+    emit: Optional[Callable] = None,
+    budget: Optional[_ByteBudget] = None,
+) -> Tuple[dict, dict]:
+    """Download all of a request's files concurrently into memory.
+
+    At most DOWNLOAD_CONCURRENCY transfers run at once. The first failure
+    cancels the remaining downloads and is raised. Returns ``{name: bytes}``
+    and ``{name: sha256}`` keyed by the name the analyzer sees.
+    ``emit(event, **data)`` is told when downloading starts and as each file
+    finishes.
+    """
+    targets = {_target_name(req.studentId, f.name): f.url for f in req.files}
+
+    slots = asyncio.Semaphore(DOWNLOAD_CONCURRENCY)
+    budget = budget or _ByteBudget(DOWNLOAD_MAX_TOTAL_BYTES)
+    emit = emit or _ignore_progress
+    emit("download_started", files=len(targets))
+
+    async def fetch(name: str, url: str) -> Tuple[bytes, str]:
+        async with slots:
+            started = time.perf_counter()
+            IN_FLIGHT.inc(kind="downloads")
+            try:
+                data, digest = await _download_file(client, url, req.blobToken, budget, cache)
+            finally:
+                IN_FLIGHT.dec(kind="downloads")
+        emit("file_downloaded", file=name, bytes=len(data), seconds=round(time.perf_counter() - started, 4))
+        return data, digest
+
+    tasks = [asyncio.create_task(fetch(name, url)) for name, url in targets.items()]
+    try:
+        fetched = dict(zip(targets, await asyncio.gather(*tasks)))
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    documents = {name: data for name, (data, _) in fetched.items()}
+    digests = {name: digest for name, (_, digest) in fetched.items()}
+    return documents, digests
+
+
+def _dumps(obj) -> bytes:
+    """Compact UTF-8 JSON, with orjson when it is installed."""
+    if ORJSON_AVAILABLE:
+        return orjson.dumps(obj, default=str)
+    return json.dumps(obj, default=str, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def _accepted_encodings(header: str) -> dict:
+    """q-value of each content coding named in an Accept-Encoding header, "*" included."""
+    accepted = {}
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        coding = coding.strip().lower()
+        q = params.strip()
+        if q.startswith("q="):
+            try:
+                accepted[coding] = float(q[2:])
+            except ValueError:
+                continue
+        elif coding:
+            accepted[coding] = 1.0
+    return accepted
+
+
+def _response_encoding(header: str) -> Optional[str]:
+    """The coding to compress a response with, or None to send it as is.
+
+    Picks the highest rated of br (when brotli is installed) and gzip; codings
+    the header does not name get the "*" rating, and br wins ties.
+    """
+    accepted = _accepted_encodings(header)
+    offered = ["br", "gzip"] if BROTLI_AVAILABLE else ["gzip"]
+    q, coding = max(((accepted.get(c, accepted.get("*", 0)), c) for c in offered), key=lambda rated: rated[0])
+    return coding if q > 0 else None
+
+
+def _json_response(request: Request, payload, status_code: int = 200, headers: Optional[dict] = None) -> Response:
+    """Serialize ``payload`` once, skipping response-model validation, and compress it if the client accepts it."""
+    body = _dumps(payload)
+    headers = {**(headers or {}), "Vary": "Accept-Encoding"}
+    if len(body) >= RESPONSE_COMPRESS_MIN_BYTES:
+        coding = _response_encoding(request.headers.get("accept-encoding", ""))
+        if coding == "br":
+            body = brotli.compress(body, quality=RESPONSE_BROTLI_QUALITY)
+        elif coding == "gzip":
+            body = gzip.compress(body, compresslevel=RESPONSE_GZIP_LEVEL, mtime=0)
+        if coding:
+            headers["Content-Encoding"] = coding
+    return Response(body, status_code=status_code, headers=headers, media_type="application/json")
+
+
+def _request_deadline(request: Request) -> Optional[float]:
+    """Event-loop time by which the request's X-Request-Timeout (seconds) runs out."""
+    value = request.headers.get(DEADLINE_HEADER)
+    if value is None:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        seconds = 0
+    if not seconds > 0:
+        raise HTTPException(status_code=400, detail=f"{DEADLINE_HEADER} must be a positive number of seconds")
+    return asyncio.get_running_loop().time() + seconds
+
+
+async def _wait_for_disconnect(request: Request) -> None:
+    while not await request.is_disconnected():
+        await asyncio.sleep(DISCONNECT_POLL_INTERVAL)
+
+
+async def _run_cancellable(work: Awaitable, deadline: Optional[float] = None, request: Optional[Request] = None):
+    """Await ``work``, cancelling it if ``request``'s client disconnects or ``deadline`` passes.
+
+    A disconnect raises 499 and a missed deadline 504; either is counted in
+    deep_space_cancellations_total.
+    """
+    task = asyncio.ensure_future(work)
+    watcher = asyncio.create_task(_wait_for_disconnect(request)) if request is not None else None
+    timeout = None if deadline is None else max(0.0, deadline - asyncio.get_running_loop().time())
+    try:
+        done, _ = await asyncio.wait({task, watcher} - {None}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+        if task in done:
+            return task.result()
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        if not task.done():
+            task.cancel()
+            await asyncio.gather(task, return_exceptions=True)
+    if watcher in done:
+        CANCELLATIONS.inc(reason="disconnect")
+        raise HTTPException(status_code=499, detail="Client closed request")
+    CANCELLATIONS.inc(reason="deadline")
+    raise HTTPException(status_code=504, detail="Request deadline exceeded")
+
+
+def _ignore_progress(event: str, **data) -> None:
+    pass
+
+
+def _validate_request(req: AnalyzeRequest) -> None:
     if not req.studentId.strip():
         raise HTTPException(status_code=400, detail="studentId is required")
     if not req.files:
         raise HTTPException(status_code=400, detail="At least one file is required")
+    # Two files with one target name would silently replace each other
+    seen = set()
+    for f in req.files:
+        name = _target_name(req.studentId, f.name)
+        if name in seen:
+            raise HTTPException(status_code=400, detail=f"More than one file would be analyzed as {name}")
+        seen.add(name)
 
     analyzer_path = _get_analyzer_path()
     if not analyzer_path.exists():
         raise HTTPException(status_code=500, detail=f"Analyzer script not found at {analyzer_path}")
 
-    work_root = Path(tempfile.mkdtemp(prefix="deep-space-"))
-    ieps_dir = work_root / "ieps"
-    audit_dir = work_root / "audit"
+
+async def _run_analysis(
+    req: AnalyzeRequest, emit: Optional[Callable] = None, shed: bool = False
+) -> Tuple[dict, Optional[str]]:
+    """Download and analyze ``req``'s files once admission control allows.
+
+    Returns the ``{"analysis", "report"}`` result and the result cache status
+    (``"hit"``, ``"miss"`` or None when the cache is off). ``emit(event,
+    **data)`` receives download, cache and analyzer progress events. With
+    ``shed`` the request is rejected rather than queued when the server is
+    saturated.
+    """
+    async with app.state.admission.admit(shed):
+        return await _analyze_admitted(req, emit or _ignore_progress)
+
+
+async def _analyze_admitted(req: AnalyzeRequest, emit: Callable) -> Tuple[dict, Optional[str]]:
+    budget = _ByteBudget(DOWNLOAD_MAX_TOTAL_BYTES, app.state.admission)
+    IN_FLIGHT.inc(kind="analyses")
+    started = time.perf_counter()
 
     try:
-        # verify=False is intentional here: Render's container CA bundle can
-        # be incomplete and fails to verify Vercel Blob / CDN certs. The blob
-        # URLs are HTTPS signed URLs we generated ourselves so this is safe.
-        async with httpx.AsyncClient(verify=False) as client:
-            for f in req.files:
-                safe_name = f.name or f"{req.studentId}.pdf"
-                if not safe_name.lower().endswith(".pdf"):
-                    safe_name += ".pdf"
-                if not safe_name.startswith(req.studentId):
-                    safe_name = f"{req.studentId}_" + safe_name
-                dest = ieps_dir / safe_name
-                await _download_file(client, f.url, dest, req.blobToken)
-
-        env = os.environ.copy()
-        env["GALEXII_IEP_FOLDER"] = str(ieps_dir)
-        env["GALEXII_OUTPUT_FOLDER"] = str(audit_dir)
-        if req.assessmentProfile:
-            env["GALEXII_ASSESSMENT_PROFILE"] = req.assessmentProfile
-
-        import subprocess
+        documents, digests = await _download_files(app.state.blob_client, req, app.state.blob_cache, emit, budget)
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="download")
 
+        result_cache = app.state.result_cache
+        cache_key = None
+        if result_cache.enabled:
+            cache_key = ResultCache.key(req.studentId, digests, req.assessmentProfile, app.state.analyzer_version)
+            cached = await asyncio.to_thread(result_cache.get, cache_key)
+            if cached is not None:
+                emit("cache_hit")
+                ANALYSES.inc(outcome="cache_hit")
+                return cached, "hit"
+
+        emit("analysis_started")
         try:
-            completed = subprocess.run(
-                ["python3", str(analyzer_path), "--student", req.studentId],
-                cwd=str(work_root),
-                env=env,
-                capture_output=True,
-                text=True,
-                timeout=120,
+            result = await app.state.analyzer_pool.run(
+                ANALYZER_TIMEOUT,
+                on_progress=None if emit is _ignore_progress else lambda event, data: emit(event, **data),
+                student_id=req.studentId,
+                documents=documents,
+                assessment_profile=req.assessmentProfile,
             )
-        except FileNotFoundError as exc:
-            raise HTTPException(status_code=500, detail="python3 is not available in this environment") from exc
-        except subprocess.TimeoutExpired as exc:
+        except asyncio.TimeoutError as exc:
+            ANALYSES.inc(outcome="timeout")
             raise HTTPException(status_code=504, detail="Analyzer timed out") from exc
+        except (AnalyzerError, EOFError, OSError) as exc:
+            ANALYSES.inc(outcome="error")
+            raise HTTPException(status_code=500, detail=f"Analyzer failed: {str(exc)[:4000]}") from exc
 
-        if completed.returncode != 0:
-            raise HTTPException(status_code=500, detail=f"Analyzer failed: {completed.stderr[:4000]}")
+        ANALYSES.inc(outcome="ok")
+        _record_analyzer_timings(result.pop("timings", {}))
+        STAGE_SECONDS.observe(time.perf_counter() - started, stage="total")
+        if cache_key is not None:
+            await asyncio.to_thread(result_cache.put, cache_key, req.studentId, result)
+        return result, "miss" if cache_key is not None else None
 
-        base = f"DEEP_DIVE_{req.studentId}"
-        json_path = audit_dir / f"{base}.json"
-        md_path = audit_dir / f"{base}_REPORT.md"
+    finally:
+        budget.release()
+        IN_FLIGHT.dec(kind="analyses")
 
-        if not json_path.exists():
-            raise HTTPException(status_code=500, detail=f"Expected analysis file not found: {json_path}")
 
-        import json
+@app.post("/analyze", response_model=AnalyzeResponse)
+async def analyze(req: AnalyzeRequest, request: Request) -> Response:
+    _validate_request(req)
+    deadline = _request_deadline(request)
+    result, cache_status = await _run_cancellable(_run_analysis(req, shed=True), deadline, request)
+    headers = {"X-Result-Cache": cache_status} if cache_status else None
+    # The analyzer's output is already plain JSON data; serialize it as is
+    return _json_response(request, {"analysis": result["analysis"], "report": result["report"]}, headers=headers)
 
-        with json_path.open("r", encoding="utf-8") as jf:
-            analysis = json.load(jf)
 
-        report_text: Optional[str] = None
-        if md_path.exists():
-            report_text = md_path.read_text(encoding="utf-8")
+# Job stage entered on each progress event
+_EVENT_STAGES = {
+    "download_started": "downloading",
+    "cache_hit": "cached",
+    "analysis_started": "analyzing",
+    "documents_found": "extracting",
+    "module_started": "analyzing",
+}
 
-        return AnalyzeResponse(analysis=analysis, report=report_text)
 
-    finally:
+async def _analyze_batch_student(req: AnalyzeRequest, deadline: Optional[float] = None) -> dict:
+    """One NDJSON line of a batch: the student's result or error.
+
+    A student turned away because too many download bytes are in flight
+    waits for other downloads to finish and is tried again, rather than
+    failing, unless nothing else holds bytes it could wait for.
+    """
+    admission = app.state.admission
+    try:
+        _validate_request(req)
+        async with app.state.batch_slots:
+            while True:
+                try:
+                    result, cache_status = await _run_cancellable(_run_analysis(req), deadline)
+                    break
+                except DownloadBytesBusy:
+                    if admission.bytes_in_flight == 0:
+                        raise
+                    await _run_cancellable(admission.wait_for_bytes(), deadline)
+    except HTTPException as exc:
+        return {"studentId": req.studentId, "status": exc.status_code, "error": exc.detail}
+    except Exception as exc:
+        return {"studentId": req.studentId, "status": 500, "error": f"Analysis failed: {str(exc)[:4000]}"}
+    return {
+        "studentId": req.studentId,
+        "status": 200,
+        "cache": cache_status,
+        "analysis": result["analysis"],
+        "report": result["report"],
+    }
+
+
+@app.post("/analyze/batch")
+async def analyze_batch(batch: BatchRequest, request: Request) -> StreamingResponse:
+    """Analyze many students, streaming one JSON line per student as each finishes.
+
+    Students not finished by the X-Request-Timeout deadline get a 504 line.
+    """
+    deadline = _request_deadline(request)
+    if not batch.students:
+        raise HTTPException(status_code=400, detail="At least one student is required")
+    if len(batch.students) > BATCH_MAX_STUDENTS:
+        raise HTTPException(status_code=400, detail=f"At most {BATCH_MAX_STUDENTS} students per batch")
+    app.state.admission.check(shed=False)
+
+    students = [
+        req.model_copy(update={
+            "assessmentProfile": req.assessmentProfile or batch.assessmentProfile,
+            "blobToken": req.blobToken or batch.blobToken,
+        })
+        for req in batch.students
+    ]
+
+    async def stream():
+        tasks = [asyncio.create_task(_analyze_batch_student(req, deadline)) for req in students]
         try:
-            shutil.rmtree(work_root)
-        except Exception:
-            pass
+            for finished in asyncio.as_completed(tasks):
+                yield _dumps(await finished) + b"\n"
+        finally:
+            unfinished = [task for task in tasks if not task.done()]
+            if unfinished:
+                # The client went away: stop the students still waiting or running
+                for task in unfinished:
+                    task.cancel()
+                CANCELLATIONS.inc(len(unfinished), reason="disconnect")
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+class Job:
+    """One queued analysis, its progress and its event log for streaming."""
+
+    def __init__(self, req: JobRequest):
+        self.id = uuid.uuid4().hex
+        self.req = req
+        self.state = "queued"
+        self.stage = "queued"
+        self.progress: dict = {}
+        self.submitted_at = time.time()
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.error: Optional[dict] = None
+        self.result: Optional[dict] = None
+        self.events: List[Tuple[str, dict]] = []
+        self._changed = asyncio.Event()
+        # Event-loop time after which the job is abandoned (X-Request-Timeout)
+        self.deadline: Optional[float] = None
+        self.task: Optional[asyncio.Task] = None
+        self.cancel_requested = False
+
+    def emit(self, event: str, **data) -> None:
+        self.stage = _EVENT_STAGES.get(event, self.stage)
+        progress = self.progress
+        if event == "download_started":
+            progress.update(files_total=data["files"], files_downloaded=0)
+        elif event == "file_downloaded":
+            progress["files_downloaded"] += 1
+        elif event == "documents_found":
+            progress.update(documents_total=len(data["documents"]), documents_extracted=0)
+        elif event == "document_extracted":
+            progress["documents_extracted"] = progress.get("documents_extracted", 0) + 1
+        elif event == "module_started":
+            progress["module"] = data["module"]
+        elif event == "module_finished":
+            progress["modules_finished"] = progress.get("modules_finished", 0) + 1
+        self.events.append((event, data))
+        self._wake()
+
+    def finish(self, state: str) -> None:
+        self.state = state
+        if state == "succeeded":
+            self.stage = "done"
+        self.progress.pop("module", None)
+        self.finished_at = time.time()
+        self._wake()
+
+    async def wait_finished(self) -> None:
+        while self.finished_at is None:
+            await self._changed.wait()
+
+    def _wake(self) -> None:
+        self._changed.set()
+        self._changed = asyncio.Event()
+
+    async def follow(self, after: int = -1):
+        """Yield ``(id, event, data)`` for events after ``after``, live until the job ends.
+
+        The last item is a ``result`` or ``error`` event. ``None`` is yielded
+        when nothing happened for SSE_KEEPALIVE seconds.
+        """
+        index = after + 1
+        while True:
+            changed = self._changed
+            while index < len(self.events):
+                event, data = self.events[index]
+                yield index, event, data
+                index += 1
+            if self.finished_at is not None:
+                break
+            try:
+                await asyncio.wait_for(changed.wait(), SSE_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield None
+        if self.result is not None:
+            yield index, "result", self.result
+        else:
+            yield index, "error", self.error or {}
+
+    def status(self) -> dict:
+        """The job as a JobStatus-shaped dict."""
+        result = None
+        if self.result is not None:
+            result = {"analysis": self.result["analysis"], "report": self.result["report"]}
+        return {
+            "id": self.id,
+            "studentId": self.req.studentId,
+            "state": self.state,
+            "stage": self.stage,
+            "priority": self.req.priority,
+            "progress": self.progress,
+            "submittedAt": self.submitted_at,
+            "startedAt": self.started_at,
+            "finishedAt": self.finished_at,
+            "error": self.error,
+            "result": result,
+        }
+
+
+class JobQueue:
+    """Background analysis jobs run by a fixed number of workers.
+
+    Jobs start highest ``priority`` first, in submission order within a
+    priority. Finished jobs are forgotten ``retention`` seconds after they end.
+    """
+
+    def __init__(self, workers: int, retention: float):
+        self.workers = max(1, workers)
+        self.retention = retention
+        self.jobs: dict = {}
+        self._queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
+        self._order = itertools.count()
+        self._tasks: List[asyncio.Task] = []
+
+    def start(self) -> None:
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    def submit(self, req: JobRequest, deadline: Optional[float] = None) -> Job:
+        self.prune()
+        job = Job(req)
+        job.deadline = deadline
+        self.jobs[job.id] = job
+        self._queue.put_nowait((-req.priority, next(self._order), job))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        self.prune()
+        return self.jobs.get(job_id)
+
+    def prune(self) -> None:
+        cutoff = time.time() - self.retention
+        for job_id in [k for k, job in self.jobs.items() if job.finished_at and job.finished_at < cutoff]:
+            del self.jobs[job_id]
+
+    async def _work(self) -> None:
+        while True:
+            _, _, job = await self._queue.get()
+            if job.cancel_requested:
+                continue
+            job.state = "running"
+            job.started_at = time.time()
+            job.task = asyncio.create_task(_run_analysis(job.req, job.emit))
+            try:
+                job.result, _ = await _run_cancellable(job.task, job.deadline)
+                job.finish("succeeded")
+            except asyncio.CancelledError:
+                if job.cancel_requested:
+                    job.finish("cancelled")
+                # A user's cancel stops only the job; close() cancelling this
+                # worker (even while that job is being cancelled) stops the worker
+                if not job.cancel_requested or asyncio.current_task().cancelling():
+                    raise
+            except HTTPException as exc:
+                job.error = {"status": exc.status_code, "detail": exc.detail}
+                job.finish("failed")
+            except Exception as exc:
+                job.error = {"status": 500, "detail": f"Job failed: {str(exc)[:4000]}"}
+                job.finish("failed")
+
+    def stats(self) -> dict:
+        states = {"queued": 0, "running": 0, "succeeded": 0, "failed": 0, "cancelled": 0}
+        for job in self.jobs.values():
+            states[job.state] += 1
+        return {"workers": self.workers, **states}
+
+    def cancel(self, job: Job) -> None:
+        """Stop a queued or running job; finished jobs are left as they are."""
+        if job.finished_at is not None or job.cancel_requested:
+            return
+        job.cancel_requested = True
+        job.error = {"status": 499, "detail": "Job cancelled"}
+        CANCELLATIONS.inc(reason="job_cancelled")
+        if job.task is not None:
+            job.task.cancel()
+        else:
+            job.finish("cancelled")
+
+    async def close(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+
+@app.post("/jobs", response_model=JobStatus, status_code=202)
+async def submit_job(req: JobRequest, request: Request) -> Response:
+    _validate_request(req)
+    queue = app.state.job_queue
+    if queue.stats()["queued"] >= JOB_MAX_QUEUED:
+        REJECTIONS.inc(reason="jobs")
+        retry_after = math.ceil(app.state.admission.service_time * (JOB_MAX_QUEUED / queue.workers))
+        raise HTTPException(
+            status_code=429, detail="Too many jobs queued; retry later", headers={"Retry-After": str(retry_after)}
+        )
+    app.state.admission.check(shed=False)
+    job = queue.submit(req, _request_deadline(request))
+    return _json_response(request, job.status(), status_code=202)
+
+
+@app.get("/jobs/{job_id}", response_model=JobStatus)
+async def get_job(job_id: str, request: Request) -> Response:
+    job = app.state.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _json_response(request, job.status())
+
+
+@app.delete("/jobs/{job_id}")
+async def cancel_job(job_id: str, request: Request) -> Response:
+    job = app.state.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    app.state.job_queue.cancel(job)
+    await job.wait_finished()
+    return _json_response(request, job.status())
+
+
+@app.get("/jobs/{job_id}/events")
+async def job_events(job_id: str, last_event_id: Optional[str] = Header(None)) -> StreamingResponse:
+    """Server-Sent Events for a job, replayed from the start (or ``Last-Event-ID``)."""
+    job = app.state.job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    after = int(last_event_id) if last_event_id and last_event_id.isdigit() else -1
+
+    async def stream():
+        async for item in job.follow(after):
+            if item is None:
+                yield b": keep-alive\n\n"
+                continue
+            index, event, data = item
+            yield b"id: %d\nevent: %s\ndata: %s\n\n" % (index, event.encode(), _dumps(data))
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    """Prometheus text-format metrics."""
+    lines = []
+    for metric in METRICS:
+        lines.extend(metric.render())
+    jobs = app.state.job_queue.stats()
+    lines += ["# HELP deep_space_jobs Jobs by state.", "# TYPE deep_space_jobs gauge"]
+    lines += [
+        f'deep_space_jobs{{state="{state}"}} {jobs[state]}'
+        for state in ("queued", "running", "succeeded", "failed", "cancelled")
+    ]
+    lines += [
+        "# HELP deep_space_analyzer_workers_idle Analyzer worker processes waiting for a job.",
+        "# TYPE deep_space_analyzer_workers_idle gauge",
+        f"deep_space_analyzer_workers_idle {app.state.analyzer_pool.idle}",
+    ]
+    return PlainTextResponse("\n".join(lines) + "\n", media_type="text/plain; version=0.0.4")
+
+
+@app.delete("/cache")
+async def clear_result_cache() -> dict:
+    return {"invalidated": await asyncio.to_thread(app.state.result_cache.invalidate)}
+
+
+@app.delete("/cache/{student_id}")
+async def invalidate_student_results(student_id: str) -> dict:
+    return {"invalidated": await asyncio.to_thread(app.state.result_cache.invalidate, student_id)}
 
 
 if __name__ == "__main__":
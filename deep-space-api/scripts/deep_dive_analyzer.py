@@ -6,18 +6,45 @@ Automated IEP document analysis for case managers
 Usage:
     python3 scripts/deep_dive_analyzer.py --student 10147287
     python3 scripts/deep_dive_analyzer.py --all  # Process all students
+    python3 scripts/deep_dive_analyzer.py --all --workers 8  # ...across 8 processes
     python3 scripts/deep_dive_analyzer.py --student 10147287 --map-file input/_REFERENCE/MAP_StudentProfile.xlsx
 """
 
 import os
 import re
 import json
+import fnmatch
+import gzip
+import hashlib
+import shutil
 import subprocess
+import sys
+import tempfile
+import threading
+import time
 from datetime import datetime, timedelta
 from pathlib import Path
-from collections import defaultdict
-from difflib import SequenceMatcher
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager, nullcontext
+from functools import cached_property
 import argparse
+import sqlite3
+from array import array
+import bisect
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+
+# BatteryScanner reads literal prefixes out of CPython's regex parser. Those
+# modules are private, so anything missing or unexpected here only turns the
+# scanner's shortcut off (see SRE_PARSER_AVAILABLE below).
+try:  # Python 3.11+
+    import re._parser as _sre_parse
+    from re._constants import AT, AT_BOUNDARY, BRANCH, LITERAL, SUBPATTERN
+except ImportError:  # pragma: no cover - older interpreters
+    try:
+        import sre_parse as _sre_parse
+        from sre_constants import AT, AT_BOUNDARY, BRANCH, LITERAL, SUBPATTERN
+    except ImportError:
+        _sre_parse = None
 
 # Configuration - supports environment variables for web app integration
 IEP_FOLDER = Path(os.environ.get("GALEXII_IEP_FOLDER", "ieps"))
@@ -50,13 +77,1175 @@ TELPAS_CSV_PATH = REFERENCE_FOLDER / "Telpas_By_Student-2.csv"
 BIP_CSV_PATH = REFERENCE_FOLDER / "IEP_Students_With_A_BIP-2.csv"
 TRANSPORT_CSV_PATH = REFERENCE_FOLDER / "Transportation_By_Student.csv"
 
+# PDF text extraction: concurrent pdftotext calls per student, each capped at
+# PDFTOTEXT_TIMEOUT seconds, all sharing one per-student time budget.
+EXTRACT_WORKERS = int(os.environ.get("GALEXII_EXTRACT_WORKERS", "4"))
+EXTRACT_BUDGET_SECONDS = float(os.environ.get("GALEXII_EXTRACT_BUDGET", "90"))
+PDFTOTEXT_TIMEOUT = 30
+PDFTOTEXT_FLAGS = ["-layout"]
+
+# Extracted-text cache, shared across runs and API requests on the same host.
+# Set GALEXII_TEXT_CACHE_MB=0 to disable.
+TEXT_CACHE_DIR = Path(os.environ.get("GALEXII_TEXT_CACHE_DIR", Path(tempfile.gettempdir()) / "galexii-text-cache"))
+TEXT_CACHE_MAX_BYTES = int(float(os.environ.get("GALEXII_TEXT_CACHE_MB", "512")) * 1024 * 1024)
+
+# District-wide section fingerprint index for cross-student copy/paste.
+# Refreshed for the whole cohort at the start of --all runs and queried by every analysis;
+# set GALEXII_SECTION_INDEX to an empty string to disable.
+SECTION_INDEX_PATH = os.environ.get("GALEXII_SECTION_INDEX", str(OUTPUT_FOLDER / "SECTION_FINGERPRINTS.sqlite"))
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# PATTERN REGISTRY
+# ─────────────────────────────────────────────────────────────────────────────
+class PatternBattery:
+    """An ordered, named list of (compiled pattern, label) pairs."""
+
+    def __init__(self, name: str, entries: list, flags: int = 0):
+        self.name = name
+        self.flags = flags
+        self.entries = entries
+
+    def __iter__(self):
+        return iter(self.entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @property
+    def sources(self) -> list[str]:
+        return [pattern.pattern for pattern, _ in self.entries]
+
+    def pattern(self, label: str) -> re.Pattern:
+        """Return the compiled pattern registered under ``label``."""
+        for pattern, entry_label in self.entries:
+            if entry_label == label:
+                return pattern
+        raise KeyError(label)
+
+
+class PatternRegistry:
+    """Module-level registry of the extractors' regex batteries.
+
+    Every pattern is compiled once, with its flags, when the module loads, so
+    batch runs never recompile in hot loops or depend on ``re``'s small
+    internal cache. Proximity patterns assembled at runtime (e.g. dismissal
+    language near an SLD area) are compiled on first use and memoized here.
+    """
+
+    def __init__(self):
+        self._batteries: dict[str, PatternBattery] = {}
+        self._derived: dict[tuple, re.Pattern] = {}
+
+    def add(self, name: str, patterns: list, flags: int = 0) -> PatternBattery:
+        """Compile and register a battery of ``(pattern, label)`` pairs or bare patterns."""
+        entries = []
+        for item in patterns:
+            source, label = item if isinstance(item, tuple) else (item, item)
+            if any(label == existing for _, existing in entries):
+                raise ValueError(f"Duplicate label {label!r} in pattern battery {name!r}")
+            entries.append((re.compile(source, flags), label))
+        battery = PatternBattery(name, entries, flags)
+        self._batteries[name] = battery
+        return battery
+
+    def __getitem__(self, name: str) -> PatternBattery:
+        return self._batteries[name]
+
+    def __iter__(self):
+        return iter(self._batteries.values())
+
+    def __len__(self) -> int:
+        """Total number of registered patterns across all batteries."""
+        return sum(len(b) for b in self._batteries.values())
+
+    def names(self) -> list[str]:
+        return list(self._batteries)
+
+    def scanner(self, *names: str) -> "BatteryScanner":
+        """Return a (memoized) single-pass scanner over the named batteries."""
+        key = ("scanner",) + names
+        scanner = self._derived.get(key)
+        if scanner is None:
+            scanner = BatteryScanner([self._batteries[name] for name in names])
+            self._derived[key] = scanner
+        return scanner
+
+    def near(self, first: str, second: str, gap: int, flags: int = 0) -> re.Pattern:
+        """Return a compiled ``first.{0,gap}second`` pattern, memoized."""
+        key = (first, second, gap, flags)
+        pattern = self._derived.get(key)
+        if pattern is None:
+            pattern = re.compile(f"{first}.{{0,{gap}}}{second}", flags)
+            self._derived[key] = pattern
+        return pattern
+
+
+def _literal_prefixes(items) -> list[str] | None:
+    """Literal strings one of which every match of a parsed pattern starts with.
+
+    Leading word boundaries are skipped since they are zero-width. Returns
+    None when the pattern can start with something other than a literal
+    (a character class, optional group, etc.).
+    """
+    prefix = ""
+    for op, av in items:
+        if op is AT and av is AT_BOUNDARY and not prefix:
+            continue
+        if op is LITERAL:
+            prefix += chr(av)
+            continue
+        if op is BRANCH:
+            found = []
+            for branch in av[1]:
+                branch_prefixes = _literal_prefixes(branch.data)
+                if branch_prefixes is None:
+                    return [prefix] if prefix else None
+                found.extend(prefix + p for p in branch_prefixes)
+            return found
+        if op is SUBPATTERN and not prefix:
+            return _literal_prefixes(av[-1].data)
+        return [prefix] if prefix else None
+    return [prefix] if prefix else None
+
+
+def _parse_prefixes(pattern: re.Pattern) -> list[str] | None:
+    """``_literal_prefixes`` of a compiled pattern, or None if it cannot be parsed."""
+    if not SRE_PARSER_AVAILABLE:
+        return None
+    try:
+        return _literal_prefixes(_sre_parse.parse(pattern.pattern, pattern.flags).data)
+    except Exception:
+        return None
+
+
+def _sre_parser_works() -> bool:
+    """Check the private parser still has the shape _literal_prefixes expects."""
+    if _sre_parse is None:
+        return False
+    try:
+        parsed = _sre_parse.parse(r"\bab(?:cd|ef)\s").data
+        return _literal_prefixes(parsed) == ["abcd", "abef"]
+    except Exception:
+        return False
+
+
+SRE_PARSER_AVAILABLE = _sre_parser_works()
+
+
+def _trie_regex(words) -> str:
+    """Build a regex alternation for ``words`` factored into a prefix trie."""
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            node = node.setdefault(ch, {})
+        node[""] = {}
+
+    def emit(node: dict) -> str:
+        alternatives = [re.escape(ch) + emit(child) for ch, child in sorted(node.items()) if ch]
+        if not alternatives:
+            return ""
+        body = alternatives[0] if len(alternatives) == 1 else "(?:" + "|".join(alternatives) + ")"
+        return f"(?:{body})?" if "" in node else body
+
+    return emit(trie)
+
+
+class BatteryScanner:
+    """Scan a document for several pattern batteries in one pass.
+
+    Each pattern is reduced to the literal prefixes ("anchors") its matches
+    must start with, and all anchors are merged into one trie-shaped
+    alternation. A single pass of that regex over the document yields every
+    anchor position, and each pattern is then tried with ``pattern.match``
+    only where one of its anchors occurs, which gives exactly the matches
+    ``search``/``finditer`` would find on their own. Patterns with no usable
+    anchor are searched separately, as every pattern is when the regex parser
+    internals are unavailable (SRE_PARSER_AVAILABLE is False).
+
+    The extractors scan lower-cased text; anchors are matched exactly there,
+    and case-insensitively otherwise when any pattern uses ``re.I``.
+    """
+
+    MIN_ANCHOR = 2
+
+    def __init__(self, batteries: list):
+        self.batteries = batteries
+        self._by_anchor: dict[str, list[tuple[str, re.Pattern, str]]] = {}
+        self.unanchored: list[tuple[str, re.Pattern, str]] = []
+        self.ignorecase = any(pattern.flags & re.I for battery in batteries for pattern, _ in battery)
+
+        for battery in batteries:
+            for pattern, label in battery:
+                entry = (battery.name, pattern, label)
+                anchors = _parse_prefixes(pattern)
+                if not anchors or min(len(a) for a in anchors) < self.MIN_ANCHOR:
+                    self.unanchored.append(entry)
+                    continue
+                if pattern.flags & re.I:
+                    anchors = [a.lower() for a in anchors]
+                for anchor in dict.fromkeys(anchors):
+                    self._by_anchor.setdefault(anchor, []).append(entry)
+
+        self._max_anchor = max((len(a) for a in self._by_anchor), default=0)
+        self._exact_first: dict[str, list[str]] = defaultdict(list)
+        self._folded_first: dict[str, list[str]] = defaultdict(list)
+        for anchor in self._by_anchor:
+            self._exact_first[anchor[0]].append(anchor)
+            self._folded_first[anchor[0].lower()].append(anchor)
+
+        trie = _trie_regex(self._by_anchor)
+        self._exact_re = re.compile(trie) if trie else None
+        self._folded_re = re.compile(trie, re.I) if trie else None
+
+    def scan(self, text: str) -> "ScanResult":
+        candidates: dict[tuple[str, str], list[int]] = {}
+        exact = not self.ignorecase or text.islower()
+        anchor_re = self._exact_re if exact else self._folded_re
+        pos = 0
+        while anchor_re is not None:
+            m = anchor_re.search(text, pos)
+            if m is None:
+                break
+            pos = m.start()
+            if exact:
+                first, head = self._exact_first, text[pos:pos + self._max_anchor]
+            else:
+                first, head = self._folded_first, text[pos:pos + self._max_anchor].lower()
+            for anchor in first.get(head[:1], ()):
+                if not head.startswith(anchor if exact else anchor.lower()):
+                    continue
+                for battery, _, label in self._by_anchor[anchor]:
+                    positions = candidates.setdefault((battery, label), [])
+                    if not positions or positions[-1] != pos:
+                        positions.append(pos)
+            # Step one character so overlapping anchors are not skipped
+            pos += 1
+        return ScanResult(self, text, candidates)
+
+
+class ScanResult:
+    """Hits from one BatteryScanner pass, grouped by battery and label.
+
+    Candidate positions are verified lazily: ``labels``/``first`` stop at the
+    first confirmed match, and only ``matches`` replays the full scan.
+    """
+
+    def __init__(self, scanner: BatteryScanner, text: str, candidates: dict):
+        self.text = text
+        self._candidates = candidates
+        self._patterns = {(b.name, label): pattern for b in scanner.batteries for pattern, label in b}
+        self._order = {b.name: [label for _, label in b] for b in scanner.batteries}
+        self._unanchored = {(battery, label) for battery, _, label in scanner.unanchored}
+        self._first: dict[tuple[str, str], re.Match | None] = {}
+
+    def first(self, battery: str, label: str) -> re.Match | None:
+        """Earliest match for ``label`` (what ``pattern.search`` returns)."""
+        key = (battery, label)
+        if key not in self._first:
+            pattern = self._patterns[key]
+            found = None
+            if key in self._unanchored:
+                found = pattern.search(self.text)
+            else:
+                for pos in self._candidates.get(key, ()):
+                    found = pattern.match(self.text, pos)
+                    if found:
+                        break
+            self._first[key] = found
+        return self._first[key]
+
+    def matches(self, battery: str, label: str) -> list[re.Match]:
+        """All non-overlapping matches for ``label`` (what ``finditer`` yields)."""
+        key = (battery, label)
+        pattern = self._patterns[key]
+        if key in self._unanchored:
+            return list(pattern.finditer(self.text))
+        found = []
+        resume = 0
+        for pos in self._candidates.get(key, ()):
+            if pos < resume:
+                continue
+            match = pattern.match(self.text, pos)
+            if match is None:
+                continue
+            found.append(match)
+            resume = match.end() if match.end() > pos else pos + 1
+        return found
+
+    def labels(self, battery: str) -> list[str]:
+        """Labels with at least one hit, in the battery's registration order."""
+        return [label for label in self._order[battery] if self.first(battery, label)]
+
+    def offsets(self, battery: str) -> dict[str, list[tuple[int, int]]]:
+        """Match spans for every label with hits in ``battery``."""
+        return {label: [m.span() for m in self.matches(battery, label)] for label in self.labels(battery)}
+
+
+def _sld_area_label(pattern: str) -> str:
+    """Readable area name for an SLD consistency pattern (e.g. 'Basic Reading')."""
+    return pattern.replace(r'\s*', ' ').replace(r'(?:ematics)?', '').title()
+
+
+PATTERNS = PatternRegistry()
+
+# FIE / FIIE
+PATTERNS.add("fie.idea_categories", [
+    (re.escape(cat), cat) for cat in [
+        "specific learning disability", "speech or language impairment",
+        "intellectual disability", "emotional disturbance",
+        "autism", "other health impairment", "traumatic brain injury",
+        "visual impairment", "hearing impairment", "deaf-blindness",
+        "orthopedic impairment", "multiple disabilities",
+        "developmental delay"
+    ]
+])
+PATTERNS.add("fie.sld_areas", [
+    ("basic reading", "Basic Reading"),
+    ("reading comprehension", "Reading Comprehension"),
+    ("reading fluency", "Reading Fluency"),
+    (r"math(?:ematics)? calculation", "Math Calculation"),
+    (r"math(?:ematics)? problem.?solving", "Math Problem Solving"),
+    ("written expression", "Written Expression"),
+    ("oral expression", "Oral Expression"),
+    ("listening comprehension", "Listening Comprehension"),
+])
+PATTERNS.add("fie.tests", [
+    (r'\bwisc[\s\-]?v\b|\bwisc[\s\-]?iv\b', "WISC-V (Cognitive)"),
+    (r'\bwj[\s\-]?iv\b|\bwoodcock.johnson\b', "WJ-IV (Academic Achievement)"),
+    (r'\bwj[\s\-]?iii\b', "WJ-III (Academic Achievement)"),
+    (r'\bktea[\s\-]?3\b|\bkaufman.*achievement\b', "KTEA-3 (Academic Achievement)"),
+    (r'\bwiat[\s\-]?(?:ii|iii|4)\b', "WIAT (Academic Achievement)"),
+    (r'\bgort[\s\-]?\d', "GORT (Reading)"),
+    (r'\bctopp[\s\-]?\d?', "CTOPP (Phonological Processing)"),
+    (r'\bcelf[\s\-]?\d', "CELF (Language)"),
+    (r'\bbasc[\s\-]?\d', "BASC (Behavior/Social-Emotional)"),
+    (r'\bconners[\s\-]?\d?\b', "Conners (ADHD)"),
+    (r'\bvmi\b|\bbeery\b', "Beery VMI (Visual-Motor)"),
+    (r'\btvps[\s\-]?\d?', "TVPS (Visual Processing)"),
+    (r'\bdtvp[\s\-]?\d?', "DTVP (Visual Processing)"),
+    (r'\bvineland[\s\-]?\d?\b', "Vineland (Adaptive Behavior)"),
+    (r'\babas[\s\-]?\d?\b', "ABAS (Adaptive Behavior)"),
+    (r'\bbesa\b|\bbilingual.*evaluation', "BESA (Bilingual Language)"),
+    (r'\bbvat\b', "BVAT (Bilingual Verbal Ability)"),
+    (r'\bppvt[\s\-]?\d?\b', "PPVT (Receptive Vocabulary)"),
+    (r'\beva\b|\bexpressive.*vocabulary', "EVT (Expressive Vocabulary)"),
+    (r'\bcpt[\s\-]?\d?\b|\bcontinuous.performance', "CPT (Attention)"),
+    (r'\bcas[\s\-]?\d?\b', "CAS (Cognitive Assessment)"),
+    (r'\bkbit[\s\-]?\d?\b', "KBIT (Brief Cognitive)"),
+    (r'\bwasi[\s\-]?\d?\b', "WASI (Brief Cognitive)"),
+    (r'\btowl[\s\-]?\d?\b', "TOWL (Written Language)"),
+    (r'\btold[\s\-]?\d?\b', "TOLD (Language)"),
+])
+
+# REED
+PATTERNS.add("reed.data_types", [
+    ("cognitive", "Cognitive Assessment"),
+    ("academic achievement", "Academic Achievement"),
+    ("behavior", "Behavioral Assessment"),
+    ("adaptive", "Adaptive Behavior"),
+    ("speech.*language", "Speech/Language Evaluation"),
+    ("occupational therapy", "Occupational Therapy Evaluation"),
+    ("physical therapy", "Physical Therapy Evaluation"),
+    ("audiol", "Audiological Evaluation"),
+    ("vision", "Vision Evaluation"),
+    ("transition", "Transition Assessment"),
+    ("classroom observation", "Classroom Observation"),
+])
+PATTERNS.add("reed.data_sources", [
+    (r'previous\s+(?:fie|evaluation|testing)', "Previous FIE/Evaluation"),
+    (r'staar', "STAAR Results"),
+    (r'report\s+card|grades', "Grades/Report Cards"),
+    (r'teacher\s+(?:input|report|observation)', "Teacher Input/Reports"),
+    (r'parent\s+(?:input|concern|interview)', "Parent Input"),
+    (r'progress\s+(?:monitor|data)', "Progress Monitoring Data"),
+    (r'curriculum.based', "Curriculum-Based Assessment"),
+    (r'attendance', "Attendance Records"),
+    (r'discipline', "Discipline Records"),
+    (r'map|nwea', "MAP Assessment"),
+    (r'health\s+(?:record|history)', "Health Records"),
+])
+
+# IEP services / PLAAFP / goals
+# Each related-service pattern captures the minutes following its keyword;
+# the label is the keyword itself.
+PATTERNS.add("iep.related_services", [
+    (rf'{re.escape(kw)}.*?(\d+)\s*minutes', kw) for kw in [
+        "speech-language", "speech language", "occupational therapy",
+        "physical therapy", "counseling", "orientation and mobility",
+        "audiology", "school health", "transportation", "interpreter"
+    ]
+], re.I)
+PATTERNS.add("iep.plaafp_domains", [
+    (
+        r'present\s+levels.*?'
+        + domain.lower().replace("/", r"[/\s]").replace("-", r"[\-\s]")
+        + r'.*?\n(.*?)(?:goal|present\s+level|service|$)',
+        domain,
+    )
+    for domain in [
+        "English/Reading", "Mathematics", "Written Language", "Science",
+        "Social Studies", "Speech/Language", "Communication",
+        "Adaptive Behavior", "Social-Emotional/Behavioral",
+        "Motor/Physical", "Transition", "Vocational",
+    ]
+], re.DOTALL)
+ELIGIBILITY_SECTION_RE = re.compile(r'determination\s*of\s*eligibility.*?(?:present\s*levels|plaafp)', re.DOTALL)
+PATTERNS.add("goals.tea_components", [
+    (r'by.*?(?:end|date|iep)', "has_timeframe"),
+    (r'given|when|after|during', "has_condition"),
+    (r'will\s+\w+', "has_behavior"),
+    (r'\d+\s*(?:out of|%|percent|times)', "has_criterion"),
+], re.I)
+
+# ARD deliberations
+PATTERNS.add("deliberations.decisions", [
+    (rf'(?:The )?(?:ARD/IEP )?Committee.*?{keyword}[^.]+\.', keyword) for keyword in [
+        "agreed to review",
+        "determined the appropriate",
+        "Committee decided",
+        "will continue",
+        "will receive",
+        "recommends",
+        "will participate"
+    ]
+], re.I)
+
+# SLD consistency
+PATTERNS.add("sld.areas", [
+    (pattern, _sld_area_label(pattern)) for pattern in [
+        r'basic\s*reading',
+        r'reading\s*comprehension',
+        r'reading\s*fluency',
+        r'math(?:ematics)?\s*calculation',
+        r'math(?:ematics)?\s*problem\s*solving',
+        r'written\s*expression',
+        r'oral\s*expression',
+        r'listening\s*comprehension'
+    ]
+])
+# Language indicating dismissal/exit from an area
+PATTERNS.add("sld.dismissal", [
+    r'(?:dismissed|exited|discontinued|removed)\s+(?:from\s+)?(?:services?\s+)?(?:in\s+)?(?:the\s+area\s+of\s+)?',
+    r'no\s+longer\s+(?:requires?|needs?|qualifies?)',
+    r'(?:met|achieved)\s+(?:goal|criteria|benchmark).*?(?:dismiss|exit|discontinue)',
+    r'(?:services?|instruction)\s+(?:in|for).*?(?:will\s+be\s+)?(?:dismissed|discontinued|exited)',
+    r'ard\s+committee.*?(?:determined|decided).*?(?:dismiss|exit|discontinue)',
+    r'progress\s+(?:sufficient|adequate).*?(?:dismiss|exit)',
+    r'(?:has|have)\s+(?:been\s+)?(?:dismissed|exited)\s+from',
+    r'(?:recommend|recommends|recommended)\s+(?:dismissal|exit)',
+    r'goal\s+(?:mastered|met).*?(?:dismiss|exit|discontinue)',
+    r'(?:closing|closure)\s+(?:of\s+)?(?:services?|goal)',
+])
+# Language indicating goal mastery
+PATTERNS.add("sld.mastery", [
+    r'(?:goal|objective).*?(?:met|mastered|achieved|accomplished)',
+    r'(?:met|mastered|achieved).*?(?:goal|objective|benchmark|criteria)',
+    r'progress.*?(?:sufficient|adequate|satisfactory)',
+    r'(?:demonstrate[ds]?|show[ns]?).*?(?:mastery|proficiency)',
+    r'(?:no\s+longer\s+)?(?:requires?|needs?).*?(?:specially\s+designed\s+instruction|sdi)',
+    r'performing.*?(?:at|above).*?(?:grade|level|standard)',
+])
+
+# Attention / ADHD
+PATTERNS.add("adhd.attention", [
+    (r'attention.*?(?:below|poor|weak|deficit|difficulty)', "Attention rated below average"),
+    (r'easily\s+distracted', "Easily distracted"),
+    (r'processing\s+speed.*?(?:weakness|deficit|significant)', "Processing speed deficit"),
+    (r'frequent\s+breaks', "Needs frequent breaks"),
+    (r'cool\s*down\s*(?:period|time|opportunity)', "Needs cool-down periods"),
+    (r'attention\s+processing', "Attention processing issues"),
+    (r'difficulty\s+(?:completing|finishing)\s+tasks', "Difficulty completing tasks"),
+    (r'organizational\s+skills.*?below', "Organizational skills below average"),
+    (r'redirect(?:ion|ed)', "Needs redirection"),
+    (r'(?:sleeping|drowsy)\s+in\s+class', "Sleeping in class")
+], re.I)
+PATTERNS.add("adhd.evaluation", [
+    r'conners',
+    r'basc',
+    r'adhd.*?evaluation',
+    r'attention.*?deficit.*?evaluation',
+    r'cpt|continuous\s+performance',
+    r'other\s+health\s+impairment.*?attention'
+], re.I)
+
+# Per-document patterns used inside whole-caseload loops
+PATTERNS.add("documents.fields", [
+    (r'evaluation.*?report.*?dated?\s*(\d{1,2}[./]\d{1,2}[./]\d{2,4})', "fie_reference"),
+    (r'days\s+absent.*?:\s*(\d+)', "days_absent"),
+    (r'days\s+absent\s+as\s+of\s+(\d{2}/\d{2}/\d{4})', "attendance_as_of"),
+], re.I)
+PATTERNS.add("copy_paste.names", [
+    (r'\b([A-Z][a-z]{2,10})\s+(?:will\s+be|will\s+receive|has\s+been|is\s+expected|needs?\s+to)', "name_will"),
+    (r'([A-Z][a-z]{2,10})\s+(?:will\s+be\s+provided|will\s+receive|will\s+participate)', "name_in_service"),
+])
+# Heads of the free-text IEP sections compared across documents
+PATTERNS.add("copy_paste.sections", [
+    (r'present\s+levels\s+of\s+academic\s+achievement', "plaafp"),
+    (r'parent\s+(?:input|concerns?)\b', "parent_concerns"),
+    (r'transition\s+(?:plan|services|assessment)|post-?secondary\s+goals?', "transition"),
+    (r'(?:classroom|instructional|testing)\s+accommodat|supplementary\s+aids', "accommodations"),
+])
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# SECTION INDEX
+# ─────────────────────────────────────────────────────────────────────────────
+class SectionIndex:
+    """Heading index for one extracted document, built once per document.
+
+    Records the offset of every occurrence of the Frontline section titles
+    the extractors navigate by, the first match of each regex section head,
+    Roman-numeral headings at the start of a line, and page breaks.
+    ``sections`` lists the headings in document order with the span each
+    covers, so extractors can work on the slice they need instead of
+    re-scanning the whole document.
+    """
+
+    TITLES = (
+        "XXI. DELIBERATIONS",
+        "DELIBERATIONS",
+        "XXII.",
+        "XXIII.",
+        "ASSURANCES",
+        "Report Generated",
+        "Present Levels of Academic Achievement and Functional Performance(English)",
+        "Present Levels of Academic Achievement and Functional Performance(Math)",
+        "EDUCATIONAL ALTERNATIVES",
+    )
+    # Section heads located by regex (searched as written, so lower-case
+    # heads are meant for the lower-cased text view)
+    HEADS = {
+        "eligibility": re.compile(r'determination\s*of\s*eligibility'),
+        "present_levels": re.compile(r'present\s+levels'),
+        "supplementary_aids": re.compile(r'supplementary\s+aids?\s+(?:and\s+)?(?:support|service)[s:\s]'),
+        "classroom_accommodations": re.compile(r'(?:classroom|instructional)\s+accommodat[s:\s]'),
+        "testing_accommodations": re.compile(r'(?:testing\s+accommodat|state\s+assess.*?accommodat)[s:\s]', re.DOTALL),
+    }
+    ROMAN_HEADING = re.compile(r'^[ \t\f]*((?=[IVXL])X{0,3}(?:IX|IV|V?I{0,3}))\.[ \t]+(\S[^\n\f]*)', re.M)
+    _TITLE_RE = re.compile(_trie_regex(TITLES))
+
+    def __init__(self, text: str):
+        self.length = len(text)
+        self.occurrences: dict[str, list[int]] = {title: [] for title in self.TITLES}
+        pos = 0
+        while True:
+            m = self._TITLE_RE.search(text, pos)
+            if m is None:
+                break
+            pos = m.start()
+            for title in self.TITLES:
+                if text.startswith(title, pos):
+                    self.occurrences[title].append(pos)
+            pos += 1
+
+        self.heads: dict[str, int] = {}
+        for name, pattern in self.HEADS.items():
+            m = pattern.search(text)
+            self.heads[name] = m.start() if m else -1
+
+        self.page_breaks = [m.start() for m in re.finditer("\f", text)]
+
+        starts: dict[int, str] = {}
+        for m in self.ROMAN_HEADING.finditer(text):
+            starts[m.start(1)] = f"{m.group(1)}. {m.group(2).strip()}"
+        for title, offsets in self.occurrences.items():
+            for offset in offsets:
+                line_start = text.rfind("\n", 0, offset) + 1
+                # Only titles that open a line, and not ones inside a heading
+                if text[line_start:offset].strip() or any(s <= offset < s + len(t) for s, t in starts.items()):
+                    continue
+                starts.setdefault(offset, title)
+        ordered = sorted(starts.items())
+        self.sections = [
+            {
+                "title": title,
+                "start": start,
+                "end": ordered[i + 1][0] if i + 1 < len(ordered) else self.length,
+                "page": self.page_at(start),
+            }
+            for i, (start, title) in enumerate(ordered)
+        ]
+
+    def find(self, title: str, start: int = 0, end: int | None = None) -> int:
+        """Offset of ``title`` like ``text.find(title, start, end)``."""
+        offsets = self.occurrences[title]
+        i = bisect.bisect_left(offsets, max(start, 0))
+        if i == len(offsets):
+            return -1
+        found = offsets[i]
+        limit = self.length if end is None else min(end, self.length)
+        return found if found + len(title) <= limit else -1
+
+    def head(self, name: str) -> int:
+        """Offset of the first match of a regex section head, or -1."""
+        return self.heads[name]
+
+    def page_at(self, offset: int) -> int:
+        """1-based page number containing ``offset``."""
+        return bisect.bisect_right(self.page_breaks, offset) + 1
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# NEAR-DUPLICATE DETECTION
+# ─────────────────────────────────────────────────────────────────────────────
+SHINGLE_WORDS = 5
+MINHASH_SIZE = 128
+MIN_SECTION_WORDS = 20
+SECTION_MAX_CHARS = 6000
+SECTION_SIMILARITY_THRESHOLD = 0.9
+
+_WORD_RE = re.compile(r"[a-z0-9']+")
+
+
+class MinHasher:
+    """One-permutation MinHash signatures over word shingles.
+
+    Each shingle is hashed once; the hash picks one of ``size`` bins and the
+    bin keeps its smallest value. Empty bins borrow from the next non-empty
+    bin so every position is comparable. Signing a section is linear in its
+    length and comparing two signatures is O(size), so whole sections can be
+    compared across a student's full IEP history.
+    """
+
+    def __init__(self, size: int = MINHASH_SIZE, shingle_words: int = SHINGLE_WORDS,
+                 min_words: int = MIN_SECTION_WORDS):
+        self.size = size
+        self.shingle_words = shingle_words
+        self.min_words = min_words
+        # Added per step when an empty bin borrows, so borrowed values never
+        # collide with genuine ones
+        self._offset = (1 << 64) // size + 1
+
+    @staticmethod
+    def _hash(shingle: str) -> int:
+        return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "big")
+
+    def signature(self, text: str) -> tuple | None:
+        """Signature of ``text``, or None if it is too short to compare."""
+        words = _WORD_RE.findall(text.lower())
+        if len(words) < max(self.min_words, self.shingle_words):
+            return None
+        k = self.shingle_words
+        bins = [None] * self.size
+        for i in range(len(words) - k + 1):
+            h = self._hash(" ".join(words[i:i + k]))
+            b, v = h % self.size, h // self.size
+            if bins[b] is None or v < bins[b]:
+                bins[b] = v
+        signature = list(bins)
+        for i, v in enumerate(bins):
+            if v is None:
+                step = 1
+                while bins[(i + step) % self.size] is None:
+                    step += 1
+                signature[i] = bins[(i + step) % self.size] + step * self._offset
+        return tuple(signature)
+
+    @staticmethod
+    def similarity(a: tuple, b: tuple) -> float:
+        """Estimated Jaccard similarity of two signatures' shingle sets."""
+        return sum(x == y for x, y in zip(a, b)) / len(a)
+
+
+MINHASHER = MinHasher()
+
+
+class SectionFingerprintIndex:
+    """District-wide LSH index of IEP section fingerprints, stored in SQLite.
+
+    Signatures are split into ``BANDS`` bands; two sections become candidates
+    when any band matches exactly, and candidates are confirmed against the
+    stored signature. A lookup touches only the matching buckets, so checking
+    a student against the whole caseload never compares every pair of
+    students. Only hashes are stored, never document text.
+    """
+
+    BANDS = 16
+    # Sections matching this many other students are district boilerplate
+    BOILERPLATE_STUDENTS = 5
+    _MASK = (1 << 64) - 1
+
+    def __init__(self, path):
+        self.path = Path(path)
+        self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS fingerprints (
+                    id INTEGER PRIMARY KEY,
+                    student_id TEXT NOT NULL,
+                    document TEXT NOT NULL,
+                    section TEXT NOT NULL,
+                    signature BLOB NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS fingerprints_student ON fingerprints (student_id);
+                CREATE TABLE IF NOT EXISTS bands (
+                    band INTEGER NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    fingerprint_id INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS bands_bucket ON bands (band, bucket);
+                CREATE INDEX IF NOT EXISTS bands_fingerprint ON bands (fingerprint_id);
+            """)
+            self._conn = conn
+        return self._conn
+
+    def _pack(self, signature: tuple) -> bytes:
+        return array("Q", (v & self._MASK for v in signature)).tobytes()
+
+    def _buckets(self, packed: bytes) -> list[tuple[int, int]]:
+        width = len(packed) // self.BANDS
+        return [
+            (band, int.from_bytes(hashlib.blake2b(packed[band * width:(band + 1) * width], digest_size=8).digest(), "big", signed=True))
+            for band in range(self.BANDS)
+        ]
+
+    def replace_student(self, student_id: str, entries: list[tuple[str, str, tuple]]):
+        """Replace a student's indexed sections with ``(document, section, signature)`` entries."""
+        conn = self._connect()
+        with conn:
+            self._delete_student(conn, student_id)
+            for document, section, signature in entries:
+                packed = self._pack(signature)
+                cur = conn.execute(
+                    "INSERT INTO fingerprints (student_id, document, section, signature) VALUES (?, ?, ?, ?)",
+                    (student_id, document, section, packed),
+                )
+                conn.executemany(
+                    "INSERT INTO bands (band, bucket, fingerprint_id) VALUES (?, ?, ?)",
+                    [(band, bucket, cur.lastrowid) for band, bucket in self._buckets(packed)],
+                )
+
+    def retain(self, student_ids) -> list[str]:
+        """Drop every student not in ``student_ids``; returns the students removed."""
+        keep = set(student_ids)
+        conn = self._connect()
+        with conn:
+            gone = sorted(
+                row[0] for row in conn.execute("SELECT DISTINCT student_id FROM fingerprints") if row[0] not in keep
+            )
+            for student_id in gone:
+                self._delete_student(conn, student_id)
+        return gone
+
+    def _delete_student(self, conn: sqlite3.Connection, student_id: str):
+        old_ids = [row[0] for row in conn.execute("SELECT id FROM fingerprints WHERE student_id = ?", (student_id,))]
+        conn.executemany("DELETE FROM bands WHERE fingerprint_id = ?", [(i,) for i in old_ids])
+        conn.execute("DELETE FROM fingerprints WHERE student_id = ?", (student_id,))
+
+    def query(self, student_id: str, section: str, signature: tuple, threshold: float) -> list[dict]:
+        """Other students' ``section`` fingerprints more than ``threshold`` similar to ``signature``."""
+        if not self.path.exists():
+            return []
+        conn = self._connect()
+        packed = self._pack(signature)
+        clause = " OR ".join(["(b.band = ? AND b.bucket = ?)"] * self.BANDS)
+        params = [value for pair in self._buckets(packed) for value in pair]
+        rows = conn.execute(
+            f"SELECT DISTINCT f.student_id, f.document, f.signature FROM bands b "
+            f"JOIN fingerprints f ON f.id = b.fingerprint_id "
+            f"WHERE ({clause}) AND f.section = ? AND f.student_id != ?",
+            (*params, section, student_id),
+        ).fetchall()
+        mine = array("Q")
+        mine.frombytes(packed)
+        matches = []
+        for other_student, document, other_packed in rows:
+            other = array("Q")
+            other.frombytes(other_packed)
+            similarity = MINHASHER.similarity(mine, other)
+            if similarity > threshold:
+                matches.append({"student_id": other_student, "document": document, "similarity": round(similarity, 3)})
+        return sorted(matches, key=lambda m: (-m["similarity"], m["student_id"], m["document"]))
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+
+class DocumentText:
+    """Extracted text of one document with lazily computed, cached views.
+
+    Every analysis module reads the same instance, so a large document is
+    lower-cased and section-indexed at most once per run.
+    """
+
+    def __init__(self, raw: str):
+        self.raw = raw
+
+    @cached_property
+    def lower(self) -> str:
+        return self.raw.lower()
+
+    @cached_property
+    def sections(self) -> SectionIndex:
+        return SectionIndex(self.raw)
+
+    @cached_property
+    def lower_sections(self) -> SectionIndex:
+        """Section index over ``lower``, for the lower-case regex heads."""
+        return SectionIndex(self.lower)
+
+    @cached_property
+    def comparable_sections(self) -> dict[str, str]:
+        """Free-text sections named in ``copy_paste.sections``.
+
+        Each runs from its head to the next indexed heading or section head,
+        capped at SECTION_MAX_CHARS.
+        """
+        heads = []
+        for pattern, label in PATTERNS["copy_paste.sections"]:
+            m = pattern.search(self.lower)
+            if m:
+                heads.append((m.start(), label))
+        stops = sorted({s["start"] for s in self.sections.sections} | {start for start, _ in heads})
+        # Offsets are shared with the raw text unless lower() changed its length
+        source = self.raw if len(self.raw) == len(self.lower) else self.lower
+        result = {}
+        for start, label in heads:
+            i = bisect.bisect_right(stops, start)
+            end = stops[i] if i < len(stops) else len(source)
+            result[label] = source[start:min(end, start + SECTION_MAX_CHARS)]
+        return result
+
+    @cached_property
+    def fingerprints(self) -> dict[str, tuple]:
+        """MinHash signature of each comparable section long enough to sign."""
+        result = {}
+        for label, text in self.comparable_sections.items():
+            signature = MINHASHER.signature(text)
+            if signature is not None:
+                result[label] = signature
+        return result
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# EXTRACTED TEXT CACHE
+# ─────────────────────────────────────────────────────────────────────────────
+_pdftotext_version = None
+_pdftotext_version_lock = threading.Lock()
+
+
+def pdftotext_version() -> str:
+    """Return the installed pdftotext version string (looked up once)."""
+    global _pdftotext_version
+    with _pdftotext_version_lock:
+        if _pdftotext_version is None:
+            try:
+                result = subprocess.run(["pdftotext", "-v"], capture_output=True, text=True, timeout=10)
+                output = (result.stderr or result.stdout).strip()
+                _pdftotext_version = output.splitlines()[0] if output else "unknown"
+            except Exception:
+                _pdftotext_version = "unknown"
+        return _pdftotext_version
+
+
+class TextCache:
+    """Content-addressed, size-bounded on-disk cache of extracted PDF text.
+
+    Entries are keyed by the SHA-256 of the PDF bytes plus the pdftotext
+    version and flags, and stored gzip-compressed. Hits refresh the entry's
+    mtime so ``evict()`` can drop the least recently used entries first.
+    """
+
+    def __init__(self, root: Path, max_bytes: int, defer_evict: bool = False):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        # Cohort runs evict once at the end (see cohort_text_cache)
+        self.defer_evict = defer_evict
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def key(self, pdf_path: str) -> str:
+        digest = hashlib.sha256()
+        with open(pdf_path, "rb") as f:
+            for chunk in iter(lambda: f.read(1 << 20), b""):
+                digest.update(chunk)
+        return self._key(digest.hexdigest())
+
+    def key_for_bytes(self, data: bytes) -> str:
+        return self._key(hashlib.sha256(data).hexdigest())
+
+    def _key(self, content_sha256: str) -> str:
+        extractor = f"{pdftotext_version()}|{' '.join(PDFTOTEXT_FLAGS)}"
+        return hashlib.sha256(f"{content_sha256}|{extractor}".encode()).hexdigest()
+
+    def _path(self, key: str) -> Path:
+        return self.root / key[:2] / f"{key}.txt.gz"
+
+    def get(self, key: str) -> str | None:
+        path = self._path(key)
+        try:
+            text = gzip.decompress(path.read_bytes()).decode("utf-8")
+            os.utime(path)
+            return text
+        except (OSError, EOFError, UnicodeDecodeError):
+            return None
+
+    def put(self, key: str, text: str) -> None:
+        path = self._path(key)
+        tmp = None
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so concurrent readers never see a partial entry
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(gzip.compress(text.encode("utf-8"), compresslevel=6))
+            os.replace(tmp, path)
+            tmp = None
+        except OSError as e:
+            print(f"Warning: Could not write text cache entry {path}: {e}")
+        finally:
+            if tmp is not None:
+                try:
+                    os.unlink(tmp)
+                except OSError:
+                    pass
+
+    def evict(self) -> None:
+        """Delete least recently used entries until the cache fits max_bytes."""
+        entries = []
+        total = 0
+        for path in self.root.glob("*/*.txt.gz"):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, path))
+            total += st.st_size
+        if total <= self.max_bytes:
+            return
+        for _, size, path in sorted(entries):
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+
+TEXT_CACHE = TextCache(TEXT_CACHE_DIR, TEXT_CACHE_MAX_BYTES)
+
+
+@contextmanager
+def cohort_text_cache():
+    """Keep every text a cohort run extracts until the run ends.
+
+    The index pass extracts each student's IEPs and the analysis pass reads
+    them back from TEXT_CACHE, so eviction waits for the end of the run. With
+    TEXT_CACHE disabled, a temporary cache holds the texts for this run only.
+    """
+    global TEXT_CACHE
+    saved = TEXT_CACHE
+    scratch = None if saved.enabled else tempfile.mkdtemp(prefix="galexii-text-")
+    if scratch is None:
+        TEXT_CACHE = TextCache(saved.root, saved.max_bytes, defer_evict=True)
+    else:
+        TEXT_CACHE = TextCache(scratch, sys.maxsize, defer_evict=True)
+    try:
+        yield TEXT_CACHE
+    finally:
+        TEXT_CACHE = saved
+        if scratch is None:
+            saved.evict()
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+
+# ─────────────────────────────────────────────────────────────────────────────
+# DISTRICT REFERENCE TABLES
+# ─────────────────────────────────────────────────────────────────────────────
+def _mtime(path: Path) -> float | None:
+    try:
+        return Path(path).stat().st_mtime
+    except OSError:
+        return None
+
+
+def _read_reference_csv(path: Path, **kwargs):
+    """Read a Frontline CSV export as strings, falling back to latin1."""
+    try:
+        return pd.read_csv(path, dtype=str, **kwargs).fillna("")
+    except UnicodeDecodeError:
+        # Fallback for Windows-encoded exports
+        return pd.read_csv(path, dtype=str, encoding="latin1", **kwargs).fillna("")
+
+
+class ReferenceIndex:
+    """District-wide reference tables, parsed once and indexed by student ID.
+
+    Each table is read lazily on first use and grouped by its student-id
+    column, so a full-district ``--all`` run costs one parse per table rather
+    than one per student. Share a single instance across analyzers; a
+    standalone analyzer creates its own. ``assessment_profile_path``
+    overrides ASSESSMENT_PROFILE_PATH for this index.
+    """
+
+    LABELS = {
+        "assessment": "assessment profile",
+        "compliance": "compliance table",
+        "accommodations": "accommodations table",
+        "goals": "goals table",
+        "telpas": "TELPAS table",
+        "bip": "BIP table",
+        "transportation": "transportation table",
+    }
+
+    def __init__(self, assessment_profile_path: Path = None):
+        self.assessment_profile_path = Path(assessment_profile_path) if assessment_profile_path else ASSESSMENT_PROFILE_PATH
+        self._groups: dict[str, dict | None] = {}
+        self.paths: dict[str, Path] = {}
+        # mtime of every file a table was (or could have been) read from when
+        # it was built; None for files that did not exist then
+        self._mtimes: dict[Path, float | None] = {}
+
+    def rows(self, table: str, student_id: str):
+        """Return the student's rows from ``table`` as a DataFrame, or None."""
+        if table not in self._groups:
+            self._groups[table] = self._build(table)
+        groups = self._groups[table]
+        if not groups:
+            return None
+        return groups.get(str(student_id))
+
+    def stale(self) -> bool:
+        """True if a table used so far has changed, appeared or gone away on disk since."""
+        return any(_mtime(path) != mtime for path, mtime in self._mtimes.items())
+
+    def _sources(self, table: str) -> list[Path]:
+        """Files ``table`` is read from, in order of preference."""
+        if table == "assessment":
+            return [self.assessment_profile_path]
+        if table == "compliance":
+            return [
+                OUTPUT_FOLDER / "COMPLIANCE_TABLE__ALL_CASE_MANAGERS.xlsx",
+                REFERENCE_FOLDER / "COMPLIANCE_TABLE__ALL_CASE_MANAGERS.xlsx",
+            ]
+        return [{
+            "accommodations": ACCOMMODATIONS_CSV_PATH,
+            "goals": GOALS_CSV_PATH,
+            "telpas": TELPAS_CSV_PATH,
+            "bip": BIP_CSV_PATH,
+            "transportation": TRANSPORT_CSV_PATH,
+        }[table]]
+
+    def _build(self, table: str) -> dict | None:
+        if not PANDAS_AVAILABLE:
+            return None
+        # Watched whether or not the table loads, so a table that is missing
+        # or unreadable now is picked up once it is fixed
+        for path in self._sources(table):
+            self._mtimes[Path(path)] = _mtime(path)
+        try:
+            loaded = getattr(self, f"_read_{table}")()
+        except Exception as e:  # noqa: BLE001
+            print(f"Warning: Could not load {self.LABELS[table]}: {e}")
+            return None
+        if loaded is None:
+            return None
+
+        df, id_col, path = loaded
+        if id_col is None or id_col not in df.columns or df.empty:
+            return None
+        self.paths[table] = path
+        keys = df[id_col].astype(str)
+        return {sid: sub for sid, sub in df.groupby(keys, sort=False)}
+
+    def _read_assessment(self):
+        if not self.assessment_profile_path.exists():
+            return None
+        df = pd.read_excel(self.assessment_profile_path, sheet_name='Assessment Profiles')
+        return df, "Student ID", self.assessment_profile_path
+
+    def _read_compliance(self):
+        """Locate the combined compliance table and its student-id column.
+
+        The output folder copy is preferred (if a combined table has been
+        generated), then the reference folder. The id column is found
+        heuristically from the headers.
+        """
+        for path in self._sources("compliance"):
+            if not path.exists():
+                continue
+            try:
+                df = pd.read_excel(path)
+            except Exception as e:  # noqa: BLE001
+                print(f"Warning: Could not load compliance table {path}: {e}")
+                continue
+
+            id_col = None
+            for col in df.columns:
+                name = str(col).lower()
+                if "student" in name and "id" in name:
+                    id_col = col
+                    break
+            return df, id_col, path
+        return None
+
+    def _read_accommodations(self):
+        if not ACCOMMODATIONS_CSV_PATH.exists():
+            return None
+        return _read_reference_csv(ACCOMMODATIONS_CSV_PATH), "Student ID", ACCOMMODATIONS_CSV_PATH
+
+    def _read_goals(self):
+        if not GOALS_CSV_PATH.exists():
+            return None
+        df = _read_reference_csv(GOALS_CSV_PATH, engine="python", on_bad_lines="skip")
+        return df, "Student ID", GOALS_CSV_PATH
+
+    def _read_telpas(self):
+        if not TELPAS_CSV_PATH.exists():
+            return None
+        return _read_reference_csv(TELPAS_CSV_PATH), "Student ID", TELPAS_CSV_PATH
+
+    def _read_bip(self):
+        if not BIP_CSV_PATH.exists():
+            return None
+        return _read_reference_csv(BIP_CSV_PATH), "Student ID", BIP_CSV_PATH
+
+    def _read_transportation(self):
+        if not TRANSPORT_CSV_PATH.exists():
+            return None
+        return _read_reference_csv(TRANSPORT_CSV_PATH), "Student ID", TRANSPORT_CSV_PATH
+
+
 class StudentDocumentAnalyzer:
     """Analyzes all documents for a single student."""
+
+    # Document groups the analysis modules work from, by member document type
+    DOCUMENT_GROUPS = {
+        "IEP": ("IEP", "Signed IEP"),
+        "FIE": ("FIE", "FIIE"),
+        "REED": ("REED",),
+    }
     
-    def __init__(self, student_id: str, map_file: str = None):
+    def __init__(self, student_id: str, map_file: str = None, reference: ReferenceIndex = None,
+                 section_index: SectionFingerprintIndex = None, iep_folder: Path = None,
+                 progress=None, document_data: dict = None):
         self.student_id = student_id
+        # In-memory PDFs ({filename: bytes}) analyzed instead of iep_folder
+        self.document_data = document_data
+        # Optional progress(event, data) callback for stage/module events
+        self.progress = progress
+        # Seconds per analysis module and per extracted document
+        self.timings = {"modules": {}, "documents": {}}
+        self.iep_folder = Path(iep_folder) if iep_folder else IEP_FOLDER
+        self.reference = reference if reference is not None else ReferenceIndex()
+        self.section_index = section_index
         self.documents = []
         self.extracted_text = {}
+        self.texts: dict[str, DocumentText] = {}
         self.alerts = []
         self.analysis = {}
         self.map_file = map_file
@@ -70,20 +1259,104 @@ class StudentDocumentAnalyzer:
         self.behavior_intervention = None
         self.transportation_profile = None
         
+    # ── Derived per-student facts (computed once, shared by all modules) ──────
+    @cached_property
+    def document_groups(self) -> dict[str, list[dict]]:
+        """Documents in each DOCUMENT_GROUPS group, in discovery order."""
+        return {
+            group: [d for d in self.documents if d["type"] in types]
+            for group, types in self.DOCUMENT_GROUPS.items()
+        }
+
+    @cached_property
+    def latest_documents(self) -> dict[str, dict | None]:
+        """Most recent document of each group (undated documents sort oldest)."""
+        return {
+            group: max(docs, key=lambda x: x["date"] or "") if docs else None
+            for group, docs in self.document_groups.items()
+        }
+
+    @cached_property
+    def section_similarity(self) -> list[dict]:
+        """IEP sections more than SECTION_SIMILARITY_THRESHOLD similar to the same section in an earlier IEP.
+
+        Every pair is compared, but only the pairs worth reporting are kept, so
+        the output grows with the carried-over sections rather than with the
+        square of the IEP history.
+        """
+        ieps = sorted((d for d in self.document_groups["IEP"] if d["date"]), key=lambda x: x["date"])
+        scores = []
+        for j, iep in enumerate(ieps):
+            for label, signature in self._text(iep["filename"]).fingerprints.items():
+                for prev in ieps[:j]:
+                    prev_signature = self._text(prev["filename"]).fingerprints.get(label)
+                    if prev_signature is None or prev["date"] == iep["date"]:
+                        continue
+                    similarity = MINHASHER.similarity(signature, prev_signature)
+                    if similarity <= SECTION_SIMILARITY_THRESHOLD:
+                        continue
+                    scores.append({
+                        "section": label,
+                        "current_iep": iep["date"],
+                        "previous_iep": prev["date"],
+                        "similarity": round(similarity, 3),
+                        "document": iep["filename"],
+                        "previous_document": prev["filename"],
+                    })
+        return scores
+
+    @cached_property
+    def cross_student_matches(self) -> list[dict]:
+        """IEP sections that match other students' sections in the district index."""
+        if self.section_index is None:
+            return []
+        results = []
+        for doc in self.document_groups["IEP"]:
+            for label, signature in self._text(doc["filename"]).fingerprints.items():
+                try:
+                    matches = self.section_index.query(self.student_id, label, signature, SECTION_SIMILARITY_THRESHOLD)
+                except sqlite3.Error as e:
+                    print(f"Warning: Could not query section index {self.section_index.path}: {e}")
+                    return results
+                students = {m["student_id"] for m in matches}
+                if not students:
+                    continue
+                entry = {
+                    "section": label,
+                    "document": doc["filename"],
+                    "matching_students": len(students),
+                    "boilerplate": len(students) >= SectionFingerprintIndex.BOILERPLATE_STUDENTS,
+                }
+                # Boilerplate is summarized rather than listed student by student,
+                # and other students' document names are never carried over
+                if not entry["boilerplate"]:
+                    entry["matches"] = [
+                        {"student_id": m["student_id"], "similarity": m["similarity"]} for m in matches
+                    ]
+                results.append(entry)
+        return results
+
+    @cached_property
+    def section_fingerprints(self) -> list[tuple[str, str, tuple]]:
+        """``(document, section, signature)`` for every signed IEP section, for the district index."""
+        return [
+            (doc["filename"], label, signature)
+            for doc in self.document_groups["IEP"]
+            for label, signature in self._text(doc["filename"]).fingerprints.items()
+        ]
+
+    @cached_property
+    def student_info(self) -> dict:
+        """Student identity, resolved once after the reference profiles load."""
+        return self._extract_student_info()
+
     def _load_assessment_profile(self) -> dict:
         """Load assessment profile from Frontline export."""
-        if not PANDAS_AVAILABLE:
-            return None
-        
-        if not ASSESSMENT_PROFILE_PATH.exists():
+        match = self.reference.rows("assessment", self.student_id)
+        if match is None:
             return None
         
         try:
-            df = pd.read_excel(ASSESSMENT_PROFILE_PATH, sheet_name='Assessment Profiles')
-            match = df[df['Student ID'].astype(str) == self.student_id]
-            if match.empty:
-                return None
-            
             row = match.iloc[0]
             self.assessment_profile = {
                 'student_name': row['Student Name'] if pd.notna(row['Student Name']) else None,
@@ -144,51 +1417,12 @@ class StudentDocumentAnalyzer:
         using simple substring matching on column headers.
         """
 
-        if not PANDAS_AVAILABLE:
-            return None
-
-        from pandas import DataFrame  # type: ignore
-
-        candidates = [
-            OUTPUT_FOLDER / "COMPLIANCE_TABLE__ALL_CASE_MANAGERS.xlsx",
-            REFERENCE_FOLDER / "COMPLIANCE_TABLE__ALL_CASE_MANAGERS.xlsx",
-        ]
-
-        df: DataFrame | None = None
-        for path in candidates:
-            if not path.exists():
-                continue
-            try:
-                import pandas as pd  # type: ignore
-
-                df = pd.read_excel(path)
-                break
-            except Exception as e:  # noqa: BLE001
-                print(f"Warning: Could not load compliance table {path}: {e}")
-                df = None
-
-        if df is None or df.empty:
-            return None
-
-        # Try to locate the student-id column heuristically
-        id_col = None
-        for col in df.columns:
-            name = str(col).lower()
-            if "student" in name and "id" in name:
-                id_col = col
-                break
-        if id_col is None:
-            return None
-
-        try:
-            sub = df[df[id_col].astype(str) == str(self.student_id)]
-        except Exception:
-            return None
-        if sub.empty:
+        sub = self.reference.rows("compliance", self.student_id)
+        if sub is None:
             return None
 
         row = sub.iloc[0]
-        result: dict = {"source_file": str(path)}  # type: ignore[name-defined]
+        result: dict = {"source_file": str(self.reference.paths["compliance"])}
 
         def pick(key: str, *needles: str) -> None:
             val = None
@@ -222,30 +1456,9 @@ class StudentDocumentAnalyzer:
         accommodations profile, grouped into classroom vs testing supports.
         """
 
-        if not PANDAS_AVAILABLE:
-            return None
-
         path = ACCOMMODATIONS_CSV_PATH
-        if not path.exists():
-            return None
-
-        try:
-            import pandas as pd  # type: ignore
-
-            try:
-                df = pd.read_csv(path, dtype=str).fillna("")
-            except UnicodeDecodeError:
-                # Fallback for Windows-encoded exports
-                df = pd.read_csv(path, dtype=str, encoding="latin1").fillna("")
-        except Exception as e:  # noqa: BLE001
-            print(f"Warning: Could not load accommodations table {path}: {e}")
-            return None
-
-        if "Student ID" not in df.columns:
-            return None
-
-        sub = df[df["Student ID"].astype(str) == str(self.student_id)]
-        if sub.empty:
+        sub = self.reference.rows("accommodations", self.student_id)
+        if sub is None:
             return None
 
         classroom: list[str] = []
@@ -298,35 +1511,9 @@ class StudentDocumentAnalyzer:
         simple behavior-goal flag the ARD deck and AI blocks can reference.
         """
 
-        if not PANDAS_AVAILABLE:
-            return None
-
         path = GOALS_CSV_PATH
-        if not path.exists():
-            return None
-
-        try:
-            import pandas as pd  # type: ignore
-
-            try:
-                df = pd.read_csv(path, dtype=str, engine="python", on_bad_lines="skip").fillna("")
-            except UnicodeDecodeError:
-                df = pd.read_csv(
-                    path,
-                    dtype=str,
-                    encoding="latin1",
-                    engine="python",
-                    on_bad_lines="skip",
-                ).fillna("")
-        except Exception as e:  # noqa: BLE001
-            print(f"Warning: Could not load goals table {path}: {e}")
-            return None
-
-        if "Student ID" not in df.columns:
-            return None
-
-        sub = df[df["Student ID"].astype(str) == str(self.student_id)]
-        if sub.empty:
+        sub = self.reference.rows("goals", self.student_id)
+        if sub is None:
             return None
 
         # Prefer ACTIVE IEP plans
@@ -389,23 +1576,15 @@ class StudentDocumentAnalyzer:
         path = TELPAS_CSV_PATH
         telpas_row = None
 
-        if path.exists():
-            try:
-                import pandas as pd  # type: ignore
-
-                df = pd.read_csv(path, dtype=str).fillna("")
-                if "Student ID" in df.columns:
-                    sub = df[df["Student ID"].astype(str) == str(self.student_id)]
-                    if not sub.empty:
-                        # Take the most recent row by Schedule Date if available
-                        if "Schedule Date" in sub.columns:
-                            try:
-                                sub = sub.sort_values("Schedule Date")
-                            except Exception:
-                                pass
-                        telpas_row = sub.iloc[-1]
-            except Exception as e:  # noqa: BLE001
-                print(f"Warning: Could not load TELPAS table {path}: {e}")
+        sub = self.reference.rows("telpas", self.student_id)
+        if sub is not None:
+            # Take the most recent row by Schedule Date if available
+            if "Schedule Date" in sub.columns:
+                try:
+                    sub = sub.sort_values("Schedule Date")
+                except Exception:
+                    pass
+            telpas_row = sub.iloc[-1]
 
         if not telpas_row and not (self.assessment_profile or {}).get("telpas_type"):
             return None
@@ -450,7 +1629,7 @@ class StudentDocumentAnalyzer:
         profile = {
             "source_files": [
                 str(path) if path.exists() else None,
-                str(ASSESSMENT_PROFILE_PATH) if ASSESSMENT_PROFILE_PATH.exists() else None,
+                str(self.reference.assessment_profile_path) if self.reference.assessment_profile_path.exists() else None,
             ],
             "has_telpas": bool(telpas_row is not None or telpas_type),
             "telpas_type": telpas_type,
@@ -479,26 +1658,9 @@ class StudentDocumentAnalyzer:
         can be displayed as a quick-look behavior chart.
         """
 
-        if not PANDAS_AVAILABLE:
-            return None
-
         path = BIP_CSV_PATH
-        if not path.exists():
-            return None
-
-        try:
-            import pandas as pd  # type: ignore
-
-            df = pd.read_csv(path, dtype=str).fillna("")
-        except Exception as e:  # noqa: BLE001
-            print(f"Warning: Could not load BIP table {path}: {e}")
-            return None
-
-        if "Student ID" not in df.columns:
-            return None
-
-        sub = df[df["Student ID"].astype(str) == str(self.student_id)]
-        if sub.empty:
+        sub = self.reference.rows("bip", self.student_id)
+        if sub is None:
             return None
 
         # Many rows per student for different services; infer BIP/FBA from any row
@@ -563,26 +1725,9 @@ class StudentDocumentAnalyzer:
         noted accommodations or special vehicle needs.
         """
 
-        if not PANDAS_AVAILABLE:
-            return None
-
         path = TRANSPORT_CSV_PATH
-        if not path.exists():
-            return None
-
-        try:
-            import pandas as pd  # type: ignore
-
-            df = pd.read_csv(path, dtype=str).fillna("")
-        except Exception as e:  # noqa: BLE001
-            print(f"Warning: Could not load transportation table {path}: {e}")
-            return None
-
-        if "Student ID" not in df.columns:
-            return None
-
-        sub = df[df["Student ID"].astype(str) == str(self.student_id)]
-        if sub.empty:
+        sub = self.reference.rows("transportation", self.student_id)
+        if sub is None:
             return None
 
         # Use the first row (current-year services); future/ESY rows are kept simple
@@ -632,16 +1777,45 @@ class StudentDocumentAnalyzer:
         # IEP_FOLDER (e.g., ieps/10079994/...). Use a recursive search
         # so we don't miss valid documents that are neatly organized
         # into subdirectories by student.
-        files = list(IEP_FOLDER.rglob(pattern))
-        
-        for f in sorted(files):
-            doc_info = self._classify_document(f)
+        # In-memory documents may have names with folders in them; they match
+        # on the file name like rglob does, and keep the full name as "path",
+        # the key into document_data.
+        if self.document_data is not None:
+            files = [(Path(name), name) for name in self.document_data if fnmatch.fnmatch(Path(name).name, pattern)]
+        else:
+            files = [(f, str(f)) for f in self.iep_folder.rglob(pattern)]
+
+        for f, path in sorted(files):
+            doc_info = self._classify_document(f, path)
             self.documents.append(doc_info)
-            
+
+        self._emit("documents_found", documents=[
+            {k: v for k, v in doc.items() if k != "path"} for doc in self.documents
+        ])
         return self.documents
+
+    def _emit(self, event: str, **data):
+        """Report progress to the caller's callback, if any."""
+        if self.progress is not None:
+            self.progress(event, data)
+
+    def _run_module(self, name: str, module):
+        """Run one analysis step, reporting its start and duration."""
+        self._emit("module_started", module=name)
+        started = time.perf_counter()
+        result = module()
+        seconds = self.timings["modules"][name] = time.perf_counter() - started
+        data = {"module": name, "seconds": round(seconds, 4)}
+        if name in self.STREAMED_RESULTS:
+            data["result"] = result
+        self._emit("module_finished", **data)
+        return result
     
-    def _classify_document(self, filepath: Path) -> dict:
-        """Classify document type based on filename and content hints."""
+    def _classify_document(self, filepath: Path, path: str = None) -> dict:
+        """Classify document type based on filename and content hints.
+
+        ``path`` is recorded as the document's path (default ``str(filepath)``).
+        """
         name = filepath.name.lower()
 
         doc_type = "Unknown"
@@ -697,26 +1871,100 @@ class StudentDocumentAnalyzer:
                 
         return {
             "filename": filepath.name,
-            "path": str(filepath),
+            "path": path or str(filepath),
             "type": doc_type,
             "date": date_str,
-            "size": filepath.stat().st_size
+            "size": len(self.document_data[path]) if self.document_data is not None else filepath.stat().st_size
         }
     
     def extract_text(self):
-        """Extract text from all PDFs using pdftotext."""
-        for doc in self.documents:
+        """Extract text from all PDFs using pdftotext.
+
+        Documents are extracted concurrently on a bounded thread pool. Any
+        document that cannot start before the student's time budget runs out
+        is recorded as an error rather than delaying the whole analysis.
+        Previously extracted PDFs are served from TEXT_CACHE.
+        """
+        if not self.documents:
+            return
+
+        deadline = time.monotonic() + EXTRACT_BUDGET_SECONDS
+        workers = max(1, min(EXTRACT_WORKERS, len(self.documents)))
+
+        def extract(doc):
+            started = time.perf_counter()
+            return self._extract_document(doc, deadline), time.perf_counter() - started
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(extract, doc) for doc in self.documents]
+            if self.progress is not None:
+                by_future = dict(zip(futures, self.documents))
+                for future in as_completed(futures):
+                    text, seconds = future.result()
+                    self._emit("document_extracted", filename=by_future[future]["filename"],
+                               seconds=round(seconds, 4), chars=len(text), error=text.startswith("ERROR:"))
+            # Keep extracted_text in document order regardless of finish order
+            for doc, future in zip(self.documents, futures):
+                text, seconds = future.result()
+                self.timings["documents"][doc["filename"]] = {"seconds": seconds, "chars": len(text)}
+                self.extracted_text[doc["filename"]] = text
+                self.texts[doc["filename"]] = DocumentText(text)
+
+        if TEXT_CACHE.enabled and not TEXT_CACHE.defer_evict:
+            TEXT_CACHE.evict()
+
+    def _extract_document(self, doc: dict, deadline: float) -> str:
+        """Run pdftotext on one document within the remaining time budget.
+
+        In-memory documents are piped to pdftotext's stdin.
+        """
+        data = self.document_data.get(doc["path"]) if self.document_data is not None else None
+        cache_key = None
+        if TEXT_CACHE.enabled:
             try:
+                cache_key = TEXT_CACHE.key_for_bytes(data) if data is not None else TEXT_CACHE.key(doc["path"])
+            except OSError:
+                cache_key = None
+            if cache_key:
+                cached = TEXT_CACHE.get(cache_key)
+                if cached is not None:
+                    return cached
+
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return "ERROR: extraction time budget exceeded"
+        try:
+            if data is not None:
                 result = subprocess.run(
-                    ["pdftotext", "-layout", doc["path"], "-"],
+                    ["pdftotext", *PDFTOTEXT_FLAGS, "-", "-"],
+                    input=data,
+                    capture_output=True,
+                    timeout=min(PDFTOTEXT_TIMEOUT, remaining)
+                )
+                text = result.stdout.decode("utf-8")
+            else:
+                result = subprocess.run(
+                    ["pdftotext", *PDFTOTEXT_FLAGS, doc["path"], "-"],
                     capture_output=True,
                     text=True,
-                    timeout=30
+                    timeout=min(PDFTOTEXT_TIMEOUT, remaining)
                 )
-                self.extracted_text[doc["filename"]] = result.stdout
-            except Exception as e:
-                self.extracted_text[doc["filename"]] = f"ERROR: {e}"
+                text = result.stdout
+        except Exception as e:
+            return f"ERROR: {e}"
+
+        # Only cache clean extractions so transient failures are retried
+        if cache_key and result.returncode == 0:
+            TEXT_CACHE.put(cache_key, text)
+        return text
                 
+    def _text(self, filename: str) -> DocumentText:
+        """Shared text views for a document (empty if it was never extracted)."""
+        doc_text = self.texts.get(filename)
+        if doc_text is None:
+            doc_text = self.texts[filename] = DocumentText(self.extracted_text.get(filename, ""))
+        return doc_text
+
     def _load_map_data(self):
         """Load and parse MAP assessment data if available."""
         if not MAP_PARSER_AVAILABLE:
@@ -876,17 +2124,17 @@ class StudentDocumentAnalyzer:
         }
         
         # Find the most recent IEP
-        ieps = [d for d in self.documents if "IEP" in d["type"]]
-        if not ieps:
+        latest_iep = self.latest_documents["IEP"]
+        if latest_iep is None:
             return result
-            
-        latest_iep = sorted(ieps, key=lambda x: x["date"] or "", reverse=True)[0]
-        text = self.extracted_text.get(latest_iep["filename"], "")
+
+        doc_text = self._text(latest_iep["filename"])
+        text, sections = doc_text.raw, doc_text.sections
         
         # Find the DELIBERATIONS section
-        delib_start = text.find("XXI. DELIBERATIONS")
+        delib_start = sections.find("XXI. DELIBERATIONS")
         if delib_start == -1:
-            delib_start = text.find("DELIBERATIONS")
+            delib_start = sections.find("DELIBERATIONS")
         
         if delib_start == -1:
             return result
@@ -895,11 +2143,23 @@ class StudentDocumentAnalyzer:
         end_markers = ["XXII.", "XXIII.", "ASSURANCES", "Report Generated"]
         delib_end = len(text)
         for marker in end_markers:
-            idx = text.find(marker, delib_start + 100)
+            idx = sections.find(marker, delib_start + 100)
             if idx != -1 and idx < delib_end:
                 delib_end = idx
         
         delib_text = text[delib_start:delib_end]
+
+        def find_in_delib(title: str, start: int = 0) -> int:
+            # Same as delib_text.find(title, start), answered from the index
+            idx = sections.find(title, delib_start + start, delib_end)
+            return idx - delib_start if idx != -1 else -1
+
+        def lower_delib(start: int, end: int) -> str:
+            # Same as delib_text[start:end].lower(), sliced from the cached
+            # view, whose offsets match unless lower() changed the length
+            if len(doc_text.lower) == len(text):
+                return doc_text.lower[delib_start + start:delib_start + end]
+            return delib_text[start:end].lower()
         result["available"] = True
         
         # Extract meeting info
@@ -939,8 +2199,9 @@ class StudentDocumentAnalyzer:
                     continue
                 # Check if this line contains a role
                 found_role = None
+                line_lower = line.lower()
                 for role in roles:
-                    if role.lower() in line.lower():
+                    if role.lower() in line_lower:
                         found_role = role
                         name = line.replace(role, "").strip().strip('/')
                         break
@@ -978,11 +2239,12 @@ class StudentDocumentAnalyzer:
         
         # Extract PLAAFP sections (English and Math)
         # Find the first English section through to Math section to get all content
-        english_start = delib_text.find("Present Levels of Academic Achievement and Functional Performance(English)")
-        math_start = delib_text.find("Present Levels of Academic Achievement and Functional Performance(Math)")
+        english_start = find_in_delib("Present Levels of Academic Achievement and Functional Performance(English)")
+        math_start = find_in_delib("Present Levels of Academic Achievement and Functional Performance(Math)")
         
         if english_start != -1 and math_start != -1 and math_start > english_start:
             english_section = delib_text[english_start:math_start]
+            english_lower = lower_delib(english_start, math_start)
             
             plaafp_entry = {"subject": "English"}
             
@@ -997,13 +2259,13 @@ class StudentDocumentAnalyzer:
                 plaafp_entry["teacher_comment"] = teacher_match.group(1).strip()[:300]
             
             # Progress - look for "has not met" or "has met"
-            if "has not met" in english_section.lower():
+            if "has not met" in english_lower:
                 plaafp_entry["goal_progress"] = "Goal NOT MET"
-            elif "did not meet" in english_section.lower():
+            elif "did not meet" in english_lower:
                 plaafp_entry["goal_progress"] = "Goal NOT MET"
-            elif "has met" in english_section.lower() or "met his goal" in english_section.lower():
+            elif "has met" in english_lower or "met his goal" in english_lower:
                 plaafp_entry["goal_progress"] = "Goal MET"
-            elif "making progress" in english_section.lower():
+            elif "making progress" in english_lower:
                 plaafp_entry["goal_progress"] = "Making progress"
             
             # Concerns
@@ -1015,10 +2277,11 @@ class StudentDocumentAnalyzer:
         
         # Now extract Math section - from Math to Educational Placement
         if math_start != -1:
-            math_end = delib_text.find("EDUCATIONAL ALTERNATIVES", math_start)
+            math_end = find_in_delib("EDUCATIONAL ALTERNATIVES", math_start)
             if math_end == -1:
                 math_end = len(delib_text)
             math_section = delib_text[math_start:math_end]
+            math_lower = lower_delib(math_start, math_end)
             
             plaafp_entry = {"subject": "Math"}
             
@@ -1033,11 +2296,11 @@ class StudentDocumentAnalyzer:
                 plaafp_entry["teacher_comment"] = teacher_match.group(1).strip()[:300]
             
             # Progress
-            if "has not met" in math_section.lower() or "did not meet" in math_section.lower():
+            if "has not met" in math_lower or "did not meet" in math_lower:
                 plaafp_entry["goal_progress"] = "Goal NOT MET"
-            elif "has met" in math_section.lower() or "met his goal" in math_section.lower():
+            elif "has met" in math_lower or "met his goal" in math_lower:
                 plaafp_entry["goal_progress"] = "Goal MET"
-            elif "making progress" in math_section.lower():
+            elif "making progress" in math_lower:
                 plaafp_entry["goal_progress"] = "Making progress"
             
             # Concerns
@@ -1079,17 +2342,8 @@ class StudentDocumentAnalyzer:
         
         # Extract key decisions
         decisions = []
-        decision_keywords = [
-            "agreed to review",
-            "determined the appropriate",
-            "Committee decided",
-            "will continue",
-            "will receive",
-            "recommends",
-            "will participate"
-        ]
-        for keyword in decision_keywords:
-            matches = re.findall(rf'(?:The )?(?:ARD/IEP )?Committee.*?{keyword}[^.]+\.', delib_text, re.IGNORECASE)
+        for pattern, _ in PATTERNS["deliberations.decisions"]:
+            matches = pattern.findall(delib_text)
             for match in matches[:2]:  # Limit per keyword
                 if match not in decisions:
                     decisions.append(match.strip())
@@ -1135,18 +2389,17 @@ class StudentDocumentAnalyzer:
             "alerts": [],
         }
 
-        fie_docs = [d for d in self.documents if d["type"] in ("FIE", "FIIE")]
-        if not fie_docs:
+        # Use most recent FIE
+        doc = self.latest_documents["FIE"]
+        if doc is None:
             return result
 
-        # Use most recent FIE
-        doc = sorted(fie_docs, key=lambda x: x["date"] or "", reverse=True)[0]
         result["available"] = True
         result["document"] = doc["filename"]
         result["doc_type"] = doc["type"]
         result["evaluation_date"] = doc["date"]
-        text = self.extracted_text.get(doc["filename"], "")
-        tl = text.lower()
+        doc_text = self._text(doc["filename"])
+        text, tl = doc_text.raw, doc_text.lower
 
         # ── Consent date ──────────────────────────────────────────────────────
         consent_match = re.search(
@@ -1170,18 +2423,12 @@ class StudentDocumentAnalyzer:
         elif re.search(r'is\s+not\s+eligible|does\s+not\s+(?:meet|qualify)', tl):
             result["eligibility_determined"] = "Not Eligible"
 
+        # One pass over the document for the category, SLD-area and test batteries
+        hits = PATTERNS.scanner("fie.idea_categories", "fie.sld_areas", "fie.tests").scan(tl)
+
         # ── Disability categories considered ──────────────────────────────────
-        idea_categories = [
-            "specific learning disability", "speech or language impairment",
-            "intellectual disability", "emotional disturbance",
-            "autism", "other health impairment", "traumatic brain injury",
-            "visual impairment", "hearing impairment", "deaf-blindness",
-            "orthopedic impairment", "multiple disabilities",
-            "developmental delay"
-        ]
-        for cat in idea_categories:
-            if cat in tl:
-                result["disability_categories_considered"].append(cat.title())
+        for cat in hits.labels("fie.idea_categories"):
+            result["disability_categories_considered"].append(cat.title())
 
         # ── Eligible disability (primary) ─────────────────────────────────────
         elig_match = re.search(
@@ -1192,51 +2439,10 @@ class StudentDocumentAnalyzer:
             result["eligible_disability"] = elig_match.group(1).strip()
 
         # ── SLD areas identified ───────────────────────────────────────────────
-        sld_area_patterns = [
-            ("basic reading", "Basic Reading"),
-            ("reading comprehension", "Reading Comprehension"),
-            ("reading fluency", "Reading Fluency"),
-            (r"math(?:ematics)? calculation", "Math Calculation"),
-            (r"math(?:ematics)? problem.?solving", "Math Problem Solving"),
-            ("written expression", "Written Expression"),
-            ("oral expression", "Oral Expression"),
-            ("listening comprehension", "Listening Comprehension"),
-        ]
-        for pattern, label in sld_area_patterns:
-            if re.search(pattern, tl):
-                result["sld_areas"].append(label)
+        result["sld_areas"].extend(hits.labels("fie.sld_areas"))
 
         # ── Tests administered ────────────────────────────────────────────────
-        test_patterns = [
-            (r'wisc[\s\-]?v|wisc[\s\-]?iv', "WISC-V (Cognitive)"),
-            (r'wj[\s\-]?iv|woodcock.johnson', "WJ-IV (Academic Achievement)"),
-            (r'wj[\s\-]?iii', "WJ-III (Academic Achievement)"),
-            (r'ktea[\s\-]?3|kaufman.*achievement', "KTEA-3 (Academic Achievement)"),
-            (r'wiat[\s\-]?(?:ii|iii|4)', "WIAT (Academic Achievement)"),
-            (r'gort[\s\-]?\d', "GORT (Reading)"),
-            (r'ctopp[\s\-]?\d?', "CTOPP (Phonological Processing)"),
-            (r'celf[\s\-]?\d', "CELF (Language)"),
-            (r'basc[\s\-]?\d', "BASC (Behavior/Social-Emotional)"),
-            (r'conners[\s\-]?\d?', "Conners (ADHD)"),
-            (r'vmi|beery', "Beery VMI (Visual-Motor)"),
-            (r'tvps[\s\-]?\d?', "TVPS (Visual Processing)"),
-            (r'dtvp[\s\-]?\d?', "DTVP (Visual Processing)"),
-            (r'vineland[\s\-]?\d?', "Vineland (Adaptive Behavior)"),
-            (r'abas[\s\-]?\d?', "ABAS (Adaptive Behavior)"),
-            (r'besa|bilingual.*evaluation', "BESA (Bilingual Language)"),
-            (r'bvat', "BVAT (Bilingual Verbal Ability)"),
-            (r'ppvt[\s\-]?\d?', "PPVT (Receptive Vocabulary)"),
-            (r'eva|expressive.*vocabulary', "EVT (Expressive Vocabulary)"),
-            (r'cpt[\s\-]?\d?|continuous.performance', "CPT (Attention)"),
-            (r'cas[\s\-]?\d?', "CAS (Cognitive Assessment)"),
-            (r'kbit[\s\-]?\d?', "KBIT (Brief Cognitive)"),
-            (r'wasi[\s\-]?\d?', "WASI (Brief Cognitive)"),
-            (r'towl[\s\-]?\d?', "TOWL (Written Language)"),
-            (r'told[\s\-]?\d?', "TOLD (Language)"),
-        ]
-        for pattern, label in test_patterns:
-            if re.search(pattern, tl):
-                result["tests_administered"].append(label)
+        result["tests_administered"].extend(hits.labels("fie.tests"))
 
         # ── Score extraction (standard scores + percentiles) ──────────────────
         score_pattern = re.finditer(
@@ -1274,7 +2480,7 @@ class StudentDocumentAnalyzer:
 
         # ── Autism ────────────────────────────────────────────────────────────
         result["autism_indicators"] = bool(
-            re.search(r'autism|asd|ados|adi-r|social\s+communication\s+disorder', tl)
+            re.search(r'\bautism\b|\basd\b|\bados\b|\badi-r\b|social\s+communication\s+disorder', tl)
         )
 
         # ── Intellectual disability / adaptive behavior ───────────────────────
@@ -1380,16 +2586,17 @@ class StudentDocumentAnalyzer:
             "alerts": [],
         }
 
-        reed_docs = [d for d in self.documents if d["type"] == "REED"]
-        if not reed_docs:
+        doc = self.latest_documents["REED"]
+        if doc is None:
             return result
 
-        doc = sorted(reed_docs, key=lambda x: x["date"] or "", reverse=True)[0]
         result["available"] = True
         result["document"] = doc["filename"]
         result["reed_date"] = doc["date"]
-        text = self.extracted_text.get(doc["filename"], "")
-        tl = text.lower()
+        doc_text = self._text(doc["filename"])
+        text, tl = doc_text.raw, doc_text.lower
+
+        hits = PATTERNS.scanner("reed.data_types", "reed.data_sources").scan(tl)
 
         # ── Additional data needed ─────────────────────────────────────────────
         if re.search(r'no additional.*data.*needed|data.*not.*needed|waive.*eval', tl):
@@ -1401,41 +2608,11 @@ class StudentDocumentAnalyzer:
             result["decision"] = "Additional data needed — full FIE required"
 
         # ── What data types needed ────────────────────────────────────────────
-        data_type_patterns = [
-            ("cognitive", "Cognitive Assessment"),
-            ("academic achievement", "Academic Achievement"),
-            ("behavior", "Behavioral Assessment"),
-            ("adaptive", "Adaptive Behavior"),
-            ("speech.*language", "Speech/Language Evaluation"),
-            ("occupational therapy", "Occupational Therapy Evaluation"),
-            ("physical therapy", "Physical Therapy Evaluation"),
-            ("audiol", "Audiological Evaluation"),
-            ("vision", "Vision Evaluation"),
-            ("transition", "Transition Assessment"),
-            ("classroom observation", "Classroom Observation"),
-        ]
         if result["additional_data_needed"]:
-            for pattern, label in data_type_patterns:
-                if re.search(pattern, tl):
-                    result["data_types_needed"].append(label)
+            result["data_types_needed"].extend(hits.labels("reed.data_types"))
 
         # ── Existing data sources reviewed ───────────────────────────────────
-        source_patterns = [
-            (r'previous\s+(?:fie|evaluation|testing)', "Previous FIE/Evaluation"),
-            (r'staar', "STAAR Results"),
-            (r'report\s+card|grades', "Grades/Report Cards"),
-            (r'teacher\s+(?:input|report|observation)', "Teacher Input/Reports"),
-            (r'parent\s+(?:input|concern|interview)', "Parent Input"),
-            (r'progress\s+(?:monitor|data)', "Progress Monitoring Data"),
-            (r'curriculum.based', "Curriculum-Based Assessment"),
-            (r'attendance', "Attendance Records"),
-            (r'discipline', "Discipline Records"),
-            (r'map|nwea', "MAP Assessment"),
-            (r'health\s+(?:record|history)', "Health Records"),
-        ]
-        for pattern, label in source_patterns:
-            if re.search(pattern, tl):
-                result["existing_data_reviewed"].append(label)
+        result["existing_data_reviewed"].extend(hits.labels("reed.data_sources"))
 
         # ── Parent notification ────────────────────────────────────────────────
         result["parent_notified"] = bool(
@@ -1517,14 +2694,13 @@ class StudentDocumentAnalyzer:
             "alerts": [],
         }
 
-        ieps = [d for d in self.documents if "IEP" in d["type"]]
-        if not ieps:
+        doc = self.latest_documents["IEP"]
+        if doc is None:
             return result
 
-        doc = sorted(ieps, key=lambda x: x["date"] or "", reverse=True)[0]
         result["available"] = True
-        text = self.extracted_text.get(doc["filename"], "")
-        tl = text.lower()
+        doc_text = self._text(doc["filename"])
+        text, tl = doc_text.raw, doc_text.lower
 
         # ── IEP dates ─────────────────────────────────────────────────────────
         start_match = re.search(r'(?:iep|plan)\s+(?:start|begin)[:\s]+(\d{1,2}[/\-]\d{1,2}[/\-]\d{2,4})', tl)
@@ -1566,28 +2742,25 @@ class StudentDocumentAnalyzer:
         result["services_total_minutes_per_week"] = total_minutes
 
         # ── Related services ───────────────────────────────────────────────────
-        related_keywords = [
-            "speech-language", "speech language", "occupational therapy",
-            "physical therapy", "counseling", "orientation and mobility",
-            "audiology", "school health", "transportation", "interpreter"
-        ]
-        for kw in related_keywords:
+        hits = PATTERNS.scanner("iep.related_services").scan(tl)
+        for _, kw in PATTERNS["iep.related_services"]:
             if kw in tl:
                 # Try to grab minutes near keyword
-                min_match = re.search(
-                    rf'{re.escape(kw)}.*?(\d+)\s*minutes',
-                    tl, re.I
-                )
+                min_match = hits.first("iep.related_services", kw)
                 result["related_services"].append({
                     "service": kw.title(),
                     "minutes": int(min_match.group(1)) if min_match else None,
                 })
 
         # ── Supplementary aids ────────────────────────────────────────────────
-        supp_section = re.search(
+        # As with the PLAAFP below, each block can only begin at the first
+        # match of its section head, so the patterns are anchored there.
+        heads = doc_text.lower_sections
+        supp_start = heads.head("supplementary_aids")
+        supp_section = re.compile(
             r'supplementary\s+aids?\s+(?:and\s+)?(?:support|service)[s:\s]+(.*?)(?:\n\n|testing|accommodat)',
-            tl, re.DOTALL
-        )
+            re.DOTALL
+        ).match(tl, supp_start) if supp_start != -1 else None
         if supp_section:
             for line in supp_section.group(1).split('\n')[:8]:
                 line = line.strip(' -•*	')
@@ -1595,20 +2768,22 @@ class StudentDocumentAnalyzer:
                     result["supplementary_aids"].append(line[:200])
 
         # ── Classroom & testing accommodations (from IEP PDF directly) ────────
-        acc_section = re.search(
+        acc_start = heads.head("classroom_accommodations")
+        acc_section = re.compile(
             r'(?:classroom\s+accommodat|instructional\s+accommodat)[s:\s]+(.*?)(?:testing\s+accommodat|state\s+assess|goal|$)',
-            tl, re.DOTALL
-        )
+            re.DOTALL
+        ).match(tl, acc_start) if acc_start != -1 else None
         if acc_section:
             for line in acc_section.group(1).split('\n')[:15]:
                 line = line.strip(' -•*	✓□')
                 if len(line) > 5:
                     result["classroom_accommodations"].append(line[:200])
 
-        test_acc_section = re.search(
+        test_acc_start = heads.head("testing_accommodations")
+        test_acc_section = re.compile(
             r'(?:testing\s+accommodat|state\s+assess.*accommodat)[s:\s]+(.*?)(?:goal|esy|extended\s+school|assistive\s+tech|$)',
-            tl, re.DOTALL
-        )
+            re.DOTALL
+        ).match(tl, test_acc_start) if test_acc_start != -1 else None
         if test_acc_section:
             for line in test_acc_section.group(1).split('\n')[:15]:
                 line = line.strip(' -•*	✓□')
@@ -1655,7 +2830,7 @@ class StudentDocumentAnalyzer:
         )
 
         # ── BIP ────────────────────────────────────────────────────────────────
-        result["bip_present"] = bool(re.search(r'bip|behavior\s+intervention\s+plan', tl))
+        result["bip_present"] = bool(re.search(r'\bbip\b|behavior\s+intervention\s+plan', tl))
 
         # ── Manifestation Determination ────────────────────────────────────────
         result["manifestation_determination"] = bool(
@@ -1681,19 +2856,11 @@ class StudentDocumentAnalyzer:
             result["section_504_relationship"] = "Referenced in IEP"
 
         # ── PLAAFP all domains ─────────────────────────────────────────────────
-        domains = [
-            "English/Reading", "Mathematics", "Written Language", "Science",
-            "Social Studies", "Speech/Language", "Communication",
-            "Adaptive Behavior", "Social-Emotional/Behavioral",
-            "Motor/Physical", "Transition", "Vocational",
-        ]
-        for domain in domains:
-            # Build a flexible search pattern for each domain
-            pattern_key = domain.lower().replace("/", r"[/\s]").replace("-", r"[\-\s]")
-            section_match = re.search(
-                rf'present\s+levels.*?{pattern_key}.*?\n(.*?)(?:goal|present\s+level|service|$)',
-                tl, re.DOTALL
-            )
+        # Every domain pattern starts at "present levels"; only the first such
+        # heading can begin a match, so anchor each pattern there.
+        present_levels = doc_text.lower_sections.head("present_levels")
+        for pattern, domain in PATTERNS["iep.plaafp_domains"]:
+            section_match = pattern.match(tl, present_levels) if present_levels != -1 else None
             if section_match:
                 content_raw = section_match.group(1).strip()[:600]
                 if len(content_raw) > 30:
@@ -1709,10 +2876,11 @@ class StudentDocumentAnalyzer:
             if len(goal_text) < 20:
                 continue
 
-            has_timeframe = bool(re.search(r'by.*?(?:end|date|iep)', goal_text, re.I))
-            has_condition = bool(re.search(r'given|when|after|during', goal_text, re.I))
-            has_behavior = bool(re.search(r'will\s+\w+', goal_text, re.I))
-            has_criterion = bool(re.search(r'\d+\s*(?:out of|%|percent|times)', goal_text, re.I))
+            components = {label: bool(pattern.search(goal_text)) for pattern, label in PATTERNS["goals.tea_components"]}
+            has_timeframe = components["has_timeframe"]
+            has_condition = components["has_condition"]
+            has_behavior = components["has_behavior"]
+            has_criterion = components["has_criterion"]
 
             progress_method = None
             prog_match = re.search(r'progress.*?(?:monitor|measure)[:\s]+([^\n]{5,80})', goal_text, re.I)
@@ -1749,36 +2917,47 @@ class StudentDocumentAnalyzer:
 
         return result
 
+    # analyze_all results small enough to stream with their module_finished event
+    STREAMED_RESULTS = ("evaluation_status", "student_info")
+
     def analyze_all(self):
         """Run all analysis modules."""
         # Load assessment profile from Frontline
-        self._load_assessment_profile()
+        self._run_module("load_assessment_profile", self._load_assessment_profile)
         # Load normalized SIS/MAP/STAAR profile if available
-        self._load_student_profile()
+        self._run_module("load_student_profile", self._load_student_profile)
         # Load compliance / transportation / alternate assessment profile if available
-        self._load_compliance_profile()
+        self._run_module("load_compliance_profile", self._load_compliance_profile)
         # Load additional Lively-wide Frontline profiles
-        self._load_accommodations_profile()
-        self._load_goals_profile()
-        self._load_telpas_profile()
-        self._load_behavior_intervention()
-        self._load_transportation_profile()
-        
+        self._run_module("load_accommodations_profile", self._load_accommodations_profile)
+        self._run_module("load_goals_profile", self._load_goals_profile)
+        self._run_module("load_telpas_profile", self._load_telpas_profile)
+        self._run_module("load_behavior_intervention", self._load_behavior_intervention)
+        self._run_module("load_transportation_profile", self._load_transportation_profile)
+
+        modules = {
+            "evaluation_status": self._analyze_evaluation_timeline,
+            "copy_paste_issues": self._detect_copy_paste,
+            "section_similarity": lambda: self.section_similarity,
+            "cross_student_matches": lambda: self.cross_student_matches,
+            "sld_consistency": self._analyze_sld_consistency,
+            "attention_red_flags": self._detect_adhd_indicators,
+            "dyslexia_status": self._analyze_dyslexia_status,
+            "attendance_analysis": self._analyze_attendance,
+            "goal_analysis": self._analyze_goals,
+            "student_info": lambda: self.student_info,
+            "map_assessment": self._analyze_map_assessment,
+            "deliberations": self._extract_deliberations,  # ARD Deliberations
+        }
         self.analysis = {
             "student_id": self.student_id,
             "document_count": len(self.documents),
             "documents": self.documents,
             "alerts": [],
-            "evaluation_status": self._analyze_evaluation_timeline(),
-            "copy_paste_issues": self._detect_copy_paste(),
-            "sld_consistency": self._analyze_sld_consistency(),
-            "attention_red_flags": self._detect_adhd_indicators(),
-            "dyslexia_status": self._analyze_dyslexia_status(),
-            "attendance_analysis": self._analyze_attendance(),
-            "goal_analysis": self._analyze_goals(),
-            "student_info": self._extract_student_info(),
-            "map_assessment": self._analyze_map_assessment(),
-            "deliberations": self._extract_deliberations(),  # ARD Deliberations
+        }
+        for name, module in modules.items():
+            self.analysis[name] = self._run_module(name, module)
+        self.analysis.update({
             "assessment_profile": self.assessment_profile,  # Frontline Assessment Profile
             "student_profile": self.student_profile,  # SIS/MAP/STAAR template profile
             "compliance_profile": self.compliance_profile,  # Funding/transport/alt-assessment
@@ -1787,14 +2966,14 @@ class StudentDocumentAnalyzer:
             "telpas_profile": self.telpas_profile,
             "behavior_intervention": self.behavior_intervention,
             "transportation_profile": self.transportation_profile,
-            "fie_data": self._extract_fie_data(),
-            "reed_data": self._extract_reed_data(),
-            "iep_services": self._extract_iep_services(),
-        }
-        
+        })
+        self.analysis["fie_data"] = self._run_module("fie_data", self._extract_fie_data)
+        self.analysis["reed_data"] = self._run_module("reed_data", self._extract_reed_data)
+        self.analysis["iep_services"] = self._run_module("iep_services", self._extract_iep_services)
+
         # Compile all alerts
-        self._compile_alerts()
-        
+        self._run_module("alerts", self._compile_alerts)
+
         return self.analysis
     
     def _extract_student_info(self) -> dict:
@@ -1819,11 +2998,10 @@ class StudentDocumentAnalyzer:
                 info["name"] = profile_name
         
         # Find the most recent IEP
-        ieps = [d for d in self.documents if "IEP" in d["type"]]
-        if not ieps:
+        latest_iep = self.latest_documents["IEP"]
+        if latest_iep is None:
             return info
-            
-        latest_iep = sorted(ieps, key=lambda x: x["date"] or "", reverse=True)[0]
+
         text = self.extracted_text.get(latest_iep["filename"], "")
         
         # PRIORITY 2: Extract name from IEP only if not found in profile
@@ -1906,11 +3084,11 @@ class StudentDocumentAnalyzer:
             if doc["type"] == "REED":
                 result["last_reed_date"] = doc["date"]
                 # Check if REED had actual testing
-                if "no additional data is needed" in text.lower():
+                if "no additional data is needed" in self._text(doc["filename"]).lower:
                     result["reed_had_testing"] = False
                     
             # Look for FIE date references in any document
-            fie_match = re.search(r'evaluation.*?report.*?dated?\s*(\d{1,2}[./]\d{1,2}[./]\d{2,4})', text, re.I)
+            fie_match = PATTERNS["documents.fields"].pattern("fie_reference").search(text)
             if fie_match:
                 try:
                     date_str = fie_match.group(1)
@@ -1942,16 +3120,42 @@ class StudentDocumentAnalyzer:
     def _detect_copy_paste(self) -> list:
         """Detect copy/paste issues between IEPs."""
         issues = []
+
+        section_titles = {
+            "plaafp": "PLAAFP",
+            "parent_concerns": "Parent Concerns",
+            "transition": "Transition",
+            "accommodations": "Accommodations",
+        }
+
+        # Check for sections matching another student's IEP (best match per student)
+        for entry in self.cross_student_matches:
+            if entry["boilerplate"]:
+                continue
+            section_text = " ".join(self._text(entry["document"]).comparable_sections[entry["section"]].split())
+            seen = set()
+            for match in entry["matches"]:
+                if match["student_id"] in seen:
+                    continue
+                seen.add(match["student_id"])
+                issues.append({
+                    "severity": "HIGH",
+                    "type": "CROSS_STUDENT_PASTE",
+                    "section": section_titles[entry["section"]],
+                    "other_student": match["student_id"],
+                    "similarity": f"{match['similarity']*100:.0f}%",
+                    "text_preview": section_text[:100] + "...",
+                    "document": entry["document"]
+                })
         
         # Get IEPs sorted by date
-        ieps = [d for d in self.documents if "IEP" in d["type"] and d["date"]]
-        ieps = sorted(ieps, key=lambda x: x["date"])
+        ieps = sorted((d for d in self.document_groups["IEP"] if d["date"]), key=lambda x: x["date"])
         
         if len(ieps) < 2:
             return issues
             
         # Check for wrong student names
-        student_info = self._extract_student_info()
+        student_info = self.student_info
         expected_first_name = None
         if student_info.get("name"):
             name_parts = student_info.get("name", "").split()
@@ -1964,7 +3168,7 @@ class StudentDocumentAnalyzer:
             text = self.extracted_text.get(doc["filename"], "")
             
             # Look for patterns like "Name will" or "Name has" which typically have student first names
-            name_will_matches = re.findall(r'\b([A-Z][a-z]{2,10})\s+(?:will\s+be|will\s+receive|has\s+been|is\s+expected|needs?\s+to)', text)
+            name_will_matches = PATTERNS["copy_paste.names"].pattern("name_will").findall(text)
             all_first_names.update(name_will_matches)
         
         # Now check for wrong names in documents
@@ -1973,7 +3177,7 @@ class StudentDocumentAnalyzer:
             
             # Look for any first name that appears in "will be provided" type sentences
             # that doesn't match the expected student name
-            name_in_service_pattern = re.findall(r'([A-Z][a-z]{2,10})\s+(?:will\s+be\s+provided|will\s+receive|will\s+participate)', text)
+            name_in_service_pattern = PATTERNS["copy_paste.names"].pattern("name_in_service").findall(text)
             
             for found_name in name_in_service_pattern:
                 # Skip common words that might match
@@ -2003,7 +3207,7 @@ class StudentDocumentAnalyzer:
             text = self.extracted_text.get(iep["filename"], "")
             
             # Find attendance "as of" date
-            attendance_match = re.search(r'days\s+absent\s+as\s+of\s+(\d{2}/\d{2}/\d{4})', text, re.I)
+            attendance_match = PATTERNS["documents.fields"].pattern("attendance_as_of").search(text)
             if attendance_match and iep["date"]:
                 try:
                     data_date = datetime.strptime(attendance_match.group(1), "%m/%d/%Y")
@@ -2022,29 +3226,24 @@ class StudentDocumentAnalyzer:
                 except:
                     pass
         
-        # Check for identical parent concerns
-        parent_concerns = {}
-        for iep in ieps:
-            text = self.extracted_text.get(iep["filename"], "")
-            concern_match = re.search(r'Parent.*?input.*?concerns?:?\s*(.{50,200})', text, re.I | re.DOTALL)
-            if concern_match:
-                concern_text = concern_match.group(1).strip()[:200]
-                
-                # Check if this exact text appeared before
-                for prev_date, prev_text in parent_concerns.items():
-                    similarity = SequenceMatcher(None, concern_text, prev_text).ratio()
-                    if similarity > 0.9 and iep["date"] != prev_date:
-                        issues.append({
-                            "severity": "HIGH",
-                            "type": "STALE_PARENT_CONCERNS",
-                            "current_iep": iep["date"],
-                            "original_iep": prev_date,
-                            "similarity": f"{similarity*100:.0f}%",
-                            "text_preview": concern_text[:100] + "...",
-                            "document": iep["filename"]
-                        })
-                        
-                parent_concerns[iep["date"]] = concern_text
+        # Check for sections carried over from an earlier IEP (closest match only)
+        closest = {}
+        for score in self.section_similarity:
+            key = (score["document"], score["section"])
+            if key not in closest or score["similarity"] > closest[key]["similarity"]:
+                closest[key] = score
+        for (document, label), score in closest.items():
+            section_text = " ".join(self._text(document).comparable_sections[label].split())
+            issues.append({
+                "severity": "HIGH",
+                "type": f"STALE_{label.upper()}",
+                "section": section_titles[label],
+                "current_iep": score["current_iep"],
+                "original_iep": score["previous_iep"],
+                "similarity": f"{score['similarity']*100:.0f}%",
+                "text_preview": section_text[:100] + "...",
+                "document": document
+            })
                 
         return issues
     
@@ -2059,55 +3258,32 @@ class StudentDocumentAnalyzer:
             "consistent": True
         }
         
-        # Common SLD area patterns
-        sld_patterns = [
-            r'basic\s*reading',
-            r'reading\s*comprehension',
-            r'reading\s*fluency',
-            r'math(?:ematics)?\s*calculation',
-            r'math(?:ematics)?\s*problem\s*solving',
-            r'written\s*expression',
-            r'oral\s*expression',
-            r'listening\s*comprehension'
-        ]
-        
-        # Patterns indicating dismissal/exit from an area
-        dismissal_patterns = [
-            r'(?:dismissed|exited|discontinued|removed)\s+(?:from\s+)?(?:services?\s+)?(?:in\s+)?(?:the\s+area\s+of\s+)?',
-            r'no\s+longer\s+(?:requires?|needs?|qualifies?)',
-            r'(?:met|achieved)\s+(?:goal|criteria|benchmark).*?(?:dismiss|exit|discontinue)',
-            r'(?:services?|instruction)\s+(?:in|for).*?(?:will\s+be\s+)?(?:dismissed|discontinued|exited)',
-            r'ard\s+committee.*?(?:determined|decided).*?(?:dismiss|exit|discontinue)',
-            r'progress\s+(?:sufficient|adequate).*?(?:dismiss|exit)',
-            r'(?:has|have)\s+(?:been\s+)?(?:dismissed|exited)\s+from',
-            r'(?:recommend|recommends|recommended)\s+(?:dismissal|exit)',
-            r'goal\s+(?:mastered|met).*?(?:dismiss|exit|discontinue)',
-            r'(?:closing|closure)\s+(?:of\s+)?(?:services?|goal)',
-        ]
-        
         # Find areas in FIE/REED
         for doc in self.documents:
             if doc["type"] in ["FIE", "REED"]:
-                text = self.extracted_text.get(doc["filename"], "").lower()
-                for pattern in sld_patterns:
-                    if re.search(pattern, text) and pattern not in [p.lower() for p in result["fie_areas"]]:
-                        # Convert pattern to readable name
-                        area_name = pattern.replace(r'\s*', ' ').replace(r'(?:ematics)?', '').title()
+                text = self._text(doc["filename"]).lower
+                hits = PATTERNS.scanner("sld.areas").scan(text)
+                for pattern, area_name in PATTERNS["sld.areas"]:
+                    if hits.first("sld.areas", area_name) and pattern.pattern not in [p.lower() for p in result["fie_areas"]]:
                         result["fie_areas"].append(area_name)
         
         # Find areas in current IEP (eligibility section)
-        ieps = [d for d in self.documents if "IEP" in d["type"]]
-        if ieps:
-            latest_iep = sorted(ieps, key=lambda x: x["date"] or "", reverse=True)[0]
-            text = self.extracted_text.get(latest_iep["filename"], "").lower()
+        latest_iep = self.latest_documents["IEP"]
+        if latest_iep is not None:
+            iep_text = self._text(latest_iep["filename"])
+            text = iep_text.lower
             
-            # Look specifically in eligibility section
-            eligibility_section = re.search(r'determination\s*of\s*eligibility.*?(?:present\s*levels|plaafp)', text, re.DOTALL)
+            # Look specifically in eligibility section. Only the first
+            # eligibility heading can start a match, so anchor there rather
+            # than letting the lazy DOTALL scan retry from every occurrence.
+            eligibility_start = iep_text.lower_sections.head("eligibility")
+            eligibility_section = None
+            if eligibility_start != -1:
+                eligibility_section = ELIGIBILITY_SECTION_RE.match(text, eligibility_start)
             if eligibility_section:
                 elig_text = eligibility_section.group(0)
-                for pattern in sld_patterns:
-                    if re.search(pattern, elig_text):
-                        area_name = pattern.replace(r'\s*', ' ').replace(r'(?:ematics)?', '').title()
+                for pattern, area_name in PATTERNS["sld.areas"]:
+                    if pattern.search(elig_text):
                         result["current_iep_areas"].append(area_name)
         
         # Compare
@@ -2121,33 +3297,21 @@ class StudentDocumentAnalyzer:
         potentially_mastered = []  # Areas where goals may have been met
         still_missing = []
         
-        # Patterns indicating goal mastery
-        mastery_patterns = [
-            r'(?:goal|objective).*?(?:met|mastered|achieved|accomplished)',
-            r'(?:met|mastered|achieved).*?(?:goal|objective|benchmark|criteria)',
-            r'progress.*?(?:sufficient|adequate|satisfactory)',
-            r'(?:demonstrate[ds]?|show[ns]?).*?(?:mastery|proficiency)',
-            r'(?:no\s+longer\s+)?(?:requires?|needs?).*?(?:specially\s+designed\s+instruction|sdi)',
-            r'performing.*?(?:at|above).*?(?:grade|level|standard)',
-        ]
-        
         for area in missing:
             area_dismissed = False
             area_mastered = False
-            area_lower = area.lower()
+            area_regex = area.lower().replace(' ', r'\s*')
             
             # Check all documents for dismissal language related to this area
             for doc in self.documents:
-                doc_text = self.extracted_text.get(doc["filename"], "").lower()
+                doc_text = self._text(doc["filename"]).lower
                 
                 # Look for dismissal patterns near the area name
-                for dismiss_pattern in dismissal_patterns:
+                for dismiss_pattern in PATTERNS["sld.dismissal"].sources:
                     # Check if dismissal language appears near the SLD area (within ~200 chars)
                     # Pattern: dismissal language + area OR area + dismissal language
-                    combined_pattern1 = dismiss_pattern + r'.{0,100}' + area_lower.replace(' ', r'\s*')
-                    combined_pattern2 = area_lower.replace(' ', r'\s*') + r'.{0,100}' + dismiss_pattern
-                    
-                    if re.search(combined_pattern1, doc_text) or re.search(combined_pattern2, doc_text):
+                    if (PATTERNS.near(dismiss_pattern, area_regex, 100).search(doc_text)
+                            or PATTERNS.near(area_regex, dismiss_pattern, 100).search(doc_text)):
                         area_dismissed = True
                         dismissed.append({
                             "area": area,
@@ -2161,11 +3325,9 @@ class StudentDocumentAnalyzer:
                     
                 # If not explicitly dismissed, check for goal mastery language in this area
                 if not area_dismissed:
-                    for mastery_pattern in mastery_patterns:
-                        combined_pattern1 = area_lower.replace(' ', r'\s*') + r'.{0,200}' + mastery_pattern
-                        combined_pattern2 = mastery_pattern + r'.{0,200}' + area_lower.replace(' ', r'\s*')
-                        
-                        if re.search(combined_pattern1, doc_text) or re.search(combined_pattern2, doc_text):
+                    for mastery_pattern in PATTERNS["sld.mastery"].sources:
+                        if (PATTERNS.near(area_regex, mastery_pattern, 200).search(doc_text)
+                                or PATTERNS.near(mastery_pattern, area_regex, 200).search(doc_text)):
                             area_mastered = True
                             potentially_mastered.append({
                                 "area": area,
@@ -2197,34 +3359,14 @@ class StudentDocumentAnalyzer:
             "recommendation": None
         }
         
-        attention_patterns = [
-            (r'attention.*?(?:below|poor|weak|deficit|difficulty)', "Attention rated below average"),
-            (r'easily\s+distracted', "Easily distracted"),
-            (r'processing\s+speed.*?(?:weakness|deficit|significant)', "Processing speed deficit"),
-            (r'frequent\s+breaks', "Needs frequent breaks"),
-            (r'cool\s*down\s*(?:period|time|opportunity)', "Needs cool-down periods"),
-            (r'attention\s+processing', "Attention processing issues"),
-            (r'difficulty\s+(?:completing|finishing)\s+tasks', "Difficulty completing tasks"),
-            (r'organizational\s+skills.*?below', "Organizational skills below average"),
-            (r'redirect(?:ion|ed)', "Needs redirection"),
-            (r'(?:sleeping|drowsy)\s+in\s+class', "Sleeping in class")
-        ]
-        
-        adhd_eval_patterns = [
-            r'conners',
-            r'basc',
-            r'adhd.*?evaluation',
-            r'attention.*?deficit.*?evaluation',
-            r'cpt|continuous\s+performance',
-            r'other\s+health\s+impairment.*?attention'
-        ]
-        
         for doc in self.documents:
-            text = self.extracted_text.get(doc["filename"], "").lower()
+            text = self._text(doc["filename"]).lower
             
+            hits = PATTERNS.scanner("adhd.attention", "adhd.evaluation").scan(text)
+
             # Check for ADHD indicators
-            for pattern, description in attention_patterns:
-                matches = re.findall(pattern, text, re.I)
+            for description in hits.labels("adhd.attention"):
+                matches = hits.matches("adhd.attention", description)
                 if matches:
                     result["indicators_found"].append({
                         "indicator": description,
@@ -2234,10 +3376,8 @@ class StudentDocumentAnalyzer:
                     })
             
             # Check if ADHD evaluation exists
-            for pattern in adhd_eval_patterns:
-                if re.search(pattern, text, re.I):
-                    result["evaluation_exists"] = True
-                    break
+            if hits.labels("adhd.evaluation"):
+                result["evaluation_exists"] = True
         
         # Generate recommendation: keep this as a gentle advocacy nudge, not a
         # compliance error. We avoid framing parent choice as "wrong" and do
@@ -2262,7 +3402,7 @@ class StudentDocumentAnalyzer:
         }
         
         for doc in self.documents:
-            text = self.extracted_text.get(doc["filename"], "").lower()
+            text = self._text(doc["filename"]).lower
             
             if "dyslexia class" in text or "dyslexia services" in text:
                 result["receives_services"] = True
@@ -2292,14 +3432,12 @@ class StudentDocumentAnalyzer:
             "transportation_barriers": False
         }
         
-        for doc in self.documents:
-            if "IEP" not in doc["type"]:
-                continue
-                
-            text = self.extracted_text.get(doc["filename"], "")
+        for doc in self.document_groups["IEP"]:
+            doc_text = self._text(doc["filename"])
+            text = doc_text.raw
             
             # Extract attendance data
-            absent_match = re.search(r'days\s+absent.*?:\s*(\d+)', text, re.I)
+            absent_match = PATTERNS["documents.fields"].pattern("days_absent").search(text)
             if absent_match and doc["date"]:
                 result["history"].append({
                     "date": doc["date"],
@@ -2307,9 +3445,9 @@ class StudentDocumentAnalyzer:
                 })
             
             # Check for barriers
-            if "shelter" in text.lower():
+            if "shelter" in doc_text.lower:
                 result["housing_barriers"] = True
-            if "transport" in text.lower() or "buss" in text.lower():
+            if "transport" in doc_text.lower or "buss" in doc_text.lower:
                 result["transportation_barriers"] = True
                 
         # Analyze pattern
@@ -2347,11 +3485,10 @@ class StudentDocumentAnalyzer:
         }
         
         # Find most recent IEP
-        ieps = [d for d in self.documents if "IEP" in d["type"]]
-        if not ieps:
+        latest_iep = self.latest_documents["IEP"]
+        if latest_iep is None:
             return result
-            
-        latest_iep = sorted(ieps, key=lambda x: x["date"] or "", reverse=True)[0]
+
         text = self.extracted_text.get(latest_iep["filename"], "")
         
         # Extract goals
@@ -2361,10 +3498,11 @@ class StudentDocumentAnalyzer:
             goal_text = goal_text.strip()[:500]
             
             # Check TEA 4 components
-            has_timeframe = bool(re.search(r'by.*?(?:end|date|IEP)', goal_text, re.I))
-            has_condition = bool(re.search(r'given|when|after|during', goal_text, re.I))
-            has_behavior = bool(re.search(r'will\s+\w+', goal_text, re.I))
-            has_criterion = bool(re.search(r'\d+\s*(?:out of|%|percent|times)', goal_text, re.I))
+            components = {label: bool(pattern.search(goal_text)) for pattern, label in PATTERNS["goals.tea_components"]}
+            has_timeframe = components["has_timeframe"]
+            has_condition = components["has_condition"]
+            has_behavior = components["has_behavior"]
+            has_criterion = components["has_criterion"]
             
             # Extract baseline
             baseline_match = re.search(r'beginning point.*?was\s+(\d+)', text, re.I)
@@ -2386,12 +3524,13 @@ class StudentDocumentAnalyzer:
             # longer flag this as a blanket quality issue.
                 
         # Check previous goal progress
-        if "not met" in text.lower() or "did not meet" in text.lower():
-            result["previous_goals_not_met"] += text.lower().count("not met")
-            result["previous_goals_not_met"] += text.lower().count("did not meet")
+        tl = self._text(latest_iep["filename"]).lower
+        if "not met" in tl or "did not meet" in tl:
+            result["previous_goals_not_met"] += tl.count("not met")
+            result["previous_goals_not_met"] += tl.count("did not meet")
             
-        if "goal met" in text.lower() or "mastered" in text.lower():
-            result["previous_goals_met"] += text.lower().count("met")
+        if "goal met" in tl or "mastered" in tl:
+            result["previous_goals_met"] += tl.count("met")
             
         return result
     
@@ -2413,6 +3552,7 @@ class StudentDocumentAnalyzer:
                 "severity": issue["severity"],
                 "category": "Copy/Paste",
                 "message": f"{issue['type']}: {issue.get('found_name', '')} {issue.get('text_preview', '')[:50]}"
+                + (f" (matches student {issue['other_student']})" if issue.get("other_student") else "")
             })
             
         # SLD consistency alerts - missing areas 
@@ -2817,34 +3957,271 @@ def find_all_students() -> list:
     return sorted(student_ids)
 
 
+def index_student(student_id: str, section_index: SectionFingerprintIndex,
+                  reference: ReferenceIndex = None) -> int:
+    """Replace the student's entries in ``section_index`` with their current IEP sections.
+
+    Only the student's IEPs are extracted. Run inside ``cohort_text_cache``
+    so the analysis pass that follows reads them back from TEXT_CACHE instead
+    of extracting them again. Returns the number of sections indexed.
+    """
+    analyzer = StudentDocumentAnalyzer(student_id, reference=reference)
+    analyzer.find_documents()
+    analyzer.documents = analyzer.document_groups["IEP"]
+    analyzer.extract_text()
+    try:
+        section_index.replace_student(student_id, analyzer.section_fingerprints)
+    except sqlite3.Error as e:
+        print(f"Warning: Could not update section index {section_index.path}: {e}")
+    return len(analyzer.section_fingerprints)
+
+
+def purge_section_index(section_index: SectionFingerprintIndex, students: list):
+    """Drop students who are no longer in the cohort from ``section_index``."""
+    if not students:
+        # An empty cohort is more likely a missing IEP folder than a district with no students
+        return
+    try:
+        removed = section_index.retain(students)
+    except sqlite3.Error as e:
+        print(f"Warning: Could not update section index {section_index.path}: {e}")
+        return
+    if removed:
+        print(f"Removed {len(removed)} students no longer in the cohort from the section index")
+
+
+def analyze_student(student_id: str, map_file: str = None, reference: ReferenceIndex = None,
+                    section_index: SectionFingerprintIndex = None) -> dict:
+    """Run the full pipeline for one student and return a short summary.
+
+    With a ``section_index`` the student is checked against it; the index is
+    not changed. Cohort runs call ``index_student`` for every student first,
+    so each student is compared against the whole cohort whatever the order.
+    """
+    analyzer = StudentDocumentAnalyzer(student_id, map_file=map_file, reference=reference,
+                                       section_index=section_index)
+    analyzer.find_documents()
+    analyzer.extract_text()
+    analyzer.analyze_all()
+    json_path, md_path = analyzer.save_results()
+    return {
+        "student_id": student_id,
+        "document_count": analyzer.analysis["document_count"],
+        "critical_count": analyzer.analysis["critical_count"],
+        "high_count": analyzer.analysis["high_count"],
+        "json_path": str(json_path),
+        "md_path": str(md_path),
+    }
+
+
+# Per-process reference index for --workers; each worker parses the district
+# tables once and reuses them for every student it is handed. Each worker
+# also holds its own connection to the section fingerprint index.
+_WORKER_REFERENCE = None
+_WORKER_SECTION_INDEX = None
+
+
+def _init_worker(text_cache: TextCache):
+    global TEXT_CACHE, _WORKER_REFERENCE, _WORKER_SECTION_INDEX
+    TEXT_CACHE = text_cache
+    _WORKER_REFERENCE = ReferenceIndex()
+    _WORKER_SECTION_INDEX = SectionFingerprintIndex(SECTION_INDEX_PATH) if SECTION_INDEX_PATH else None
+
+
+def _index_student_in_worker(student_id: str) -> int:
+    return index_student(student_id, _WORKER_SECTION_INDEX, reference=_WORKER_REFERENCE)
+
+
+def _analyze_student_in_worker(student_id: str, map_file: str = None) -> dict:
+    return analyze_student(student_id, map_file=map_file, reference=_WORKER_REFERENCE,
+                           section_index=_WORKER_SECTION_INDEX)
+
+
+def run_parallel(students: list, workers: int, map_file: str = None) -> list:
+    """Analyze students across a process pool, printing progress as each finishes.
+
+    Every student's sections are indexed before any student is analyzed, and
+    output files are named by student ID, so results are the same regardless
+    of completion order. Returns per-student summaries in input order; failed
+    students carry an ``error`` key instead of counts.
+    """
+    summaries: dict[str, dict] = {}
+    with cohort_text_cache() if SECTION_INDEX_PATH else nullcontext(), \
+            ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(TEXT_CACHE,)) as pool:
+        if SECTION_INDEX_PATH:
+            print("Indexing IEP sections...")
+            futures = {pool.submit(_index_student_in_worker, student_id): student_id for student_id in students}
+            for future in as_completed(futures):
+                try:
+                    future.result()
+                except Exception as e:  # noqa: BLE001
+                    print(f"Warning: Could not index sections for {futures[future]}: {e}")
+            section_index = SectionFingerprintIndex(SECTION_INDEX_PATH)
+            purge_section_index(section_index, students)
+            section_index.close()
+        futures = {
+            pool.submit(_analyze_student_in_worker, student_id, map_file): student_id
+            for student_id in students
+        }
+        for done, future in enumerate(as_completed(futures), start=1):
+            student_id = futures[future]
+            try:
+                summary = future.result()
+            except Exception as e:  # noqa: BLE001
+                summary = {"student_id": student_id, "error": str(e)}
+                print(f"[{done}/{len(students)}] {student_id}: FAILED - {e}")
+            else:
+                print(
+                    f"[{done}/{len(students)}] {student_id}: {summary['document_count']} documents, "
+                    f"{summary['critical_count']} critical, {summary['high_count']} high -> {summary['md_path']}"
+                )
+            summaries[student_id] = summary
+    return [summaries[student_id] for student_id in students]
+
+
+# Per-process state for long-lived API workers (see analyze_documents):
+# reference indexes keyed by assessment profile, reloaded when a table changes.
+# The profile comes from the request, so only the most recently used few are kept.
+API_REFERENCE_PROFILES = int(os.environ.get("GALEXII_API_REFERENCE_PROFILES", "4"))
+_API_REFERENCES: OrderedDict = OrderedDict()
+_API_SECTION_INDEX = None
+
+
+def _jsonable(value):
+    """``value`` as the saved JSON holds it, without encoding it.
+
+    Values JSON cannot represent (dates, Paths, numpy and pandas scalars)
+    become their ``str()``, as with ``json.dump(..., default=str)``; tuples
+    become lists and dict keys strings. Plain values are returned as they are.
+    """
+    kind = type(value)
+    if kind is str or kind is int or kind is float or kind is bool or value is None:
+        return value
+    if isinstance(value, dict):
+        return {
+            key if type(key) is str else (json.dumps(key) if isinstance(key, (int, float)) or key is None else str(key)):
+            _jsonable(item)
+            for key, item in value.items()
+        }
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(item) for item in value]
+    # Subclasses (enums, numpy floats) are encoded as their base type
+    for base in (str, int, float):
+        if isinstance(value, base):
+            return base(value)
+    return str(value)
+
+
+def analyze_documents(student_id: str, iep_folder=None, assessment_profile: str = None, progress=None,
+                      documents: dict = None) -> dict:
+    """Analyze the student's PDFs in-process and return the results.
+
+    The PDFs are either ``documents`` ({filename: bytes}, never written to
+    disk; pdftotext reads them from stdin) or the files in ``iep_folder``.
+
+    Meant for long-lived worker processes that import this module once:
+    reference tables stay loaded between calls and nothing is written to the
+    output folder. Returns ``{"analysis": ..., "report": ..., "timings": ...}``
+    with the analysis normalized as the saved JSON would be; timings
+    hold seconds per stage, per analysis module and per document.
+    ``progress(event, data)``, if given, is called as documents are found and
+    extracted and as each analysis module starts and finishes.
+    """
+    global _API_SECTION_INDEX
+    reference = _API_REFERENCES.get(assessment_profile)
+    if reference is None or reference.stale():
+        reference = _API_REFERENCES[assessment_profile] = ReferenceIndex(assessment_profile)
+    _API_REFERENCES.move_to_end(assessment_profile)
+    while len(_API_REFERENCES) > max(1, API_REFERENCE_PROFILES):
+        _API_REFERENCES.popitem(last=False)
+    if _API_SECTION_INDEX is None and SECTION_INDEX_PATH:
+        _API_SECTION_INDEX = SectionFingerprintIndex(SECTION_INDEX_PATH)
+
+    analyzer = StudentDocumentAnalyzer(student_id, reference=reference, section_index=_API_SECTION_INDEX,
+                                       iep_folder=iep_folder, progress=progress, document_data=documents)
+    stages = {}
+    started = time.perf_counter()
+
+    def lap(stage):
+        nonlocal started
+        now = time.perf_counter()
+        stages[stage] = now - started
+        started = now
+
+    analyzer.find_documents()
+    lap("find_documents")
+    analyzer.extract_text()
+    lap("extract_text")
+    analyzer.analyze_all()
+    lap("analyze_all")
+    analysis = _jsonable(analyzer.analysis)
+    lap("normalize")
+    report = analyzer.generate_report()
+    lap("report")
+    return {
+        "analysis": analysis,
+        "report": report,
+        "timings": {"stages": stages, **analyzer.timings},
+    }
+
+
 def main():
     parser = argparse.ArgumentParser(description="SpEdGalexii Deep Dive Analyzer")
     parser.add_argument("--student", type=str, help="Student ID to analyze")
     parser.add_argument("--all", action="store_true", help="Analyze all students")
     parser.add_argument("--map-file", type=str, help="Path to MAP StudentProfile Excel file")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes for --all (default 1; 0 = one per CPU)")
     args = parser.parse_args()
     
     if args.all:
         students = find_all_students()
         print(f"Found {len(students)} students to analyze")
-        
-        for student_id in students:
+
+        workers = args.workers if args.workers > 0 else (os.cpu_count() or 1)
+        if workers > 1:
+            print(f"Using {workers} worker processes")
+            summaries = run_parallel(students, workers, map_file=args.map_file)
+            failed = [s for s in summaries if "error" in s]
+            completed = [s for s in summaries if "error" not in s]
             print(f"\n{'='*60}")
-            print(f"Analyzing student: {student_id}")
+            print("SUMMARY")
             print('='*60)
-            
-            analyzer = StudentDocumentAnalyzer(student_id, map_file=args.map_file)
-            analyzer.find_documents()
-            analyzer.extract_text()
-            analyzer.analyze_all()
-            json_path, md_path = analyzer.save_results()
-            
-            print(f"  Documents: {analyzer.analysis['document_count']}")
-            print(f"  Alerts: {analyzer.analysis['critical_count']} critical, {analyzer.analysis['high_count']} high")
-            print(f"  Report: {md_path}")
+            print(f"  Students analyzed: {len(completed)}/{len(summaries)}")
+            print(f"  Alerts: {sum(s['critical_count'] for s in completed)} critical, "
+                  f"{sum(s['high_count'] for s in completed)} high")
+            for s in failed:
+                print(f"  FAILED {s['student_id']}: {s['error']}")
+            return
+
+        # Parse each district table once and share it across every student
+        reference = ReferenceIndex()
+        section_index = SectionFingerprintIndex(SECTION_INDEX_PATH) if SECTION_INDEX_PATH else None
+
+        with cohort_text_cache() if section_index is not None else nullcontext():
+            # Index the whole cohort before checking anyone against it
+            if section_index is not None:
+                print("Indexing IEP sections...")
+                for student_id in students:
+                    index_student(student_id, section_index, reference=reference)
+                purge_section_index(section_index, students)
+
+            for student_id in students:
+                print(f"\n{'='*60}")
+                print(f"Analyzing student: {student_id}")
+                print('='*60)
+
+                summary = analyze_student(student_id, map_file=args.map_file, reference=reference,
+                                          section_index=section_index)
+
+                print(f"  Documents: {summary['document_count']}")
+                print(f"  Alerts: {summary['critical_count']} critical, {summary['high_count']} high")
+                print(f"  Report: {summary['md_path']}")
             
     elif args.student:
-        analyzer = StudentDocumentAnalyzer(args.student, map_file=args.map_file)
+        # Single-student runs check against the district index without updating it
+        section_index = SectionFingerprintIndex(SECTION_INDEX_PATH) if SECTION_INDEX_PATH else None
+        analyzer = StudentDocumentAnalyzer(args.student, map_file=args.map_file, section_index=section_index)
         docs = analyzer.find_documents()
         
         if not docs:
@@ -0,0 +1,131 @@
+import hashlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+import httpx
+import pytest
+
+API_DIR = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = API_DIR / "scripts"
+
+# The analyzer reads its folders from the environment at import time; keep
+# test runs away from real audit output, reference tables and caches.
+_SANDBOX = Path(tempfile.mkdtemp(prefix="deep-space-tests-"))
+os.environ.setdefault("GALEXII_IEP_FOLDER", str(_SANDBOX / "ieps"))
+os.environ.setdefault("GALEXII_OUTPUT_FOLDER", str(_SANDBOX / "audit"))
+os.environ.setdefault("GALEXII_REFERENCE_FOLDER", str(_SANDBOX / "reference"))
+os.environ.setdefault("GALEXII_STUDENT_PROFILE_FOLDER", str(_SANDBOX / "profiles"))
+os.environ.setdefault("GALEXII_SECTION_INDEX", "")
+os.environ.setdefault("GALEXII_TEXT_CACHE_MB", "0")
+os.environ.setdefault("BLOB_CACHE_DIR", str(_SANDBOX / "blob-cache"))
+
+for path in (API_DIR, SCRIPTS_DIR):
+    if str(path) not in sys.path:
+        sys.path.insert(0, str(path))
+
+
+@pytest.fixture
+def fake_pdftotext(tmp_path, monkeypatch):
+    """Put a pdftotext on PATH that 'extracts' a file's bytes as its text.
+
+    The fixture documents are plain text, so the analyzer sees exactly what
+    the test wrote. Reads stdin when the input argument is ``-``. Each call
+    appends its input argument to ``$FAKE_PDFTOTEXT_LOG`` when that is set.
+    """
+    bin_dir = tmp_path / "bin"
+    bin_dir.mkdir()
+    script = bin_dir / "pdftotext"
+    script.write_text(
+        f"#!{sys.executable}\n"
+        "import os, sys\n"
+        "args = sys.argv[1:]\n"
+        "if args == ['-v']:\n"
+        "    sys.stderr.write('pdftotext version 0.test\\n')\n"
+        "    sys.exit(0)\n"
+        "source = args[-2]\n"
+        "if os.environ.get('FAKE_PDFTOTEXT_LOG'):\n"
+        "    with open(os.environ['FAKE_PDFTOTEXT_LOG'], 'a') as log:\n"
+        "        log.write(source + '\\n')\n"
+        "data = sys.stdin.buffer.read() if source == '-' else open(source, 'rb').read()\n"
+        "sys.stdout.buffer.write(data)\n"
+    )
+    script.chmod(0o755)
+    monkeypatch.setenv("PATH", f"{bin_dir}{os.pathsep}{os.environ['PATH']}")
+    return script
+
+
+class BlobStore:
+    """In-memory blob host for the API's download client, with ETags."""
+
+    def __init__(self):
+        self.files: dict[str, bytes] = {}
+        self.requests: list[httpx.Request] = []
+
+    def put(self, name: str, data: bytes) -> dict:
+        url = f"https://blob.test/{name}"
+        self.files[url] = data
+        return {"name": name, "url": url}
+
+    def handler(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append(request)
+        data = self.files.get(str(request.url))
+        if data is None:
+            return httpx.Response(404)
+        etag = f'"{hashlib.sha256(data).hexdigest()[:16]}"'
+        if request.headers.get("if-none-match") == etag:
+            return httpx.Response(304, headers={"etag": etag})
+        return httpx.Response(200, content=data, headers={"etag": etag})
+
+
+@pytest.fixture
+def blobs():
+    return BlobStore()
+
+
+@pytest.fixture
+def api(tmp_path, monkeypatch, blobs):
+    """Start the app on tests/fake_analyzer.py, downloading from ``blobs``.
+
+    Call it with main.py settings to override, e.g. ``api(ANALYZER_TIMEOUT=1)``;
+    it returns a started TestClient.
+    """
+    from fastapi.testclient import TestClient
+
+    import main
+
+    monkeypatch.setenv("ANALYZER_PATH", str(Path(__file__).with_name("fake_analyzer.py")))
+    create_blob_client = main._create_blob_client
+    monkeypatch.setattr(
+        main, "_create_blob_client", lambda: create_blob_client(transport=httpx.MockTransport(blobs.handler))
+    )
+    defaults = {
+        "ANALYZER_CONCURRENCY": 1,
+        "ANALYZER_TIMEOUT": 30.0,
+        "ANALYZER_MAX_JOBS": 100,
+        "BLOB_CACHE_DIR": tmp_path / "blob-cache",
+        "RESULT_CACHE_TTL": 3600.0,
+        "RESULT_CACHE_SIZE": 128,
+        "RESULT_CACHE_DB": None,
+        "JOB_WORKERS": 1,
+        "BATCH_CONCURRENCY": 2,
+        "ADMISSION_MAX_ACTIVE": 4,
+        "ADMISSION_MAX_QUEUE": 20,
+        "ADMISSION_MAX_BYTES": 64 * 1024 * 1024,
+        "SSE_KEEPALIVE": 15.0,
+        "DISCONNECT_POLL_INTERVAL": 0.05,
+    }
+    clients = []
+
+    def start(**settings):
+        for name, value in {**defaults, **settings}.items():
+            monkeypatch.setattr(main, name, value)
+        client = TestClient(main.app)
+        client.__enter__()
+        clients.append(client)
+        return client
+
+    yield start
+    for client in clients:
+        client.__exit__(None, None, None)
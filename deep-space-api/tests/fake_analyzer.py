@@ -0,0 +1,45 @@
+"""Stand-in for deep_dive_analyzer.py in API tests (loaded via ANALYZER_PATH).
+
+Each document's content is a command: ``sleep <seconds>``, ``fail``, or
+``grandchild <seconds>`` (start a subprocess that sleeps and records its pid
+in the ``GRANDCHILD_PID_FILE`` file). Anything else is analyzed instantly.
+"""
+import os
+import subprocess
+import sys
+import time
+
+CALLS = 0
+
+
+def analyze_documents(student_id, iep_folder=None, assessment_profile=None, progress=None, documents=None):
+    global CALLS
+    CALLS += 1
+    documents = documents or {}
+    if progress:
+        progress("documents_found", {"documents": sorted(documents)})
+    for name, data in sorted(documents.items()):
+        command, _, arg = data.decode(errors="replace").partition(" ")
+        if command == "sleep":
+            time.sleep(float(arg))
+        elif command == "fail":
+            raise RuntimeError(f"analyzer failed on {name}")
+        elif command == "grandchild":
+            child = subprocess.Popen([sys.executable, "-c", f"import time; time.sleep({float(arg)})"])
+            with open(os.environ["GRANDCHILD_PID_FILE"], "w") as f:
+                f.write(str(child.pid))
+            child.wait()
+        if progress:
+            progress("module_started", {"module": name})
+            progress("module_finished", {"module": name, "seconds": 0.0})
+    return {
+        "analysis": {
+            "student_id": student_id,
+            "documents": {name: len(data) for name, data in sorted(documents.items())},
+            "assessment_profile": assessment_profile,
+            "pid": os.getpid(),
+            "calls": CALLS,
+        },
+        "report": f"# Report for {student_id}\n",
+        "timings": {"stages": {"analyze_all": 0.001}, "modules": {}, "documents": {}},
+    }
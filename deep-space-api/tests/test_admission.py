@@ -0,0 +1,95 @@
+"""Admission control: 429/503 with Retry-After instead of unbounded queues."""
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import HTTPException
+
+import main
+from test_jobs import submit, wait_for
+
+
+def test_queue_limit_and_retry_after():
+    async def scenario():
+        admission = main.AdmissionController(max_active=1, max_queue=1, max_bytes=1000)
+        admission.service_time = 4.0
+        release = asyncio.Event()
+
+        async def hold(shed=True):
+            async with admission.admit(shed):
+                await release.wait()
+
+        first = asyncio.create_task(hold())
+        second = asyncio.create_task(hold())
+        await asyncio.sleep(0)
+        assert (admission.active, admission.waiting) == (1, 1)
+
+        with pytest.raises(HTTPException) as exc:
+            async with admission.admit():
+                pass
+        assert exc.value.status_code == 429
+        # Two analyses ahead on one slot, 4 s each
+        assert exc.value.headers["Retry-After"] == "8"
+
+        # Callers that queue rather than shed still get in line
+        third = asyncio.create_task(hold(shed=False))
+        await asyncio.sleep(0)
+        assert admission.waiting == 2
+        release.set()
+        await asyncio.gather(first, second, third)
+        assert (admission.active, admission.waiting) == (0, 0)
+
+    asyncio.run(scenario())
+
+
+def test_byte_limit_returns_503():
+    admission = main.AdmissionController(max_active=1, max_queue=1, max_bytes=100)
+    admission.take_bytes(60)
+    with pytest.raises(HTTPException) as exc:
+        admission.take_bytes(60)
+    assert exc.value.status_code == 503
+    assert int(exc.value.headers["Retry-After"]) >= 1
+    admission.release_bytes(120)
+    assert admission.bytes_in_flight == 0
+    admission.check()
+
+
+def test_analyze_sheds_with_429(api, blobs):
+    client = api(ADMISSION_MAX_ACTIVE=1, ADMISSION_MAX_QUEUE=0)
+    slow = {"studentId": "1200", "files": [blobs.put("1200-IEP.pdf", b"sleep 1.5")]}
+    fast = {"studentId": "1201", "files": [blobs.put("1201-IEP.pdf", b"ok")]}
+    with ThreadPoolExecutor(1) as pool:
+        running = pool.submit(client.post, "/analyze", json=slow)
+        deadline = time.monotonic() + 10
+        while client.get("/health").json()["admission"]["active"] == 0:
+            assert time.monotonic() < deadline
+            time.sleep(0.02)
+        rejected = client.post("/analyze", json=fast)
+        assert running.result().status_code == 200
+    assert rejected.status_code == 429
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert 'deep_space_rejections_total{reason="queue"} ' in client.get("/metrics").text
+    # Once the slot is free the same request goes through
+    assert client.post("/analyze", json=fast).status_code == 200
+
+
+def test_analyze_over_byte_budget_returns_503(api, blobs):
+    client = api(ADMISSION_MAX_BYTES=64)
+    ref = blobs.put("1210-IEP.pdf", b"x" * 1000)
+    response = client.post("/analyze", json={"studentId": "1210", "files": [ref]})
+    assert response.status_code == 503
+    assert "Retry-After" in response.headers
+    assert client.get("/health").json()["admission"]["bytes_in_flight"] == 0
+
+
+def test_job_queue_limit(api, blobs, monkeypatch):
+    client = api(JOB_WORKERS=1)
+    monkeypatch.setattr(main, "JOB_MAX_QUEUED", 1)
+    blocker = submit(client, blobs, "1220", b"sleep 1")
+    wait_for(client, blocker["id"], "running")
+    submit(client, blobs, "1221")
+    ref = blobs.put("1222-IEP.pdf", b"ok")
+    response = client.post("/jobs", json={"studentId": "1222", "files": [ref]})
+    assert response.status_code == 429
+    assert int(response.headers["Retry-After"]) >= 1
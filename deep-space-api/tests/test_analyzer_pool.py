@@ -0,0 +1,87 @@
+"""Analyzer worker pool: replacement after failures, timeouts and max jobs."""
+import os
+import time
+
+import pytest
+
+
+def _analyze(client, blobs, student_id, content=b"ok", **kwargs):
+    ref = blobs.put(f"{student_id}-IEP.pdf", content)
+    return client.post("/analyze", json={"studentId": student_id, "files": [ref]}, **kwargs)
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    return True
+
+
+def _wait_idle(client, workers: int, timeout: float = 30) -> None:
+    deadline = time.monotonic() + timeout
+    while client.app.state.analyzer_pool.idle < workers:
+        assert time.monotonic() < deadline, "worker was not replaced"
+        time.sleep(0.05)
+
+
+def test_worker_replaced_after_timeout(api, blobs, tmp_path, monkeypatch):
+    pid_file = tmp_path / "grandchild.pid"
+    monkeypatch.setenv("GRANDCHILD_PID_FILE", str(pid_file))
+    client = api(ANALYZER_TIMEOUT=1.0)
+
+    first = _analyze(client, blobs, "100").json()["analysis"]["pid"]
+
+    started = time.monotonic()
+    response = _analyze(client, blobs, "101", b"grandchild 60")
+    assert response.status_code == 504
+    # The reply does not wait for the worker to be killed and respawned
+    assert time.monotonic() - started < 5
+
+    _wait_idle(client, 1)
+    replacement = _analyze(client, blobs, "102").json()["analysis"]
+    assert replacement["pid"] != first
+    assert replacement["calls"] == 1
+    # The whole process group went, including what the analyzer started
+    assert not _alive(first)
+    grandchild = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while _alive(grandchild) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not _alive(grandchild)
+
+
+def test_worker_replaced_after_analyzer_error(api, blobs):
+    client = api()
+    first = _analyze(client, blobs, "200").json()["analysis"]["pid"]
+    response = _analyze(client, blobs, "201", b"fail")
+    assert response.status_code == 500
+    assert "analyzer failed on 201-IEP.pdf" in response.json()["detail"]
+    assert _analyze(client, blobs, "202").json()["analysis"]["pid"] != first
+
+
+def test_worker_recycled_after_max_jobs(api, blobs):
+    client = api(ANALYZER_MAX_JOBS=2)
+    pids = [_analyze(client, blobs, str(300 + i)).json()["analysis"]["pid"] for i in range(5)]
+    assert pids[0] == pids[1] != pids[2] == pids[3] != pids[4]
+
+
+def test_replacement_is_ready_before_it_takes_jobs(api, blobs):
+    client = api(ANALYZER_TIMEOUT=0.5)
+    pool = client.app.state.analyzer_pool
+    assert _analyze(client, blobs, "400", b"sleep 30").status_code == 504
+    _wait_idle(client, 1)
+    # Starting the replacement is not charged to the next request's timeout
+    assert _analyze(client, blobs, "401").status_code == 200
+    assert pool.idle == 1
+
+
+@pytest.mark.parametrize("profiles, kept", [(["a", "b", "a", "c"], ["a", "c"]), (["a", "a"], ["a"])])
+def test_reference_indexes_are_bounded(profiles, kept, monkeypatch):
+    import deep_dive_analyzer as dda
+
+    monkeypatch.setattr(dda, "API_REFERENCE_PROFILES", 2)
+    monkeypatch.setattr(dda, "_API_REFERENCES", dda.OrderedDict())
+    for profile in profiles:
+        dda.analyze_documents("500", assessment_profile=profile, documents={})
+    assert list(dda._API_REFERENCES) == kept
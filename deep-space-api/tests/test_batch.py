@@ -0,0 +1,86 @@
+"""Batch analysis: one NDJSON line per student, as each finishes."""
+import json
+
+import main
+
+
+def student(blobs, student_id, content=b"ok", **extra):
+    return {"studentId": student_id, "files": [blobs.put(f"{student_id}-IEP.pdf", content)], **extra}
+
+
+def run_batch(client, payload, **headers):
+    with client.stream("POST", "/analyze/batch", json=payload, headers=headers) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        return [json.loads(line) for line in response.iter_lines() if line]
+
+
+def test_lines_stream_in_completion_order(api, blobs):
+    client = api(ANALYZER_CONCURRENCY=2)
+    disconnects = main.CANCELLATIONS.value(reason="disconnect")
+    lines = run_batch(client, {"students": [student(blobs, "1000", b"sleep 0.8"), student(blobs, "1001")]})
+    assert [line["studentId"] for line in lines] == ["1001", "1000"]
+    assert all(line["status"] == 200 for line in lines)
+    assert lines[0]["analysis"]["student_id"] == "1001"
+    assert lines[0]["report"].startswith("# Report for 1001")
+    assert lines[0]["cache"] == "miss"
+    # A batch that runs to the end cancels nothing
+    assert main.CANCELLATIONS.value(reason="disconnect") == disconnects
+
+
+def test_student_errors_do_not_stop_the_batch(api, blobs):
+    client = api()
+    lines = run_batch(client, {"students": [
+        student(blobs, "1010", b"fail"),
+        {"studentId": "1011", "files": []},
+        {"studentId": "1012", "files": [{"name": "missing.pdf", "url": "https://blob.test/missing.pdf"}]},
+        student(blobs, "1013"),
+    ]})
+    status = {line["studentId"]: line["status"] for line in lines}
+    assert status == {"1010": 500, "1011": 400, "1012": 502, "1013": 200}
+    assert "error" in next(line for line in lines if line["studentId"] == "1010")
+
+
+def test_batch_defaults_apply_to_students(api, blobs):
+    client = api()
+    lines = run_batch(client, {
+        "assessmentProfile": "district.xlsx",
+        "students": [student(blobs, "1020"), student(blobs, "1021", assessmentProfile="own.xlsx")],
+    })
+    profiles = {line["studentId"]: line["analysis"]["assessment_profile"] for line in lines}
+    assert profiles == {"1020": "district.xlsx", "1021": "own.xlsx"}
+
+
+def test_deadline_ends_slow_students(api, blobs):
+    client = api(ANALYZER_CONCURRENCY=2)
+    lines = run_batch(
+        client,
+        {"students": [student(blobs, "1030", b"sleep 30"), student(blobs, "1031")]},
+        **{"X-Request-Timeout": "5"},
+    )
+    status = {line["studentId"]: line["status"] for line in lines}
+    assert status == {"1030": 504, "1031": 200}
+
+
+def test_students_wait_for_download_budget(api, blobs):
+    # Each student's download fits the budget alone but not alongside the other's
+    client = api(ANALYZER_CONCURRENCY=2, ADMISSION_MAX_BYTES=6000)
+    padded = b"sleep 0.3" + b" " * 4000
+    lines = run_batch(client, {"students": [student(blobs, "1035", padded), student(blobs, "1036", padded)]})
+    assert {line["studentId"]: line["status"] for line in lines} == {"1035": 200, "1036": 200}
+    assert client.get("/health").json()["admission"]["bytes_in_flight"] == 0
+
+
+def test_student_larger_than_download_budget_fails(api, blobs):
+    client = api(ADMISSION_MAX_BYTES=64)
+    lines = run_batch(client, {"students": [student(blobs, "1037", b"x" * 1000)]})
+    assert lines[0]["status"] == 503
+
+
+def test_rejects_empty_and_oversized_batches(api, blobs, monkeypatch):
+    client = api()
+    assert client.post("/analyze/batch", json={"students": []}).status_code == 400
+
+    monkeypatch.setattr(main, "BATCH_MAX_STUDENTS", 1)
+    payload = {"students": [student(blobs, "1040"), student(blobs, "1041")]}
+    assert client.post("/analyze/batch", json=payload).status_code == 400
@@ -0,0 +1,145 @@
+"""BatteryScanner must report exactly what each pattern finds on its own."""
+import random
+import re
+
+import pytest
+
+import deep_dive_analyzer as dda
+
+SAMPLE = """
+Full and Individual Evaluation (FIE) for a student in grade 7. Eligibility: Specific Learning
+Disability in Basic Reading Skills, Reading Fluency and Math Calculation; Speech or Language
+Impairment considered. Other Health Impairment (ADHD) was reviewed; the student is easily
+distracted, needs frequent redirection, has difficulty sustaining attention and is off-task.
+Tests administered: WISC-V, WJ-IV Tests of Achievement, KTEA-3, CTOPP-2, BASC-3, Conners 4,
+Vanderbilt rating scales. Processing speed deficit noted.
+REED: existing evaluation data, parent input, teacher observations, state assessments (STAAR),
+classroom-based assessments, MAP growth. Additional data is not needed.
+Related services: speech therapy 30 minutes weekly, occupational therapy, counseling services,
+transportation as a related service. Dyslexia services through a dyslexia program.
+Present levels of academic achievement: English reading comprehension is below grade level.
+Math problem solving has improved; the goal was mastered. Reading fluency was dismissed as an
+area of need. The committee agreed; the ARD committee determined continued eligibility.
+Student Name: Jordan Rivera  DOB: 01/02/2010  Grade: 07
+"""
+
+
+def _parser_examples(pattern: re.Pattern) -> list[str]:
+    """A few strings built from the pattern's structure, to give it real hits.
+
+    Best effort: returns nothing if the private regex parser is unavailable.
+    """
+    parser = getattr(dda, "_sre_parse", None)
+    if parser is None:
+        return []
+    try:
+        from re import _constants as c
+    except ImportError:  # pragma: no cover
+        return []
+
+    def build(items, choice):
+        out = []
+        for op, av in items:
+            if op is c.LITERAL:
+                out.append(chr(av))
+            elif op is c.NOT_LITERAL:
+                out.append("x" if chr(av) != "x" else "y")
+            elif op is c.ANY:
+                out.append(" ")
+            elif op is c.IN:
+                kind, value = av[0]
+                if kind is c.LITERAL:
+                    out.append(chr(value))
+                elif kind is c.RANGE:
+                    out.append(chr(value[0]))
+                elif kind is c.CATEGORY and value is c.CATEGORY_DIGIT:
+                    out.append("1")
+                else:
+                    out.append(" ")
+            elif op is c.CATEGORY:
+                out.append("1" if av is c.CATEGORY_DIGIT else " " if av is c.CATEGORY_SPACE else "a")
+            elif op is c.BRANCH:
+                branches = av[1]
+                out.append(build(branches[choice % len(branches)].data, choice))
+            elif op is c.SUBPATTERN:
+                out.append(build(av[-1].data, choice))
+            elif op in (c.MAX_REPEAT, c.MIN_REPEAT, getattr(c, "POSSESSIVE_REPEAT", None)):
+                low, _, sub = av
+                out.append(build(sub.data, choice) * max(low, 1))
+            elif op is c.AT:
+                out.append(" " if av is c.AT_BOUNDARY else "")
+        return "".join(out)
+
+    try:
+        parsed = parser.parse(pattern.pattern, pattern.flags).data
+    except Exception:
+        return []
+    return [build(parsed, choice) for choice in range(3)]
+
+
+def _corpus(batteries) -> str:
+    rng = random.Random(7)
+    pieces = [SAMPLE]
+    for battery in batteries:
+        for pattern, label in battery:
+            pieces.append(str(label))
+            pieces.extend(_parser_examples(pattern))
+    rng.shuffle(pieces)
+    # Adjacent and repeated pieces exercise overlapping anchors
+    return " ".join(pieces + pieces[: len(pieces) // 3])
+
+
+def _assert_equivalent(scanner: dda.BatteryScanner, text: str) -> int:
+    hits = scanner.scan(text)
+    found = 0
+    for battery in scanner.batteries:
+        expected_labels = []
+        for pattern, label in battery:
+            expected_first = pattern.search(text)
+            first = hits.first(battery.name, label)
+            assert (first and first.span()) == (expected_first and expected_first.span()), (battery.name, label)
+            expected_all = [m.span() for m in pattern.finditer(text)]
+            assert [m.span() for m in hits.matches(battery.name, label)] == expected_all, (battery.name, label)
+            if expected_first:
+                expected_labels.append(label)
+                found += 1
+        assert hits.labels(battery.name) == expected_labels
+    return found
+
+
+@pytest.mark.parametrize("name", dda.PATTERNS.names())
+def test_scanner_matches_per_pattern_search(name):
+    battery = dda.PATTERNS[name]
+    scanner = dda.BatteryScanner([battery])
+    text = _corpus([battery])
+    found = _assert_equivalent(scanner, text) + _assert_equivalent(scanner, text.lower())
+    assert found, f"corpus produced no hits for {name}"
+
+
+def test_scanner_over_combined_batteries():
+    """The multi-battery scanners the extractors use, on mixed-case and lowered text."""
+    groups = [
+        ("fie.idea_categories", "fie.sld_areas", "fie.tests"),
+        ("reed.data_types", "reed.data_sources"),
+        ("adhd.attention", "adhd.evaluation"),
+    ]
+    for names in groups:
+        scanner = dda.PATTERNS.scanner(*names)
+        text = _corpus(scanner.batteries)
+        _assert_equivalent(scanner, text)
+        _assert_equivalent(scanner, text.lower())
+
+
+def test_scanner_falls_back_without_parser(monkeypatch):
+    monkeypatch.setattr(dda, "SRE_PARSER_AVAILABLE", False)
+    battery = dda.PATTERNS["fie.tests"]
+    scanner = dda.BatteryScanner([battery])
+    assert len(scanner.unanchored) == len(battery)
+    _assert_equivalent(scanner, _corpus([battery]))
+
+
+def test_literal_prefixes_of_branches():
+    assert dda.SRE_PARSER_AVAILABLE
+    assert dda._parse_prefixes(re.compile(r"\bspeech\s+(?:therapy|services)")) == ["speech"]
+    assert dda._parse_prefixes(re.compile(r"(?:wisc|wj)-")) == ["wisc", "wj"]
+    assert dda._parse_prefixes(re.compile(r"[a-z]+ing")) is None
@@ -0,0 +1,94 @@
+"""Blob cache: conditional re-downloads, eviction and invalidation."""
+import hashlib
+import os
+
+import main
+
+
+def _store(cache, url, data, etag='"v1"'):
+    cache.store(url, data, hashlib.sha256(data).hexdigest(), etag)
+
+
+def test_lookup_read_and_signed_urls(tmp_path):
+    cache = main.BlobCache(tmp_path, 1024)
+    _store(cache, "https://blob.test/a.pdf?sig=1", b"first")
+    # Signed query strings do not change the cache key
+    entry = cache.lookup("https://blob.test/a.pdf?sig=2")
+    assert entry["etag"] == '"v1"'
+    assert cache.read(entry["object"]) == b"first"
+    assert cache.lookup("https://blob.test/b.pdf") is None
+    # Without an ETag there is nothing to revalidate with
+    _store(cache, "https://blob.test/c.pdf", b"third", etag=None)
+    assert cache.lookup("https://blob.test/c.pdf") is None
+
+
+def test_evicts_least_recently_used_with_running_total(tmp_path, monkeypatch):
+    cache = main.BlobCache(tmp_path, 250)
+    scans = []
+    real_scan = cache._scan
+    monkeypatch.setattr(cache, "_scan", lambda: scans.append(1) or real_scan())
+
+    for i, name in enumerate("abc"):
+        _store(cache, f"https://blob.test/{name}.pdf", name.encode() * 100)
+        obj = cache.lookup(f"https://blob.test/{name}.pdf")["object"]
+        os.utime(obj, (1000 + i, 1000 + i))
+    # One scan to learn the size on first use, one when going over the limit
+    assert len(scans) == 2
+    assert cache.stats()["bytes"] == 200
+    assert cache.lookup("https://blob.test/a.pdf") is None
+    assert cache.lookup("https://blob.test/c.pdf") is not None
+
+    # Reading an object makes it recently used
+    cache.read(cache.lookup("https://blob.test/b.pdf")["object"])
+    _store(cache, "https://blob.test/d.pdf", b"d" * 100)
+    assert cache.lookup("https://blob.test/b.pdf") is not None
+    assert cache.lookup("https://blob.test/c.pdf") is None
+    assert len(scans) == 3
+
+
+def _analyze(client, ref, student_id="600"):
+    response = client.post("/analyze", json={"studentId": student_id, "files": [ref]})
+    assert response.status_code == 200, response.text
+    return response.json()["analysis"]
+
+
+def test_hit_miss_and_invalidation(api, blobs):
+    client = api(RESULT_CACHE_TTL=0)
+    ref = blobs.put("600-IEP.pdf", b"version one")
+
+    assert _analyze(client, ref)["documents"] == {"600-IEP.pdf": 11}
+    assert "if-none-match" not in blobs.requests[-1].headers
+    assert client.get("/health").json()["blob_cache"]["misses"] == 1
+
+    # Unchanged blob: revalidated and served from the cache
+    assert _analyze(client, ref)["documents"] == {"600-IEP.pdf": 11}
+    assert "if-none-match" in blobs.requests[-1].headers
+    assert client.get("/health").json()["blob_cache"]["hits"] == 1
+
+    # Changed blob: the new ETag fails revalidation and the new body is used
+    blobs.put("600-IEP.pdf", b"version two, longer")
+    assert _analyze(client, ref)["documents"] == {"600-IEP.pdf": 19}
+    stats = client.get("/health").json()["blob_cache"]
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+
+def test_not_modified_after_eviction_refetches(api, blobs, tmp_path, monkeypatch):
+    client = api(RESULT_CACHE_TTL=0)
+    ref = blobs.put("601-IEP.pdf", b"cached body")
+    _analyze(client, ref, "601")
+
+    # The object disappears between the lookup and the read
+    cache = client.app.state.blob_cache
+    real_lookup = cache.lookup
+
+    def lookup_then_evict(url):
+        entry = real_lookup(url)
+        if entry:
+            entry["object"].unlink()
+        return entry
+
+    monkeypatch.setattr(cache, "lookup", lookup_then_evict)
+    assert _analyze(client, ref, "601")["documents"] == {"601-IEP.pdf": 11}
+    conditional, refetch = blobs.requests[-2:]
+    assert "if-none-match" in conditional.headers
+    assert "if-none-match" not in refetch.headers
@@ -0,0 +1,40 @@
+"""The shared blob-download client: lifespan and reported stats."""
+from fastapi.testclient import TestClient
+
+import main
+
+
+def test_one_client_for_the_app_lifetime(api, blobs):
+    client = api()
+    blob_client = main.app.state.blob_client
+    assert not blob_client.is_closed
+    for student_id in ("1800", "1801"):
+        ref = blobs.put(f"{student_id}-IEP.pdf", b"ok")
+        assert client.post("/analyze", json={"studentId": student_id, "files": [ref]}).status_code == 200
+    assert main.app.state.blob_client is blob_client
+
+    client.__exit__(None, None, None)
+    assert blob_client.is_closed
+    # A restarted app gets a fresh client
+    with TestClient(main.app):
+        assert main.app.state.blob_client is not blob_client
+        assert not main.app.state.blob_client.is_closed
+
+
+def test_health_and_metrics_report_blob_requests(api, blobs):
+    client = api()
+    before = client.get("/health").json()["blob_pool"]
+    assert before == {
+        "http2": main.BLOB_HTTP2,
+        "max_connections": main.BLOB_MAX_CONNECTIONS,
+        "max_keepalive": main.BLOB_MAX_KEEPALIVE,
+        "keepalive_expiry": main.BLOB_KEEPALIVE_EXPIRY,
+        "requests": before["requests"],
+    }
+    refs = [blobs.put("1810-IEP.pdf", b"ok"), blobs.put("1810-REED.pdf", b"ok")]
+    assert client.post("/analyze", json={"studentId": "1810", "files": refs}).status_code == 200
+    # Revalidating the cached copies sends the requests again
+    assert client.post("/analyze", json={"studentId": "1810", "files": refs}).status_code == 200
+    requests = client.get("/health").json()["blob_pool"]["requests"]
+    assert requests == before["requests"] + 4
+    assert f"deep_space_blob_requests_total {requests}" in client.get("/metrics").text.splitlines()
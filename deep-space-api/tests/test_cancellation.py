@@ -0,0 +1,155 @@
+"""Cancelling work on client disconnect, deadline and job cancellation."""
+import asyncio
+import time
+
+import pytest
+from fastapi import HTTPException
+
+import main
+from test_analyzer_pool import _wait_idle
+from test_jobs import submit, wait_for
+
+
+class _Client:
+    """Stands in for a Request whose client goes away after ``after`` seconds."""
+
+    def __init__(self, after: float):
+        self.gone_at = time.monotonic() + after
+
+    async def is_disconnected(self) -> bool:
+        return time.monotonic() >= self.gone_at
+
+
+def _cancellable(work, deadline_in=None, request=None):
+    async def scenario():
+        cancelled = asyncio.Event()
+
+        async def guarded():
+            try:
+                return await work
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
+
+        deadline = None if deadline_in is None else asyncio.get_running_loop().time() + deadline_in
+        try:
+            return await main._run_cancellable(guarded(), deadline, request), cancelled.is_set()
+        except HTTPException as exc:
+            return exc.status_code, cancelled.is_set()
+
+    return asyncio.run(scenario())
+
+
+def test_disconnect_cancels_with_499(monkeypatch):
+    monkeypatch.setattr(main, "DISCONNECT_POLL_INTERVAL", 0.01)
+    assert _cancellable(asyncio.sleep(30), request=_Client(after=0.05)) == (499, True)
+
+
+def test_deadline_cancels_with_504():
+    assert _cancellable(asyncio.sleep(30), deadline_in=0.05) == (504, True)
+
+
+def test_finished_work_is_returned():
+    assert _cancellable(asyncio.sleep(0, result="done"), deadline_in=5, request=_Client(after=5)) == ("done", False)
+
+
+def test_analyze_deadline_header(api, blobs):
+    client = api()
+    ref = blobs.put("1400-IEP.pdf", b"sleep 30")
+    started = time.monotonic()
+    response = client.post("/analyze", json={"studentId": "1400", "files": [ref]}, headers={"X-Request-Timeout": "0.5"})
+    assert response.status_code == 504
+    assert response.json()["detail"] == "Request deadline exceeded"
+    assert time.monotonic() - started < 5
+    assert 'deep_space_cancellations_total{reason="deadline"} ' in client.get("/metrics").text
+    # The interrupted worker is replaced and serves the next request
+    _wait_idle(client, 1)
+    ok = blobs.put("1401-IEP.pdf", b"ok")
+    assert client.post("/analyze", json={"studentId": "1401", "files": [ok]}).status_code == 200
+
+
+@pytest.mark.parametrize("value", ["0", "-1", "soon"])
+def test_invalid_deadline_header(api, blobs, value):
+    client = api()
+    ref = blobs.put("1410-IEP.pdf", b"ok")
+    response = client.post("/analyze", json={"studentId": "1410", "files": [ref]}, headers={"X-Request-Timeout": value})
+    assert response.status_code == 400
+
+
+def test_cancel_running_job(api, blobs):
+    client = api(JOB_WORKERS=1)
+    job = submit(client, blobs, "1420", b"sleep 30")
+    assert job["state"] == "queued"
+    wait_for(client, job["id"], "running")
+
+    cancelled = client.delete(f"/jobs/{job['id']}").json()
+    assert cancelled["state"] == "cancelled"
+    assert cancelled["error"] == {"status": 499, "detail": "Job cancelled"}
+    assert client.get("/health").json()["jobs"]["cancelled"] == 1
+    # Cancelling again leaves it as it is
+    assert client.delete(f"/jobs/{job['id']}").json()["state"] == "cancelled"
+
+
+def test_cancel_queued_job_never_runs(api, blobs):
+    client = api(JOB_WORKERS=1)
+    blocker = submit(client, blobs, "1430", b"sleep 1")
+    wait_for(client, blocker["id"], "running")
+    queued = submit(client, blobs, "1431")
+    cancelled = client.delete(f"/jobs/{queued['id']}").json()
+    assert (cancelled["state"], cancelled["startedAt"]) == ("cancelled", None)
+    assert wait_for(client, blocker["id"], "succeeded")["state"] == "succeeded"
+    assert client.get(f"/jobs/{queued['id']}").json()["startedAt"] is None
+
+
+def test_job_deadline(api, blobs):
+    client = api(JOB_WORKERS=1)
+    ref = blobs.put("1440-IEP.pdf", b"sleep 30")
+    response = client.post("/jobs", json={"studentId": "1440", "files": [ref]}, headers={"X-Request-Timeout": "0.5"})
+    failed = wait_for(client, response.json()["id"], "failed", "succeeded")
+    assert failed["error"]["status"] == 504
+
+
+def test_close_stops_workers_while_a_job_is_being_cancelled(monkeypatch):
+    async def slow_analysis(req, emit):
+        await asyncio.sleep(30)
+
+    monkeypatch.setattr(main, "_run_analysis", slow_analysis)
+
+    async def scenario():
+        queue = main.JobQueue(workers=1, retention=60)
+        queue.start()
+        job = queue.submit(main.JobRequest(studentId="1450", files=[{"name": "a.pdf", "url": "u"}]))
+        while job.state != "running":
+            await asyncio.sleep(0.01)
+        # The user's cancel and shutdown land together
+        queue.cancel(job)
+        await asyncio.wait_for(queue.close(), timeout=5)
+        return job, queue
+
+    job, queue = asyncio.run(scenario())
+    assert job.state == "cancelled"
+    assert all(task.done() for task in queue._tasks)
+
+
+def test_workers_survive_a_user_cancel(monkeypatch):
+    async def analysis(req, emit):
+        if req.studentId == "1460":
+            await asyncio.sleep(30)
+        return {"analysis": {"student_id": req.studentId}}, None
+
+    monkeypatch.setattr(main, "_run_analysis", analysis)
+
+    async def scenario():
+        queue = main.JobQueue(workers=1, retention=60)
+        queue.start()
+        first = queue.submit(main.JobRequest(studentId="1460", files=[{"name": "a.pdf", "url": "u"}]))
+        second = queue.submit(main.JobRequest(studentId="1461", files=[{"name": "a.pdf", "url": "u"}]))
+        while first.state != "running":
+            await asyncio.sleep(0.01)
+        queue.cancel(first)
+        await asyncio.wait_for(second.wait_finished(), timeout=5)
+        await queue.close()
+        return first, second
+
+    first, second = asyncio.run(scenario())
+    assert (first.state, second.state) == ("cancelled", "succeeded")
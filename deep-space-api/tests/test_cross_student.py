@@ -0,0 +1,125 @@
+"""District section index: LSH recall and order-independent cohort matches."""
+import random
+
+import deep_dive_analyzer as dda
+
+from test_section_similarity import _iep, _prose
+
+
+def _near_duplicate(text: str, seed: int, edits: int) -> str:
+    rng = random.Random(seed)
+    words = text.split()
+    for _ in range(edits):
+        words[rng.randrange(len(words))] = "edited"
+    return " ".join(words)
+
+
+def test_lsh_finds_near_duplicate_sections(tmp_path):
+    index = dda.SectionFingerprintIndex(tmp_path / "index.sqlite")
+    threshold = dda.SECTION_SIMILARITY_THRESHOLD
+    originals = {f"S{i:03d}": _prose(100 + i, 300) for i in range(60)}
+    for student, text in originals.items():
+        index.replace_student(student, [("iep.pdf", "plaafp", dda.MINHASHER.signature(text))])
+
+    expected = found = 0
+    for i, (student, text) in enumerate(originals.items()):
+        copy = dda.MINHASHER.signature(_near_duplicate(text, i, edits=1 + i % 3))
+        original = dda.MINHASHER.signature(text)
+        matches = index.query("copier", "plaafp", copy, threshold)
+        if dda.MINHASHER.similarity(copy, original) > threshold:
+            expected += 1
+            found += student in {m["student_id"] for m in matches}
+        # Only genuinely similar sections are confirmed
+        assert {m["student_id"] for m in matches} <= {student}
+        # Other sections are not compared
+        assert not index.query("copier", "transition", copy, threshold)
+    assert expected >= 40
+    assert found == expected
+    index.close()
+
+
+def test_replace_student_drops_old_entries(tmp_path):
+    index = dda.SectionFingerprintIndex(tmp_path / "index.sqlite")
+    text = _prose(1, 200)
+    signature = dda.MINHASHER.signature(text)
+    index.replace_student("A", [("old.pdf", "plaafp", signature)])
+    index.replace_student("A", [("new.pdf", "plaafp", signature)])
+    assert [m["document"] for m in index.query("B", "plaafp", signature, 0.9)] == ["new.pdf"]
+    index.replace_student("A", [])
+    assert index.query("B", "plaafp", signature, 0.9) == []
+    index.close()
+
+
+def test_retain_drops_students_outside_the_cohort(tmp_path):
+    index = dda.SectionFingerprintIndex(tmp_path / "index.sqlite")
+    signature = dda.MINHASHER.signature(_prose(1, 200))
+    for student in ("A", "B", "C"):
+        index.replace_student(student, [(f"{student}.pdf", "plaafp", signature)])
+    assert index.retain(["A", "C", "D"]) == ["B"]
+    assert [m["student_id"] for m in index.query("X", "plaafp", signature, 0.9)] == ["A", "C"]
+    assert index.retain(["A", "C"]) == []
+    # No band rows are left behind for the removed fingerprints
+    conn = index._connect()
+    assert conn.execute("SELECT COUNT(*) FROM bands").fetchone()[0] == 2 * index.BANDS
+    index.close()
+
+def _write_cohort(folder):
+    shared = _prose(1)
+    files = {
+        "111111-IEP-01152024-.pdf": _iep(shared, _prose(2)),
+        "222222-IEP-02152024-.pdf": _iep(shared, _prose(3)),
+        "333333-IEP-03152024-.pdf": _iep(_prose(4), _prose(5)),
+    }
+    for name, data in files.items():
+        (folder / name).write_bytes(data)
+
+
+def _cohort_matches(tmp_path, order):
+    index = dda.SectionFingerprintIndex(tmp_path / f"index-{''.join(order)}.sqlite")
+    for student_id in order:
+        dda.index_student(student_id, index)
+    matches = {}
+    for student_id in order:
+        analyzer = dda.StudentDocumentAnalyzer(student_id, section_index=index)
+        analyzer.find_documents()
+        analyzer.extract_text()
+        matches[student_id] = [
+            (issue["other_student"], issue["section"])
+            for issue in analyzer._detect_copy_paste()
+            if issue["type"] == "CROSS_STUDENT_PASTE"
+        ]
+    index.close()
+    return matches
+
+
+def test_cohort_matches_are_symmetric_and_order_independent(tmp_path, monkeypatch, fake_pdftotext):
+    folder = tmp_path / "ieps"
+    folder.mkdir()
+    _write_cohort(folder)
+    monkeypatch.setattr(dda, "IEP_FOLDER", folder)
+
+    forward = _cohort_matches(tmp_path, ["111111", "222222", "333333"])
+    assert forward == {
+        "111111": [("222222", "PLAAFP")],
+        "222222": [("111111", "PLAAFP")],
+        "333333": [],
+    }
+    assert _cohort_matches(tmp_path, ["333333", "222222", "111111"]) == forward
+
+
+def test_matches_do_not_expose_other_documents(tmp_path, monkeypatch, fake_pdftotext):
+    folder = tmp_path / "ieps"
+    folder.mkdir()
+    _write_cohort(folder)
+    monkeypatch.setattr(dda, "IEP_FOLDER", folder)
+    index = dda.SectionFingerprintIndex(tmp_path / "index.sqlite")
+    for student_id in ("111111", "222222"):
+        dda.index_student(student_id, index)
+
+    analyzer = dda.StudentDocumentAnalyzer("111111", section_index=index)
+    analyzer.find_documents()
+    analyzer.extract_text()
+    [entry] = analyzer.cross_student_matches
+    assert entry["matches"] == [{"student_id": "222222", "similarity": 1.0}]
+    assert "222222-IEP" not in repr(analyzer._detect_copy_paste())
+    index.close()
@@ -0,0 +1,41 @@
+"""DocumentText: one cached set of views per document, shared by every module."""
+import pytest
+
+import deep_dive_analyzer as dda
+
+ENGLISH = "Present Levels of Academic Achievement and Functional Performance(English)"
+MATH = "Present Levels of Academic Achievement and Functional Performance(Math)"
+
+
+def _analyzer(text):
+    analyzer = dda.StudentDocumentAnalyzer("123456", document_data={"123456-IEP-01152024-.pdf": text.encode()})
+    analyzer.find_documents()
+    analyzer.extract_text()
+    return analyzer
+
+
+def test_text_is_cached_with_its_views(fake_pdftotext):
+    analyzer = _analyzer("I. Student Information\nPresent levels\n")
+    doc_text = analyzer._text("123456-IEP-01152024-.pdf")
+    assert analyzer._text("123456-IEP-01152024-.pdf") is doc_text
+    assert doc_text.raw == analyzer.extracted_text["123456-IEP-01152024-.pdf"]
+    assert doc_text.lower is doc_text.lower
+    assert doc_text.sections is doc_text.sections
+    assert doc_text.lower_sections is doc_text.lower_sections
+    assert doc_text.comparable_sections is doc_text.comparable_sections
+    # Unknown documents get an empty view instead of failing
+    assert analyzer._text("missing.pdf").raw == ""
+
+
+@pytest.mark.parametrize("prefix", ["", "Campus: İstanbul Academy\n"])
+def test_deliberation_progress_from_the_lower_view(fake_pdftotext, prefix):
+    # "İ".lower() is two characters, so the lower view's offsets drift
+    text = (
+        prefix + "XXI. DELIBERATIONS\n" + "ARD Meeting Date: 01/15/2024\n" * 5
+        + ENGLISH + "\nThe student HAS NOT MET the reading goal.\n"
+        + MATH + "\nThe student is Making Progress in math.\n"
+        + "EDUCATIONAL ALTERNATIVES\n" + "XXII. Signatures\n"
+    )
+    delib = _analyzer(text)._extract_deliberations()
+    progress = {entry["subject"]: entry["goal_progress"] for entry in delib["plaafp_sections"]}
+    assert progress == {"English": "Goal NOT MET", "Math": "Making progress"}
@@ -0,0 +1,115 @@
+"""Concurrent downloads: size limits, first-error cancellation and target names."""
+import asyncio
+import time
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+import main
+
+
+def _request(*names, student_id="1600"):
+    return main.AnalyzeRequest(
+        studentId=student_id,
+        files=[{"name": name, "url": f"https://blob.test/{name}"} for name in names],
+    )
+
+
+def _download(handler, req, budget=None):
+    async def scenario():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await main._download_files(client, req, budget=budget)
+
+    return asyncio.run(scenario())
+
+
+def _chunked(data: bytes, size: int = 1000):
+    async def body():
+        for i in range(0, len(data), size):
+            yield data[i:i + size]
+
+    return body()
+
+
+def test_downloads_keyed_by_target_name():
+    def handler(request):
+        return httpx.Response(200, content=request.url.path.encode())
+
+    documents, digests = _download(handler, _request("a/1600-IEP.pdf", "REED"))
+    assert documents == {"1600-IEP.pdf": b"/a/1600-IEP.pdf", "1600_REED.pdf": b"/REED"}
+    assert set(digests) == set(documents)
+
+
+@pytest.mark.parametrize("declared", [True, False])
+def test_per_file_limit(monkeypatch, declared):
+    monkeypatch.setattr(main, "DOWNLOAD_MAX_FILE_BYTES", 4000)
+    streamed = []
+
+    def handler(request):
+        if request.url.path.endswith("small.pdf"):
+            return httpx.Response(200, content=b"x" * 4000)
+        data = b"x" * 4001
+        if declared:
+            return httpx.Response(200, content=data)
+        streamed.append(1)
+        return httpx.Response(200, content=_chunked(data))
+
+    with pytest.raises(HTTPException) as excinfo:
+        _download(handler, _request("small.pdf", "big.pdf"))
+    assert excinfo.value.status_code == 413
+    assert "big.pdf" in excinfo.value.detail
+    assert len(streamed) == (0 if declared else 1)
+
+
+def test_total_limit_counts_every_file(monkeypatch):
+    monkeypatch.setattr(main, "DOWNLOAD_MAX_FILE_BYTES", 4000)
+
+    def handler(request):
+        return httpx.Response(200, content=_chunked(b"x" * 3000))
+
+    budget = main._ByteBudget(5000)
+    with pytest.raises(HTTPException) as excinfo:
+        _download(handler, _request("one.pdf", "two.pdf"), budget=budget)
+    assert excinfo.value.status_code == 413
+    assert "per-request download limit" in excinfo.value.detail
+    assert _download(handler, _request("one.pdf"), budget=main._ByteBudget(5000))[0] == {"1600_one.pdf": b"x" * 3000}
+
+
+def test_first_error_cancels_the_other_downloads():
+    started, cancelled = set(), set()
+
+    async def handler(request):
+        name = request.url.path.rsplit("/", 1)[-1]
+        if name == "missing.pdf":
+            await asyncio.sleep(0.05)
+            return httpx.Response(404)
+        started.add(name)
+        try:
+            await asyncio.sleep(30)
+        except asyncio.CancelledError:
+            cancelled.add(name)
+            raise
+        return httpx.Response(200, content=b"late")
+
+    began = time.monotonic()
+    with pytest.raises(HTTPException) as excinfo:
+        _download(handler, _request("slow1.pdf", "missing.pdf", "slow2.pdf"))
+    assert excinfo.value.status_code == 502
+    assert time.monotonic() - began < 5
+    assert started == cancelled == {"slow1.pdf", "slow2.pdf"}
+
+
+@pytest.mark.parametrize("names", [
+    ["1700-IEP.pdf", "other/1700-IEP.pdf"],
+    ["IEP", "IEP.pdf"],
+    ["a\\1700-IEP.pdf", "b/1700-IEP.pdf"],
+])
+def test_duplicate_target_names_are_rejected(api, blobs, names):
+    client = api()
+    files = [{"name": name, "url": blobs.put(f"{i}.pdf", b"ok")["url"]} for i, name in enumerate(names)]
+    response = client.post("/analyze", json={"studentId": "1700", "files": files})
+    assert response.status_code == 400
+    assert "More than one file would be analyzed as" in response.json()["detail"]
+    response = client.post("/jobs", json={"studentId": "1700", "files": files})
+    assert response.status_code == 400
@@ -0,0 +1,73 @@
+"""Documents analyzed from memory, keyed by the name they were given."""
+import enum
+import json
+from datetime import date, datetime
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import deep_dive_analyzer as dda
+
+from test_section_similarity import _iep, _prose
+
+
+def test_nested_names_are_found_and_extracted(fake_pdftotext):
+    text = _iep(_prose(1), _prose(2))
+    analyzer = dda.StudentDocumentAnalyzer("123456", document_data={
+        "uploads/2024/123456-IEP-01152024-.pdf": text,
+        "123456-REED-02012024-.pdf": b"REED body",
+        "uploads/654321-IEP-01152024-.pdf": b"someone else",
+    })
+    docs = analyzer.find_documents()
+    assert [(d["filename"], d["path"], d["type"], d["size"]) for d in docs] == [
+        ("123456-REED-02012024-.pdf", "123456-REED-02012024-.pdf", "REED", 9),
+        ("123456-IEP-01152024-.pdf", "uploads/2024/123456-IEP-01152024-.pdf", "IEP", len(text)),
+    ]
+    analyzer.extract_text()
+    assert analyzer.extracted_text["123456-IEP-01152024-.pdf"] == text.decode()
+    assert analyzer.extracted_text["123456-REED-02012024-.pdf"] == "REED body"
+
+
+def test_analyze_documents_with_nested_name(fake_pdftotext):
+    result = dda.analyze_documents("123456", documents={"a/b/123456-IEP-01152024-.pdf": _iep(_prose(1), _prose(2))})
+    assert result["analysis"]["document_count"] == 1
+    assert set(result["timings"]["documents"]) == {"123456-IEP-01152024-.pdf"}
+
+
+def test_jsonable_matches_a_json_round_trip():
+    class Level(enum.IntEnum):
+        HIGH = 2
+
+    value = {
+        "when": datetime(2024, 1, 15, 8, 30), "due": date(2025, 1, 15), "path": Path("ieps/1.pdf"),
+        "pair": (1, "a"), 3: "int key", 1.5: "float key", None: "none key", True: "bool key",
+        "numpy": [np.int64(7), np.float64(0.25), np.bool_(True)], "stamp": pd.Timestamp("2024-02-01"),
+        "level": Level.HIGH, "nested": [{"tags": {"x"}}], "plain": [None, False, 1, 2.0, "s"],
+    }
+    assert dda._jsonable(value) == json.loads(json.dumps(value, default=str))
+    plain = {"a": [1, {"b": None}]}
+    assert dda._jsonable(plain) == plain
+
+
+def test_analysis_is_returned_as_plain_data(fake_pdftotext):
+    result = dda.analyze_documents("123456", documents={"123456-IEP-01152024-.pdf": _iep(_prose(1), _prose(2))})
+    assert json.loads(json.dumps(result["analysis"])) == result["analysis"]
+    assert set(result["timings"]["stages"]) == {"find_documents", "extract_text", "analyze_all", "normalize", "report"}
+
+
+def test_api_drops_folders_from_file_names(api, blobs):
+    client = api()
+    refs = [blobs.put("sub/1300-IEP.pdf", b"nested"), blobs.put("1300-REED", b"no extension")]
+    response = client.post("/analyze", json={"studentId": "1300", "files": refs})
+    assert response.status_code == 200, response.text
+    assert response.json()["analysis"]["documents"] == {"1300-IEP.pdf": 6, "1300-REED.pdf": 12}
+
+
+def test_large_documents_reach_the_worker(api, blobs):
+    client = api()
+    data = b"x" * (8 * 1024 * 1024)
+    ref = blobs.put("1310-IEP.pdf", data)
+    response = client.post("/analyze", json={"studentId": "1310", "files": [ref]})
+    assert response.status_code == 200, response.text
+    assert response.json()["analysis"]["documents"] == {"1310-IEP.pdf": len(data)}
@@ -0,0 +1,66 @@
+"""Server-Sent Events for jobs: ordering, replay and keep-alives."""
+import json
+
+from test_jobs import submit, wait_for
+
+
+def read_events(client, job_id, **headers):
+    """``(comments, [(id, event, data), ...])`` from a job's event stream."""
+    comments, events = [], []
+    with client.stream("GET", f"/jobs/{job_id}/events", headers=headers) as response:
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        body = response.read().decode()
+    for block in body.split("\n\n"):
+        if not block:
+            continue
+        if block.startswith(":"):
+            comments.append(block)
+            continue
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((int(fields["id"]), fields["event"], json.loads(fields["data"])))
+    return comments, events
+
+
+def test_events_follow_the_job_to_its_result(api, blobs):
+    client = api()
+    job = submit(client, blobs, "900", b"sleep 0.3")
+    _, events = read_events(client, job["id"])
+
+    assert [index for index, _, _ in events] == list(range(len(events)))
+    names = [event for _, event, _ in events]
+    assert names[0] == "download_started"
+    assert names.index("file_downloaded") < names.index("documents_found") < names.index("module_started")
+    assert names[-1] == "result"
+    assert events[-1][2]["analysis"]["student_id"] == "900"
+
+
+def test_last_event_id_replays_the_rest(api, blobs):
+    client = api()
+    job = submit(client, blobs, "910")
+    wait_for(client, job["id"], "succeeded")
+    _, everything = read_events(client, job["id"])
+    _, rest = read_events(client, job["id"], **{"Last-Event-ID": "2"})
+    assert rest == everything[3:]
+
+
+def test_failed_job_ends_with_error_event(api, blobs):
+    client = api()
+    job = submit(client, blobs, "920", b"fail")
+    _, events = read_events(client, job["id"])
+    index, event, data = events[-1]
+    assert event == "error"
+    assert data["status"] == 500
+
+
+def test_keep_alive_while_idle(api, blobs):
+    client = api(SSE_KEEPALIVE=0.1)
+    job = submit(client, blobs, "930", b"sleep 0.6")
+    comments, events = read_events(client, job["id"])
+    assert ": keep-alive" in comments
+    assert events[-1][1] == "result"
+
+
+def test_unknown_job(api):
+    client = api()
+    assert client.get("/jobs/nope/events").status_code == 404
@@ -0,0 +1,75 @@
+"""Background jobs: lifecycle, priority order, failures and retention."""
+import time
+
+
+def submit(client, blobs, student_id, content=b"ok", **extra):
+    ref = blobs.put(f"{student_id}-IEP.pdf", content)
+    response = client.post("/jobs", json={"studentId": student_id, "files": [ref], **extra})
+    assert response.status_code == 202, response.text
+    return response.json()
+
+
+def wait_for(client, job_id, *states, timeout=30):
+    deadline = time.monotonic() + timeout
+    while True:
+        status = client.get(f"/jobs/{job_id}").json()
+        if status["state"] in states:
+            return status
+        assert time.monotonic() < deadline, f"job stuck in {status['state']}"
+        time.sleep(0.02)
+
+
+def test_job_runs_to_completion(api, blobs):
+    client = api()
+    job = submit(client, blobs, "800")
+    assert job["state"] == "queued"
+    assert job["result"] is None
+
+    done = wait_for(client, job["id"], "succeeded", "failed")
+    assert done["state"] == "succeeded"
+    assert done["stage"] == "done"
+    assert done["result"]["analysis"]["student_id"] == "800"
+    assert done["progress"]["files_total"] == done["progress"]["files_downloaded"] == 1
+    assert done["progress"]["documents_total"] == 1
+    assert done["submittedAt"] <= done["startedAt"] <= done["finishedAt"]
+    assert client.get("/health").json()["jobs"]["succeeded"] == 1
+
+
+def test_higher_priority_starts_first(api, blobs):
+    client = api(JOB_WORKERS=1)
+    blocker = submit(client, blobs, "810", b"sleep 0.5")
+    wait_for(client, blocker["id"], "running")
+    low = submit(client, blobs, "811", priority=0)
+    high = submit(client, blobs, "812", priority=5)
+    same = submit(client, blobs, "813", priority=5)
+
+    finished = [wait_for(client, job["id"], "succeeded") for job in (low, high, same)]
+    started = sorted(finished, key=lambda status: status["startedAt"])
+    assert [status["studentId"] for status in started] == ["812", "813", "811"]
+
+
+def test_failed_job_reports_error(api, blobs):
+    client = api()
+    job = submit(client, blobs, "820", b"fail")
+    failed = wait_for(client, job["id"], "succeeded", "failed")
+    assert failed["state"] == "failed"
+    assert failed["error"]["status"] == 500
+    assert "analyzer failed" in failed["error"]["detail"]
+    assert failed["result"] is None
+
+
+def test_unknown_and_expired_jobs(api, blobs):
+    client = api(JOB_RETENTION=0.2)
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.delete("/jobs/nope").status_code == 404
+    job = submit(client, blobs, "830")
+    wait_for(client, job["id"], "succeeded")
+    time.sleep(0.3)
+    assert client.get(f"/jobs/{job['id']}").status_code == 404
+
+
+def test_invalid_job_rejected_up_front(api, blobs):
+    client = api()
+    response = client.post("/jobs", json={"studentId": "840", "files": []})
+    assert response.status_code == 400
+    assert client.get("/health").json()["jobs"]["queued"] == 0
@@ -0,0 +1,38 @@
+"""Prometheus text rendering and the /metrics endpoint."""
+import main
+
+
+def test_label_values_are_escaped():
+    metric = main._Metric("counter", "test_total", "Help with a \\ backslash\nand a newline.")
+    metric.inc(module='odd "name"\\path\nnext')
+    assert metric.render() == [
+        "# HELP test_total Help with a \\\\ backslash\\nand a newline.",
+        "# TYPE test_total counter",
+        'test_total{module="odd \\"name\\"\\\\path\\nnext"} 1',
+    ]
+
+
+def test_histogram_buckets_are_cumulative():
+    metric = main._Metric("histogram", "test_seconds", "Latency.", buckets=(0.1, 1))
+    for value in (0.05, 0.5, 5):
+        metric.observe(value, stage="x")
+    assert metric.render()[2:] == [
+        'test_seconds_bucket{le="0.1",stage="x"} 1',
+        'test_seconds_bucket{le="1",stage="x"} 2',
+        'test_seconds_bucket{le="+Inf",stage="x"} 3',
+        'test_seconds_sum{stage="x"} 5.55',
+        'test_seconds_count{stage="x"} 3',
+    ]
+
+
+def test_metrics_endpoint_counts_analyses(api, blobs):
+    client = api()
+    ref = blobs.put("1100-IEP.pdf", b"ok")
+    assert client.post("/analyze", json={"studentId": "1100", "files": [ref]}).status_code == 200
+    response = client.get("/metrics")
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+    lines = response.text.splitlines()
+    assert any(line.startswith('deep_space_analyses_total{outcome="ok"} ') for line in lines)
+    assert any(line.startswith('deep_space_stage_seconds_count{stage="analyzer"} ') for line in lines)
+    assert 'deep_space_jobs{state="queued"} 0' in lines
+    assert "deep_space_analyzer_workers_idle 1" in lines
@@ -0,0 +1,91 @@
+"""ReferenceIndex: per-student rows from district tables, and reload checks."""
+import os
+
+import pandas as pd
+import pytest
+
+import deep_dive_analyzer as dda
+
+CSV = (
+    "Student ID,Accommodation,Subject\n"
+    "1001,Extra time,Math\n"
+    "1002,Read aloud,Reading\n"
+    "1001,Small group,Reading\n"
+    "01003,Calculator,Math\n"
+    ",Orphan row,Science\n"
+)
+
+
+@pytest.fixture
+def accommodations(tmp_path, monkeypatch):
+    path = tmp_path / "accommodations.csv"
+    path.write_text(CSV)
+    monkeypatch.setattr(dda, "ACCOMMODATIONS_CSV_PATH", path)
+    return path
+
+
+def test_rows_match_filtering_the_whole_table(accommodations):
+    index = dda.ReferenceIndex()
+    df = dda._read_reference_csv(accommodations)
+    for student_id in ("1001", "1002", "01003", "1003", "9999"):
+        expected = df[df["Student ID"].astype(str) == student_id]
+        rows = index.rows("accommodations", student_id)
+        if expected.empty:
+            assert rows is None
+        else:
+            pd.testing.assert_frame_equal(rows, expected)
+
+
+def test_table_is_parsed_once(accommodations, monkeypatch):
+    calls = []
+    real_read = dda._read_reference_csv
+    monkeypatch.setattr(dda, "_read_reference_csv", lambda *a, **k: calls.append(a) or real_read(*a, **k))
+    index = dda.ReferenceIndex()
+    for student_id in ("1001", "1002", "1001"):
+        index.rows("accommodations", student_id)
+    assert len(calls) == 1
+    assert index.paths["accommodations"] == accommodations
+
+
+def test_stale_after_a_loaded_table_changes(accommodations):
+    index = dda.ReferenceIndex()
+    index.rows("accommodations", "1001")
+    assert not index.stale()
+    accommodations.write_text(CSV + "1004,Breaks,Math\n")
+    os.utime(accommodations, (1, 1))
+    assert index.stale()
+    accommodations.unlink()
+    assert index.stale()
+
+
+def test_stale_when_a_missing_table_appears(tmp_path, monkeypatch):
+    path = tmp_path / "telpas.csv"
+    monkeypatch.setattr(dda, "TELPAS_CSV_PATH", path)
+    index = dda.ReferenceIndex()
+    assert index.rows("telpas", "1001") is None
+    assert not index.stale()
+
+    path.write_text("Student ID,Listening\n1001,Advanced\n")
+    assert index.stale()
+    fresh = dda.ReferenceIndex()
+    assert fresh.rows("telpas", "1001")["Listening"].tolist() == ["Advanced"]
+
+
+def test_stale_when_an_unreadable_table_is_fixed(tmp_path, monkeypatch):
+    path = tmp_path / "bip.csv"
+    path.write_bytes(b"")
+    monkeypatch.setattr(dda, "BIP_CSV_PATH", path)
+    index = dda.ReferenceIndex()
+    assert index.rows("bip", "1001") is None
+    assert not index.stale()
+    path.write_text("Student ID,Plan\n1001,Yes\n")
+    os.utime(path, (1, 1))
+    assert index.stale()
+
+
+def test_untouched_tables_are_not_watched(accommodations, tmp_path, monkeypatch):
+    monkeypatch.setattr(dda, "GOALS_CSV_PATH", tmp_path / "goals.csv")
+    index = dda.ReferenceIndex()
+    index.rows("accommodations", "1001")
+    (tmp_path / "goals.csv").write_text("Student ID,Goal\n1001,Read\n")
+    assert not index.stale()
@@ -0,0 +1,88 @@
+"""JSON responses: one serialization, negotiated compression."""
+import gzip
+import json
+import types
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def analyzed(api, blobs, monkeypatch):
+    """POST /analyze with a given Accept-Encoding and compression threshold."""
+    client = api()
+    ref = blobs.put("1500-IEP.pdf", b"x" * 5000)
+
+    def post(accept_encoding, min_bytes=0):
+        monkeypatch.setattr(main, "RESPONSE_COMPRESS_MIN_BYTES", min_bytes)
+        with client.stream("POST", "/analyze", json={"studentId": "1500", "files": [ref]},
+                           headers={"Accept-Encoding": accept_encoding}) as response:
+            assert response.status_code == 200
+            response.raw_body = b"".join(response.iter_raw())
+        return response
+
+    return post
+
+
+def test_gzip_when_accepted(analyzed):
+    response = analyzed("gzip, deflate")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert json.loads(gzip.decompress(response.raw_body))["analysis"]["student_id"] == "1500"
+
+
+@pytest.mark.parametrize("accept_encoding", ["", "identity", "deflate", "gzip;q=0", "GZIP;q=0, deflate", "*;q=0", "gzip;q=bad"])
+def test_uncompressed_unless_gzip_is_acceptable(analyzed, accept_encoding):
+    response = analyzed(accept_encoding)
+    assert "content-encoding" not in response.headers
+    assert response.headers["vary"] == "Accept-Encoding"
+    assert json.loads(response.raw_body)["analysis"]["student_id"] == "1500"
+
+
+@pytest.mark.parametrize("accept_encoding", ["*", "deflate, *;q=0.5", "gzip;q=1.0"])
+def test_wildcard_and_explicit_q(analyzed, accept_encoding):
+    assert analyzed(accept_encoding).headers["content-encoding"] == "gzip"
+
+
+def test_small_responses_are_not_compressed(analyzed):
+    small = analyzed("gzip", min_bytes=1 << 20)
+    assert "content-encoding" not in small.headers
+    assert small.headers["vary"] == "Accept-Encoding"
+    assert analyzed("gzip", min_bytes=len(small.raw_body)).headers["content-encoding"] == "gzip"
+    assert "content-encoding" not in analyzed("gzip", min_bytes=len(small.raw_body) + 1).headers
+
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("gzip, br", "br"),
+    ("br;q=0.5, gzip", "gzip"),
+    ("gzip;q=0, *", "br"),
+    ("br;q=0, *", "gzip"),
+    ("*;q=0.1, gzip;q=0.1", "br"),
+    ("br;q=0, gzip;q=0, *", None),
+])
+def test_brotli_negotiation(monkeypatch, accept_encoding, expected):
+    monkeypatch.setattr(main, "BROTLI_AVAILABLE", True)
+    assert main._response_encoding(accept_encoding) == expected
+
+
+def test_brotli_preferred_when_installed(analyzed, monkeypatch):
+    compressed = []
+    fake = types.SimpleNamespace(compress=lambda body, quality: compressed.append(quality) or b"BR" + body)
+    monkeypatch.setattr(main, "BROTLI_AVAILABLE", True)
+    monkeypatch.setattr(main, "brotli", fake, raising=False)
+    response = analyzed("gzip, deflate, br")
+    assert response.headers["content-encoding"] == "br"
+    assert response.raw_body.startswith(b"BR{")
+    assert compressed == [main.RESPONSE_BROTLI_QUALITY]
+    monkeypatch.setattr(main, "BROTLI_AVAILABLE", False)
+    assert analyzed("gzip, br").headers["content-encoding"] == "gzip"
+
+
+@pytest.mark.skipif(not main.ORJSON_AVAILABLE, reason="orjson is not installed")
+def test_orjson_and_stdlib_bodies_match(analyzed, monkeypatch):
+    payload = json.loads(analyzed("identity").raw_body)
+    payload["extra"] = {"name": "José Ñúñez — 日本", "score": 0.1 + 0.2, "big": 2 ** 53, "none": None, "flags": [True, False]}
+    with_orjson = main._dumps(payload)
+    monkeypatch.setattr(main, "ORJSON_AVAILABLE", False)
+    assert main._dumps(payload) == with_orjson
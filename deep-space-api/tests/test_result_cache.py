@@ -0,0 +1,116 @@
+"""Result cache: keys, TTL, size bound, persistence and invalidation."""
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import main
+
+
+def _analyze(client, blobs, student_id, content=b"ok", **extra):
+    ref = blobs.put(f"{student_id}-IEP.pdf", content)
+    response = client.post("/analyze", json={"studentId": student_id, "files": [ref], **extra})
+    assert response.status_code == 200, response.text
+    return response.headers.get("X-Result-Cache"), response.json()["analysis"]
+
+
+def test_ttl_and_size_bound(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(main.time, "time", lambda: now[0])
+    cache = main.ResultCache(ttl=60, max_entries=2)
+    for key in "abc":
+        cache.put(key, "s", {"key": key})
+    assert cache.get("a") is None
+    assert cache.get("b") == {"key": "b"}
+    now[0] += 61
+    assert cache.get("b") is None
+    assert cache.stats() == {"enabled": True, "entries": 1, "hits": 1, "misses": 2}
+
+
+def test_persists_and_invalidates_by_student(tmp_path):
+    db = str(tmp_path / "results.sqlite")
+    cache = main.ResultCache(ttl=60, max_entries=8, db_path=db)
+    cache.put("k1", "700", {"n": 1})
+    cache.put("k2", "701", {"n": 2})
+    cache.close()
+
+    reopened = main.ResultCache(ttl=60, max_entries=8, db_path=db)
+    assert reopened.get("k1") == {"n": 1}
+    assert reopened.invalidate("700") == 1
+    assert reopened.get("k1") is None
+    assert reopened.get("k2") == {"n": 2}
+    assert reopened.invalidate() == 1
+    assert reopened.get("k2") is None
+    reopened.close()
+
+
+def test_key_covers_inputs():
+    key = main.ResultCache.key("700", {"a.pdf": "1"}, None, "v1")
+    assert key == main.ResultCache.key("700", {"a.pdf": "1"}, None, "v1")
+    assert key != main.ResultCache.key("701", {"a.pdf": "1"}, None, "v1")
+    assert key != main.ResultCache.key("700", {"a.pdf": "2"}, None, "v1")
+    assert key != main.ResultCache.key("700", {"a.pdf": "1"}, "profile.xlsx", "v1")
+    assert key != main.ResultCache.key("700", {"a.pdf": "1"}, None, "v2")
+
+
+def test_analyze_hits_and_invalidation(api, blobs):
+    client = api()
+    status, first = _analyze(client, blobs, "710")
+    assert status == "miss"
+    status, again = _analyze(client, blobs, "710")
+    assert (status, again) == ("hit", first)
+
+    # New file content or another profile are different inputs
+    assert _analyze(client, blobs, "710", b"changed")[0] == "miss"
+    assert _analyze(client, blobs, "710", b"changed", assessmentProfile="other.xlsx")[0] == "miss"
+
+    assert client.delete("/cache/710").json() == {"invalidated": 3}
+    status, fresh = _analyze(client, blobs, "710", b"changed")
+    assert status == "miss"
+    assert fresh["calls"] > first["calls"]
+
+    _analyze(client, blobs, "711")
+    assert client.delete("/cache").json()["invalidated"] >= 2
+    assert _analyze(client, blobs, "711")[0] == "miss"
+
+
+def test_disabled_cache_sends_no_header(api, blobs):
+    client = api(RESULT_CACHE_TTL=0)
+    assert _analyze(client, blobs, "720")[0] is None
+    assert _analyze(client, blobs, "720")[0] is None
+
+
+def test_cache_is_used_off_the_event_loop(api, blobs, tmp_path, monkeypatch):
+    calls = []
+
+    def off_loop(method):
+        def wrapper(self, *args):
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                calls.append(method.__name__)
+            else:
+                calls.append(f"{method.__name__} on the event loop")
+            return method(self, *args)
+        return wrapper
+
+    for name in ("get", "put", "invalidate"):
+        monkeypatch.setattr(main.ResultCache, name, off_loop(getattr(main.ResultCache, name)))
+    client = api(RESULT_CACHE_DB=str(tmp_path / "results.sqlite"))
+    assert _analyze(client, blobs, "720")[0] == "miss"
+    assert _analyze(client, blobs, "720")[0] == "hit"
+    assert client.delete("/cache/720").json() == {"invalidated": 1}
+    assert client.delete("/cache").json() == {"invalidated": 0}
+    assert calls == ["get", "put", "get", "invalidate", "invalidate"]
+
+
+def test_concurrent_use_from_threads(tmp_path):
+    cache = main.ResultCache(ttl=60, max_entries=16, db_path=str(tmp_path / "results.sqlite"))
+
+    def work(n):
+        for i in range(50):
+            cache.put(f"{n}-{i}", str(n), {"i": i})
+            assert cache.get(f"{n}-{i}") == {"i": i}
+        return cache.invalidate(str(n))
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        assert list(pool.map(work, range(8))) == [50] * 8
+    cache.close()
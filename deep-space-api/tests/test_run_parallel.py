@@ -0,0 +1,112 @@
+"""``--all --workers N`` must produce what the serial run does."""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+import pytest
+
+import deep_dive_analyzer as dda
+
+from test_section_similarity import _iep, _prose
+
+
+def _cohort(folder):
+    shared = _prose(1)
+    files = {
+        "111111-IEP-01152023-.pdf": _iep(_prose(2), _prose(3), attendance="01/10/2022"),
+        "111111-IEP-01152024-.pdf": _iep(_prose(2), shared),
+        "222222-IEP-02152024-.pdf": _iep(_prose(4), shared),
+        "333333/333333-IEP-03152024-.pdf": _iep(_prose(5), _prose(6)),
+        "333333/333333-REED-03012024-.pdf": b"REED",
+        "444444-IEP-04152024-.pdf": b"",
+    }
+    for name, data in files.items():
+        (folder / name).parent.mkdir(parents=True, exist_ok=True)
+        (folder / name).write_bytes(data)
+
+
+def _run(monkeypatch, tmp_path, name, *args):
+    out = tmp_path / name
+    out.mkdir()
+    monkeypatch.setattr(dda, "OUTPUT_FOLDER", out)
+    monkeypatch.setattr(dda, "SECTION_INDEX_PATH", str(out / "index.sqlite"))
+    monkeypatch.setattr(sys, "argv", ["deep_dive_analyzer.py", "--all", *args])
+    dda.main()
+    return {p.name: p.read_text() for p in sorted(out.glob("DEEP_DIVE_*.json"))}
+
+
+def test_workers_match_serial_run(tmp_path, monkeypatch, fake_pdftotext, capsys):
+    folder = tmp_path / "ieps"
+    folder.mkdir()
+    _cohort(folder)
+    monkeypatch.setattr(dda, "IEP_FOLDER", folder)
+
+    serial = _run(monkeypatch, tmp_path, "serial", "--workers", "1")
+    parallel = _run(monkeypatch, tmp_path, "parallel", "--workers", "3")
+    assert sorted(serial) == [f"DEEP_DIVE_{sid}.json" for sid in ("111111", "222222", "333333", "444444")]
+    assert parallel == serial
+    assert "Students analyzed: 4/4" in capsys.readouterr().out
+
+
+def test_run_parallel_summaries_in_input_order(tmp_path, monkeypatch, fake_pdftotext):
+    folder = tmp_path / "ieps"
+    folder.mkdir()
+    _cohort(folder)
+    monkeypatch.setattr(dda, "IEP_FOLDER", folder)
+    monkeypatch.setattr(dda, "OUTPUT_FOLDER", tmp_path / "out")
+    (tmp_path / "out").mkdir()
+    monkeypatch.setattr(dda, "SECTION_INDEX_PATH", "")
+
+    students = ["333333", "111111", "222222"]
+    summaries = dda.run_parallel(students, workers=2)
+    assert [s["student_id"] for s in summaries] == students
+    serial = [dda.analyze_student(sid) for sid in students]
+    assert summaries == serial
+
+
+@pytest.mark.parametrize("workers", ["1", "3"])
+@pytest.mark.parametrize("cache_bytes", [0, 1])
+def test_each_document_is_extracted_once(tmp_path, monkeypatch, fake_pdftotext, workers, cache_bytes):
+    folder = tmp_path / "ieps"
+    folder.mkdir()
+    _cohort(folder)
+    monkeypatch.setattr(dda, "IEP_FOLDER", folder)
+    # Off, or too small to keep anything between the index and analysis passes
+    cache = dda.TextCache(tmp_path / "text-cache", cache_bytes)
+    monkeypatch.setattr(dda, "TEXT_CACHE", cache)
+    log = tmp_path / "pdftotext.log"
+    monkeypatch.setenv("FAKE_PDFTOTEXT_LOG", str(log))
+    scratch = tmp_path / "tmp"
+    scratch.mkdir()
+    monkeypatch.setattr(tempfile, "tempdir", str(scratch))
+
+    _run(monkeypatch, tmp_path, "out", "--workers", workers)
+    extracted = sorted(Path(line).relative_to(folder).as_posix() for line in log.read_text().split())
+    assert extracted == sorted(p.relative_to(folder).as_posix() for p in folder.rglob("*.pdf"))
+    # The run's own texts are gone and the configured cache is back in place
+    assert dda.TEXT_CACHE is cache
+    assert not list(scratch.iterdir())
+    assert sum(p.stat().st_size for p in cache.root.rglob("*.txt.gz")) <= cache_bytes
+
+
+def test_students_who_left_are_purged(tmp_path, monkeypatch, fake_pdftotext, capsys):
+    folder = tmp_path / "ieps"
+    folder.mkdir()
+    _cohort(folder)
+    monkeypatch.setattr(dda, "IEP_FOLDER", folder)
+    out = tmp_path / "out"
+    out.mkdir()
+    index = dda.SectionFingerprintIndex(out / "index.sqlite")
+    # A student who has left shares a section with 222222
+    shared = dda.DocumentText(_iep(_prose(4), _prose(1)).decode()).fingerprints["parent_concerns"]
+    index.replace_student("999999", [("999999-IEP.pdf", "parent_concerns", shared)])
+    index.close()
+
+    monkeypatch.setattr(dda, "OUTPUT_FOLDER", out)
+    monkeypatch.setattr(dda, "SECTION_INDEX_PATH", str(out / "index.sqlite"))
+    monkeypatch.setattr(sys, "argv", ["deep_dive_analyzer.py", "--all"])
+    dda.main()
+    assert "Removed 1 students no longer in the cohort" in capsys.readouterr().out
+    analysis = json.loads((out / "DEEP_DIVE_222222.json").read_text())
+    assert {m["student_id"] for e in analysis["cross_student_matches"] for m in e["matches"]} == {"111111"}
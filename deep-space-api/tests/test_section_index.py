@@ -0,0 +1,88 @@
+"""SectionIndex lookups must agree with scanning the text directly."""
+import re
+
+import deep_dive_analyzer as dda
+
+IEP = (
+    "Admission, Review and Dismissal Committee Report\n"
+    "I. Student Information\nName on file\n"
+    "II. Present Levels of Academic Achievement and Functional Performance\n"
+    "Present Levels of Academic Achievement and Functional Performance(English)\n"
+    "Reads at a fourth grade level.\n\f"
+    "Present Levels of Academic Achievement and Functional Performance(Math)\n"
+    "Computes with regrouping.\n"
+    "See DELIBERATIONS below; determination of eligibility was reviewed.\n"
+    "XXI. DELIBERATIONS\nThe committee agreed.\n\f"
+    "XXII. Signatures\nASSURANCES\nReport Generated 01/02/2025\n"
+)
+
+
+def test_find_matches_str_find():
+    index = dda.SectionIndex(IEP)
+    for title in dda.SectionIndex.TITLES:
+        for start in range(0, len(IEP), 7):
+            for end in (None, start + 40, len(IEP) + 10):
+                assert index.find(title, start, end) == IEP.find(title, start, end), (title, start, end)
+
+
+def test_heads_use_first_match():
+    index = dda.SectionIndex(IEP.lower())
+    assert index.head("eligibility") == IEP.lower().find("determination of eligibility")
+    assert index.head("present_levels") == IEP.lower().find("present levels")
+    assert dda.SectionIndex("nothing here").head("eligibility") == -1
+
+
+def test_sections_in_document_order():
+    index = dda.SectionIndex(IEP)
+    titles = [s["title"] for s in index.sections]
+    assert titles == [
+        "I. Student Information",
+        "II. Present Levels of Academic Achievement and Functional Performance",
+        "Present Levels of Academic Achievement and Functional Performance(English)",
+        "Present Levels of Academic Achievement and Functional Performance(Math)",
+        "XXI. DELIBERATIONS",
+        "XXII. Signatures",
+        "ASSURANCES",
+        "Report Generated",
+    ]
+    # Spans tile the document from the first heading on
+    for current, following in zip(index.sections, index.sections[1:]):
+        assert current["end"] == following["start"]
+    assert index.sections[-1]["end"] == len(IEP)
+    # The mid-line mention of DELIBERATIONS is not a heading
+    assert IEP.find("DELIBERATIONS") not in {s["start"] for s in index.sections}
+
+
+def test_page_numbers():
+    index = dda.SectionIndex(IEP)
+    pages = {s["title"]: s["page"] for s in index.sections}
+    assert pages["I. Student Information"] == 1
+    assert pages["Present Levels of Academic Achievement and Functional Performance(Math)"] == 2
+    assert pages["ASSURANCES"] == 3
+
+
+# The block patterns _extract_iep_services anchors at these heads
+BLOCKS = {
+    "supplementary_aids": r'supplementary\s+aids?\s+(?:and\s+)?(?:support|service)[s:\s]+(.*?)(?:\n\n|testing|accommodat)',
+    "classroom_accommodations": r'(?:classroom\s+accommodat|instructional\s+accommodat)[s:\s]+(.*?)(?:testing\s+accommodat|state\s+assess|goal|$)',
+    "testing_accommodations": r'(?:testing\s+accommodat|state\s+assess.*accommodat)[s:\s]+(.*?)(?:goal|esy|extended\s+school|assistive\s+tech|$)',
+}
+
+
+def test_block_heads_match_where_the_block_search_would():
+    texts = [
+        "supplementary aids and services: visual schedule\n\nclassroom accommodat: extra time\ntesting accommodat: oral\ngoal 1",
+        "supplementary aids\nsupplementary aid services\nlist\n\ninstructional accommodat\nbreaks",
+        "the state assessment, with accommodat\tread aloud\nesy",
+        "state assessment accommodations: none listed\nstate assess accommodat: large print",
+        "classroom accommodations: (no match without a separator)\ntesting accommodation",
+        "no blocks here",
+    ]
+    for tl in texts:
+        index = dda.SectionIndex(tl)
+        for name, pattern in BLOCKS.items():
+            block = re.compile(pattern, re.DOTALL)
+            start = index.head(name)
+            anchored = block.match(tl, start) if start != -1 else None
+            expected = block.search(tl)
+            assert (anchored and anchored.span(1)) == (expected and expected.span(1)), (name, tl)
@@ -0,0 +1,93 @@
+"""Carried-over IEP sections and the MinHash estimates behind them."""
+import random
+
+import pytest
+
+import deep_dive_analyzer as dda
+
+WORDS = (
+    "student reads decodes fluently grade level passage comprehension math computation "
+    "regrouping fractions teacher reports progress benchmark assessment writing paragraph "
+    "organization spelling vocabulary attention classroom independent support small group"
+).split()
+
+
+def _prose(seed: int, words: int = 120) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _iep(plaafp: str, parent: str, attendance: str = "01/10/2024") -> bytes:
+    return (
+        "I. Student Information\n"
+        f"Days absent as of {attendance}: 3\n"
+        "II. Present Levels of Academic Achievement\n"
+        f"{plaafp}\n"
+        "III. Parent Concerns\n"
+        f"{parent}\n"
+        "IV. Goals\n"
+    ).encode()
+
+
+def _issues(documents: dict) -> list[dict]:
+    result = dda.analyze_documents("123456", documents=documents)
+    return result["analysis"]["copy_paste_issues"]
+
+
+def test_minhash_estimates_jaccard():
+    base = _prose(1, 400).split()
+    changed = list(base)
+    for i in range(0, len(changed), 40):
+        changed[i] = "substitute"
+    a = dda.MINHASHER.signature(" ".join(base))
+    b = dda.MINHASHER.signature(" ".join(changed))
+    k = dda.SHINGLE_WORDS
+    shingles = lambda ws: {" ".join(ws[i:i + k]) for i in range(len(ws) - k + 1)}
+    exact = len(shingles(base) & shingles(changed)) / len(shingles(base) | shingles(changed))
+    assert dda.MINHASHER.similarity(a, b) == pytest.approx(exact, abs=0.12)
+    assert dda.MINHASHER.similarity(a, a) == 1.0
+    assert dda.MINHASHER.signature("too short to sign") is None
+
+
+def test_stale_sections_reported_against_closest_earlier_iep(fake_pdftotext):
+    plaafp = _prose(1)
+    issues = _issues({
+        "123456-IEP-01152022-.pdf": _iep(plaafp, _prose(2)),
+        "123456-IEP-01152023-.pdf": _iep(plaafp, _prose(3)),
+        "123456-IEP-01152024-.pdf": _iep(plaafp, _prose(4)),
+    })
+    stale = [i for i in issues if i["type"] == "STALE_PLAAFP"]
+    # Each later IEP is reported once, against the closest earlier copy
+    assert sorted((i["current_iep"], i["original_iep"]) for i in stale) == [
+        ("2023-01-15", "2022-01-15"),
+        ("2024-01-15", "2022-01-15"),
+    ]
+    assert all(i["similarity"] == "100%" for i in stale)
+    # Parent concerns were rewritten every year
+    assert not [i for i in issues if i["type"] == "STALE_PARENT_CONCERNS"]
+
+
+def test_section_similarity_keeps_only_reportable_pairs(fake_pdftotext):
+    analyzer = dda.StudentDocumentAnalyzer("123456", document_data={
+        "123456-IEP-01152022-.pdf": _iep(_prose(1), _prose(2)),
+        "123456-IEP-01152023-.pdf": _iep(_prose(1), _prose(3)),
+        "123456-IEP-01152024-.pdf": _iep(_prose(5), _prose(6)),
+    })
+    analyzer.find_documents()
+    analyzer.extract_text()
+    scores = analyzer.section_similarity
+    assert [(s["section"], s["current_iep"], s["previous_iep"]) for s in scores] == [
+        ("plaafp", "2023-01-15", "2022-01-15"),
+    ]
+    assert all(s["similarity"] > dda.SECTION_SIMILARITY_THRESHOLD for s in scores)
+
+
+def test_stale_attendance(fake_pdftotext):
+    issues = _issues({
+        "123456-IEP-05012024-.pdf": _iep(_prose(1), _prose(2), attendance="01/10/2024"),
+        "123456-IEP-01152023-.pdf": _iep(_prose(3), _prose(4), attendance="01/05/2023"),
+    })
+    stale = [i for i in issues if i["type"] == "STALE_ATTENDANCE"]
+    assert [(i["iep_date"], i["data_as_of"], i["days_stale"]) for i in stale] == [
+        ("2024-05-01", "01/10/2024", 112),
+    ]
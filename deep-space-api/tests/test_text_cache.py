@@ -0,0 +1,73 @@
+"""TextCache: content-addressed keys, round trips and LRU eviction."""
+import os
+
+import pytest
+
+import deep_dive_analyzer as dda
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(dda, "pdftotext_version", lambda: "pdftotext version 24.02.0")
+    return dda.TextCache(tmp_path / "text", max_bytes=1 << 20)
+
+
+def test_key_depends_on_content_and_extractor(cache, tmp_path, monkeypatch):
+    a, b = tmp_path / "a.pdf", tmp_path / "b.pdf"
+    a.write_bytes(b"same bytes")
+    b.write_bytes(b"same bytes")
+    key = cache.key(str(a))
+    # Renaming, copying or touching a PDF keeps its entry
+    assert cache.key(str(b)) == key == cache.key_for_bytes(b"same bytes")
+    os.utime(a, (1, 1))
+    assert cache.key(str(a)) == key
+    assert cache.key_for_bytes(b"other bytes") != key
+
+    monkeypatch.setattr(dda, "PDFTOTEXT_FLAGS", [*dda.PDFTOTEXT_FLAGS, "-raw"])
+    assert cache.key(str(a)) != key
+    monkeypatch.undo()
+    monkeypatch.setattr(dda, "pdftotext_version", lambda: "pdftotext version 25.01.0")
+    assert cache.key(str(a)) != key
+
+
+def test_round_trip(cache):
+    key = cache.key_for_bytes(b"pdf")
+    assert cache.get(key) is None
+    cache.put(key, "Present levels — café\n")
+    assert cache.get(key) == "Present levels — café\n"
+    assert list(cache.root.rglob("*.tmp")) == []
+
+
+def test_failed_write_leaves_no_temp_file(cache, monkeypatch, capsys):
+    def fail(*args):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(dda.os, "replace", fail)
+    key = cache.key_for_bytes(b"pdf")
+    cache.put(key, "text")
+    assert "Warning: Could not write text cache entry" in capsys.readouterr().out
+    assert list(cache.root.rglob("*")) == [cache._path(key).parent]
+    assert cache.get(key) is None
+
+
+def test_evict_drops_least_recently_used(cache):
+    keys = [cache.key_for_bytes(bytes([i])) for i in range(4)]
+    for age, key in enumerate(keys):
+        cache.put(key, os.urandom(2000).hex())
+        os.utime(cache._path(key), (1000 + age, 1000 + age))
+    size = cache._path(keys[0]).stat().st_size
+    # A hit makes the oldest entry the most recently used
+    assert cache.get(keys[0]) is not None
+
+    cache.max_bytes = 2 * size + size // 2
+    cache.evict()
+    assert [cache.get(key) is not None for key in keys] == [True, False, False, True]
+    assert sum(p.stat().st_size for p in cache.root.rglob("*.txt.gz")) <= cache.max_bytes
+
+
+def test_evict_under_limit_keeps_everything(cache):
+    keys = [cache.key_for_bytes(bytes([i])) for i in range(3)]
+    for key in keys:
+        cache.put(key, "text")
+    cache.evict()
+    assert all(cache.get(key) == "text" for key in keys)